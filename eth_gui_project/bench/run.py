@@ -0,0 +1,270 @@
+# bench/run.py
+"""离线基准测试：合成数据 + 本地 HTTP/WebSocket 桩，结果写成 JSON 便于跨提交对比
+
+    python -m bench.run                              # 默认规模
+    python -m bench.run --sizes 10000,1000000,5000000 --only levels,store
+    python -m bench.run --compare bench/results/旧结果.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import warnings
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+import threading
+from pathlib import Path
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["NO_PROXY"] = ",".join(filter(None, [os.environ.get("NO_PROXY"), "127.0.0.1", "localhost"]))
+
+import numpy as np
+import pandas as pd
+from . import synth
+from .stubs import RestStub, WSStub
+
+RESULTS_DIR = Path(__file__).parent / "results"
+GROUPS = ["levels", "store", "fetch", "trades", "orderbook", "ws", "chart"]
+
+def measure(fn, repeat: int = 5, setup=None) -> dict:
+    """重复 repeat 次（setup 不计时），返回毫秒级 best/median"""
+    runs = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t = time.perf_counter()
+        fn(arg) if setup else fn()
+        runs.append((time.perf_counter() - t) * 1000)
+    return {"best_ms": min(runs), "median_ms": statistics.median(runs), "repeat": repeat}
+
+# — 各组用例：返回 {用例名: 结果} — #
+def bench_levels(sizes, repeat):
+    from ethgui.indicators import detect_levels, PivotTracker, LevelClusterer
+    from ethgui.volume_profile import VolumeProfile
+    out = {}
+    for n in sizes:
+        df = synth.candles(n)
+        out[f"levels/cold/{n}"] = measure(lambda: detect_levels(df, 1.2, 2), repeat)
+        tracker, clusterer = PivotTracker(), LevelClusterer()
+        detect_levels(df.iloc[:-1], 1.2, 2, tracker=tracker, clusterer=clusterer)
+        out[f"levels/incremental/{n}"] = measure(
+            lambda: detect_levels(df, 1.2, 2, tracker=tracker, clusterer=clusterer), repeat)
+        # 成交量分布：整段构建、每个 tick 的增量更新（同 ts 替换 + 新 K 线）、节点提取
+        out[f"levels/volume_build/{n}"] = measure(lambda: VolumeProfile.from_frame(df), repeat)
+        last  = int(pd.Timestamp(df["ts"].iloc[-1]).value // 1_000_000)
+        ticks = [(last + 60_000 * (i // 10 + 1), 2000.0 + i % 7, 1990.0, 1995.0, 1.0) for i in range(10_000)]
+        out[f"levels/volume_tick/{n}"] = _throughput(measure(
+            lambda vp: [vp.push(*t) for t in ticks], repeat, setup=lambda: VolumeProfile.from_frame(df)),
+            len(ticks), "ticks")
+        out[f"levels/volume_nodes/{n}"] = measure(VolumeProfile.from_frame(df).nodes, repeat)
+    return out
+
+def bench_store(sizes, repeat):
+    from ethgui.store import CandleStore
+    out = {}
+    for n in sizes:
+        df = synth.candles(n)
+        ts = df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+        covered = (int(ts[0]), int(ts[-1]) + 59_999)
+        with tempfile.TemporaryDirectory() as tmp:
+            new_store = lambda: CandleStore(Path(tmp) / str(time.perf_counter_ns()), "BENCH", "1m")
+            out[f"store/save/{n}"] = measure(lambda s: s.write(df, covered), repeat, setup=new_store)
+            store = new_store(); store.write(df, covered)
+            out[f"store/load_all/{n}"] = measure(lambda: store.load(), repeat)
+            day = int(ts[-1]) - 86_400_000
+            out[f"store/load_last_day/{n}"] = measure(lambda: store.load(day, int(ts[-1])), repeat)
+            # 合并：尾部 1000 根被改写（只重写受影响分区）
+            tail = df.iloc[-1000:].assign(close=lambda d: d["close"] + 1)
+            out[f"store/merge_tail/{n}"] = measure(
+                lambda: store.write(tail, (int(ts[-1000]), covered[1])), repeat)
+    return out
+
+def bench_fetch(sizes, repeat):
+    from ethgui.fetcher import FetchWorker
+    from ethgui.backfill import Backfiller
+    from ethgui.rest_client import RestClient
+    n  = min(max(sizes), 100_000)
+    df = synth.candles(n)
+    ts = df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+    with RestStub(synth.candle_rows(df)) as stub, tempfile.TemporaryDirectory() as tmp:
+        class StubWorker(FetchWorker):
+            def _fetch_inc(self, after_ms, end_ms, progress=None, bar=None):
+                bf = Backfiller(self.inst, bar or self.bar, client_factory=lambda: RestClient(stub.url, limiter=None, history_limiter=None),
+                                progress=progress)
+                return bf.fetch(after_ms, end_ms)
+        rows = []
+        def run(w):
+            w.finished.connect(lambda d: rows.append(len(d)))
+            w.run()
+        new = lambda: StubWorker("BENCH", "1m", int(ts[0]), int(ts[-1]) + 59_999,
+                                 Path(tmp) / str(time.perf_counter_ns()))
+        res = measure(run, repeat, setup=new)
+        res.update(rows=rows[-1] if rows else 0, pages=stub.calls // repeat)
+        out = {f"fetch/rest_cold/{n}": res}
+        cache_dir = Path(tmp) / "warm"
+        run(StubWorker("BENCH", "1m", int(ts[0]), int(ts[-1]) + 59_999, cache_dir))
+        out[f"fetch/cache_hit/{n}"] = measure(
+            run, repeat, setup=lambda: StubWorker("BENCH", "1m", int(ts[0]), int(ts[-1]) + 59_999, cache_dir))
+    return out
+
+def _throughput(res: dict, n: int, unit: str) -> dict:
+    res[f"{unit}_per_s"] = n / (res["median_ms"] / 1000)
+    return res
+
+def bench_trades(sizes, repeat):
+    from ethgui.ws_clients import WSSecCandle
+    from ethgui.ws_manager import WSManager
+    out = {}
+    # 常态：每条推送几笔；行情剧烈时：每条推送上百笔
+    for label, n, per_msg in (("normal", 20_000, 5), ("burst", 2_000, 100)):
+        raws = synth.trade_msgs(n, per_msg=per_msg, rate=50.0 * per_msg)
+        msgs = [json.loads(r) for r in raws]
+        agg  = WSSecCandle("ETH-USDT", WSManager())
+        out[f"trades/aggregate_{label}"] = _throughput(
+            measure(lambda: [agg._on_msg(m) for m in msgs], repeat), n * per_msg, "trades")
+        mgr  = WSManager(); mgr._subs[("trades", "ETH-USDT")] = [agg._on_msg]
+        out[f"trades/dispatch_{label}"] = _throughput(
+            measure(lambda: [mgr._dispatch(r) for r in raws], repeat), n * per_msg, "trades")
+    return out
+
+def bench_orderbook(sizes, repeat):
+    from ethgui.ws_clients import WSOrderBook
+    from ethgui.ws_manager import WSManager
+    out = {}
+    for channel in ("books5", "books"):
+        n    = 5_000
+        msgs = [json.loads(r) for r in synth.book_msgs(n, channel=channel)]
+        def run():
+            ob = WSOrderBook("ETH-USDT", WSManager(), channel=channel)
+            for m in msgs:
+                ob._on_msg(m)
+            assert not ob._resyncing, "checksum mismatch"
+        out[f"orderbook/{channel}"] = _throughput(measure(run, repeat), n + 1, "msgs")
+    return out
+
+def bench_ws(sizes, repeat):
+    from ethgui.ws_manager import WSManager
+    n = 20_000
+    with WSStub({"trades": synth.trade_msgs(n)}) as stub:
+        def run():
+            done, got = threading.Event(), [0]
+            def cb(_d):
+                got[0] += 1
+                if got[0] == n:
+                    done.set()
+            mgr = WSManager(stub.url)
+            mgr.subscribe("trades", "ETH-USDT", cb)
+            mgr.start()
+            if not done.wait(60):
+                raise TimeoutError(f"received {got[0]}/{n}")
+            mgr.stop()
+        # 含建连与订阅往返
+        return {"ws/stub_trades": _throughput(measure(run, repeat), n, "msgs")}
+
+def bench_chart(sizes, repeat):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from ethgui.lod import MinMaxPyramid
+    out = {}
+    for n in sizes:
+        df = synth.candles(n)
+        x, y = df["ts"].to_numpy(), df["close"].to_numpy()
+        fig = Figure(figsize=(10, 4), dpi=100); FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        line, = ax.plot(x, y, linewidth=1)
+        out[f"chart/line_full/{n}"] = measure(fig.canvas.draw, repeat)
+        lod = MinMaxPyramid(); lod.rebuild(y)
+        def lod_draw():
+            idx = lod.query(0, n, int(ax.bbox.width * 2))
+            line.set_data(x[idx], y[idx])
+            fig.canvas.draw()
+        out[f"chart/line_lod/{n}"] = measure(lod_draw, repeat)
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from ethgui.charts import LiveCandleCanvas
+    except ImportError as e:
+        out["chart/live_candle"] = {"error": f"skipped: {e}"}
+        return out
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    cv  = LiveCandleCanvas(capacity=300); cv.resize(800, 400)
+    bars = synth.candles(600, bar_ms=1000)
+    bars = [dict(r._asdict(), ts=int(r.ts.value // 1_000_000)) for r in bars.itertuples(index=False)]
+    for b in bars[:300]:
+        cv.push(b)
+    cv.redraw()
+    it = iter(bars[300:] * (repeat * 50))
+    def tick():
+        cv.push(next(it)); cv.redraw()
+    res = measure(lambda: [tick() for _ in range(50)], repeat)
+    out["chart/live_candle_50ticks"] = res
+    return out
+
+# — 运行与对比 — #
+def meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit":   commit,
+        "time":     datetime.now().isoformat(timespec="seconds"),
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+        "numpy":    np.__version__,
+        "pandas":   pd.__version__,
+    }
+
+def compare(base: dict, cur: dict, threshold: float = 1.2):
+    print(f"{'用例':<36}{'基准 ms':>12}{'当前 ms':>12}{'比值':>8}")
+    for name, r in cur["results"].items():
+        b = base["results"].get(name)
+        if not b or "median_ms" not in b or "median_ms" not in r:
+            continue
+        ratio = r["median_ms"] / b["median_ms"]
+        flag  = "  ← 变慢" if ratio > threshold else ""
+        print(f"{name:<36}{b['median_ms']:>12.2f}{r['median_ms']:>12.2f}{ratio:>8.2f}{flag}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="ethgui 离线基准测试")
+    ap.add_argument("--sizes",   default="10000,100000,1000000", help="K 线根数，逗号分隔（10k–5M）")
+    ap.add_argument("--repeat",  type=int, default=5)
+    ap.add_argument("--only",    default="", help=f"只跑指定组：{','.join(GROUPS)}")
+    ap.add_argument("--out",     type=Path, help="结果文件（默认 bench/results/<时间>_<提交>.json）")
+    ap.add_argument("--compare", type=Path, help="与之前的结果文件对比")
+    ap.add_argument("--log",     action="store_true", help="保留 ethgui 的 DEBUG 日志")
+    args = ap.parse_args(argv)
+
+    if not args.log:
+        logging.getLogger("ethgui").setLevel(logging.WARNING)
+    warnings.filterwarnings("ignore", "Glyph .* missing from font")
+    sizes  = [int(s) for s in args.sizes.split(",") if s]
+    groups = [g for g in args.only.split(",") if g] or GROUPS
+    result = {"meta": meta(), "sizes": sizes, "results": {}}
+    for g in groups:
+        t = time.perf_counter()
+        try:
+            res = globals()[f"bench_{g}"](sizes, args.repeat)
+        except Exception as e:
+            res = {g: {"error": f"{type(e).__name__}: {e}"}}
+        result["results"].update(res)
+        for name, r in res.items():
+            txt = r.get("error") or f"median {r['median_ms']:.2f} ms  best {r['best_ms']:.2f} ms" + \
+                  "".join(f"  {k} {v:,.0f}" for k, v in r.items() if k.endswith("_per_s"))
+            print(f"{name:<36}{txt}", flush=True)
+        print(f"-- {g} {time.perf_counter() - t:.1f}s", flush=True)
+
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{result['meta']['commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"结果已写入 {out}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench/stubs.py
+
+import json
+import asyncio
+import threading
+import numpy as np
+import websockets
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+class RestStub:
+    """本地 OKX /market/candles：按 after/before/limit 从给定行（降序）里切片返回"""
+
+    def __init__(self, rows: list[list[str]]):
+        self.rows  = rows
+        self.ts    = -np.array([int(r[0]) for r in rows], dtype=np.int64)   # 取负后升序，便于二分
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_):
+                pass
+
+            def do_GET(self):
+                stub.calls += 1
+                q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                body = json.dumps({"code": "0", "msg": "", "data": stub.page(q)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url    = f"http://127.0.0.1:{self.server.server_port}/api/v5/market/candles"
+
+    def page(self, q: dict) -> list[list[str]]:
+        # OKX：after 取 ts < after，before 取 ts > before，结果按 ts 降序
+        i0 = np.searchsorted(self.ts, -int(q["after"]), "right") if "after" in q else 0
+        i1 = np.searchsorted(self.ts, -int(q["before"]), "left") if "before" in q else len(self.ts)
+        return self.rows[i0:min(i1, i0 + int(q.get("limit", 100)))]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_):
+        self.server.shutdown()
+        self.server.server_close()
+
+class WSStub:
+    """本地 WebSocket 行情源：收到订阅后把该频道的预生成消息尽快推完"""
+
+    def __init__(self, streams: dict[str, list[str]]):
+        self.streams = streams            # channel -> [raw json]
+        self.url     = None
+        self._ready  = threading.Event()
+        self._loop   = None
+        self._stop   = None
+
+    async def _handler(self, ws):
+        try:
+            async for raw in ws:
+                if raw == "ping":
+                    await ws.send("pong")
+                    continue
+                d = json.loads(raw)
+                for a in d.get("args", []):
+                    await ws.send(json.dumps({"event": d["op"], "arg": a}))
+                    if d["op"] == "subscribe":
+                        for m in self.streams.get(a["channel"], ()):
+                            await ws.send(m)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, "127.0.0.1", 0, max_size=None) as srv:
+            self.url = f"ws://127.0.0.1:{srv.sockets[0].getsockname()[1]}"
+            self._ready.set()
+            await self._stop.wait()
+
+    def __enter__(self):
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._main())
+        threading.Thread(target=run, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *_):
+        self._loop.call_soon_threadsafe(self._stop.set)
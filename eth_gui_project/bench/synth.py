@@ -0,0 +1,88 @@
+# bench/synth.py
+
+import json
+import numpy as np
+import pandas as pd
+from ethgui.backfill import COLUMNS
+from ethgui.orderbook import OrderBook
+
+T0_MS = 1_700_006_400_000   # 2023-11-15 00:00 UTC
+
+def candles(n: int, bar_ms: int = 60_000, start_ms: int = T0_MS, seed: int = 0,
+            price: float = 2000.0) -> pd.DataFrame:
+    """几何随机游走的 OHLCV（列与 backfill.COLUMNS 一致，ts 升序）"""
+    rng   = np.random.default_rng(seed)
+    ret   = rng.normal(0, 8e-4, n)
+    close = price * np.exp(np.cumsum(ret))
+    open_ = np.concatenate(([price], close[:-1]))
+    wick  = np.abs(rng.normal(0, 5e-4, (2, n))) * close
+    vol   = rng.gamma(2.0, 50.0, n)
+    return pd.DataFrame({
+        "ts":        pd.to_datetime(start_ms + np.arange(n, dtype=np.int64) * bar_ms, unit="ms"),
+        "open":      open_,
+        "high":      np.maximum(open_, close) + wick[0],
+        "low":       np.minimum(open_, close) - wick[1],
+        "close":     close,
+        "volume":    vol,
+        "volumeCcy": vol * close,
+    })[COLUMNS]
+
+def candle_rows(df: pd.DataFrame) -> list[list[str]]:
+    """DataFrame -> OKX REST 行格式（字符串、按 ts 降序、第 9 列 confirm=1）"""
+    ts = df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+    cols = [df[c].to_numpy() for c in COLUMNS[1:]]
+    rows = [[str(t)] + [f"{c[i]:.2f}" for c in cols] + [f"{cols[-1][i]:.2f}", "1"] for i, t in enumerate(ts)]
+    return rows[::-1]
+
+def trade_msgs(n_msgs: int, per_msg: int = 5, inst: str = "ETH-USDT", rate: float = 50.0,
+               start_ms: int = T0_MS, seed: int = 0) -> list[str]:
+    """OKX trades 频道推送：每条 per_msg 笔成交，平均每秒 rate 笔"""
+    rng = np.random.default_rng(seed)
+    n   = n_msgs * per_msg
+    ts  = start_ms + np.cumsum(rng.exponential(1000 / rate, n)).astype(np.int64)
+    px  = 2000 + np.cumsum(rng.normal(0, 0.05, n))
+    sz  = rng.gamma(1.5, 0.2, n)
+    side = np.where(rng.random(n) < 0.5, "buy", "sell")
+    out = []
+    for m in range(n_msgs):
+        data = [{"instId": inst, "tradeId": str(i), "px": f"{px[i]:.2f}", "sz": f"{sz[i]:.4f}",
+                 "side": side[i], "ts": str(ts[i]), "count": "1"}
+                for i in range(m * per_msg, (m + 1) * per_msg)]
+        out.append(json.dumps({"arg": {"channel": "trades", "instId": inst}, "data": data}))
+    return out
+
+def book_msgs(n_updates: int, depth: int = 400, changes: int = 10, inst: str = "ETH-USDT",
+              channel: str = "books", start_ms: int = T0_MS, seed: int = 0) -> list[str]:
+    """OKX 深度推送：1 条 snapshot + n_updates 条 update，带 seqId/prevSeqId 和正确的 checksum；
+    books5 时每条都是前 5 档全量"""
+    rng  = np.random.default_rng(seed)
+    book = OrderBook()
+    mid, tick = 2000.0, 0.01
+    levels = lambda side, k: [[f"{mid + s * tick * (i + 1):.2f}", f"{rng.gamma(1.5, 2.0):.3f}", "0", "1"]
+                              for s in [(1 if side == "ask" else -1)] for i in k]
+    msgs, seq = [], 1000
+    def emit(d, action):
+        nonlocal seq
+        d.update(ts=str(start_ms + len(msgs) * 10), seqId=seq, prevSeqId=-1 if action == "snapshot" else seq - 1)
+        book.apply(d, action)
+        d["checksum"] = book.checksum()
+        msg = {"arg": {"channel": channel, "instId": inst}, "action": action, "data": [d]}
+        if channel == "books5":
+            del msg["action"]                      # books5 每条都是前 5 档全量，没有 action 字段
+        msgs.append(json.dumps(msg))
+        seq += 1
+    if channel == "books5":
+        for _ in range(n_updates + 1):
+            emit({"bids": levels("bid", range(5)), "asks": levels("ask", range(5))}, "snapshot")
+        return msgs
+    emit({"bids": levels("bid", range(depth)), "asks": levels("ask", range(depth))}, "snapshot")
+    for _ in range(n_updates):
+        d = {}
+        for side in ("bid", "ask"):
+            k   = rng.integers(0, depth, changes)
+            lv  = levels(side, k)
+            for l in lv[: changes // 4]:           # 约四分之一为删除
+                l[1] = "0"
+            d[side + "s"] = lv
+        emit(d, "update")
+    return msgs
@@ -0,0 +1,77 @@
+# ethgui/aggregator.py
+
+class _Bar:
+    __slots__ = ("ts", "open", "high", "low", "close", "volume")
+
+    def __init__(self, ts, o, h, l, c, v):
+        self.ts, self.open, self.high, self.low, self.close, self.volume = ts, o, h, l, c, v
+
+    def as_dict(self) -> dict:
+        return {"ts": self.ts, "open": self.open, "high": self.high, "low": self.low,
+                "close": self.close, "volume": self.volume}
+
+class TradeAggregator:
+    """逐笔成交 -> 多周期 K 线：成交只更新最细周期的一根槽位（整数毫秒分桶、无 datetime），
+    更粗的周期由收盘的细 K 线折叠而来，周期数不影响每笔成交的开销；
+    某周期的 K 线在下一根开始时收盘"""
+
+    def __init__(self, widths_ms=(1000,)):
+        widths = sorted(set(widths_ms))
+        if any(w % widths[0] for w in widths):
+            raise ValueError(f"bar widths {widths} must be multiples of {widths[0]}")
+        self.widths = widths
+        self._bars: list[_Bar | None] = [None] * len(widths)
+
+    def add(self, ts: list[int], px: list[float], sz: list[float]) -> list[tuple[int, dict]]:
+        """按时间顺序加入一批成交，返回本批收盘的 [(width_ms, bar)]；更早的桶里迟到的成交并入当前 K 线"""
+        closed = []
+        w   = self.widths[0]
+        bar = self._bars[0]
+        for t, p, s in zip(ts, px, sz):
+            b = t - t % w
+            if bar is None or b > bar.ts:
+                if bar is not None:
+                    closed.append((w, bar.as_dict()))
+                    self._fold(bar, closed, b)
+                bar = self._bars[0] = _Bar(b, p, p, p, p, s)
+                continue
+            if p > bar.high:
+                bar.high = p
+            elif p < bar.low:
+                bar.low = p
+            bar.close   = p
+            bar.volume += s
+        return closed
+
+    def _fold(self, fine: _Bar, closed: list, nxt: int | None = None):
+        """把收盘的细 K 线并入各粗周期；nxt 为下一根细 K 线的起点，落在新桶里时粗周期随之收盘，
+        不必等到下一根细 K 线也收盘"""
+        for i in range(1, len(self.widths)):
+            w   = self.widths[i]
+            b   = fine.ts - fine.ts % w
+            bar = self._bars[i]
+            if bar is None or b > bar.ts:
+                if bar is not None:
+                    closed.append((w, bar.as_dict()))
+                bar = self._bars[i] = _Bar(b, fine.open, fine.high, fine.low, fine.close, fine.volume)
+            else:
+                bar.high    = max(bar.high, fine.high)
+                bar.low     = min(bar.low, fine.low)
+                bar.close   = fine.close
+                bar.volume += fine.volume
+            if nxt is not None and nxt - nxt % w > bar.ts:
+                closed.append((w, bar.as_dict()))
+                self._bars[i] = None
+
+    def flush(self) -> list[tuple[int, dict]]:
+        """收掉所有未完成的 K 线（流结束时调用）"""
+        closed = []
+        fine = self._bars[0]
+        if fine is not None:
+            closed.append((self.widths[0], fine.as_dict()))
+            self._fold(fine, closed)
+        for i in range(1, len(self.widths)):
+            if self._bars[i] is not None:
+                closed.append((self.widths[i], self._bars[i].as_dict()))
+        self._bars = [None] * len(self.widths)
+        return closed
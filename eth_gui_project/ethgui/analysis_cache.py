@@ -0,0 +1,152 @@
+# ethgui/analysis_cache.py
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .config import CACHE_DIR, PIVOT_WINDOW, LEVEL_BACKEND, ANALYSIS_CACHE_KEYS, ANALYSIS_CACHE_PARAMS
+from .indicators import PivotTracker, LevelClusterer, pivot_prices, levels_from_pivots
+from .metrics import METRICS
+from .logger import logger
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """数据版本：ts/high/low/close 内容的哈希，任何一根 K 线变化（含未收盘的最后一根）都会改变"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df["ts"].to_numpy().astype("datetime64[ms]").view(np.int64)).data)
+    for c in ("high", "low", "close"):
+        h.update(np.ascontiguousarray(df[c].to_numpy(dtype=float)).data)
+    return h.hexdigest()
+
+def _frame(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["price", "hits"]).astype({"price": float, "hits": int})
+
+class _Entry:
+    __slots__ = ("key", "pivots", "std", "levels", "clusterer")
+
+    def __init__(self, key, pivots=None, std=0.0, levels=None):
+        self.key, self.pivots, self.std = key, pivots, std
+        self.levels: OrderedDict = levels if levels is not None else OrderedDict()
+        self.clusterer: LevelClusterer | None = None    # 有序枢轴价，只在内存中，换参数时免去重新排序
+
+class AnalysisCache:
+    """支撑阻力结果缓存：两级 LRU，(品种, 周期, 区间, 数据版本, 枢轴窗口) -> 枢轴价与 σ，
+    其下 (eps×σ, min hits, 后端) -> 价位带；只改参数时跳过枢轴点计算，参数重复时直接命中。
+    落盘到 K 线库旁的 analysis/ 目录（index.json + 每条枢轴价一个 .npz），重启后仍可命中"""
+
+    _open: dict[str, "AnalysisCache"] = {}
+    _open_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, root: Path = CACHE_DIR) -> "AnalysisCache":
+        """同一目录在进程内共用一个实例"""
+        key = str(Path(root).resolve())
+        with cls._open_lock:
+            if key not in cls._open:
+                cls._open[key] = cls(root)
+            return cls._open[key]
+
+    def __init__(self, root: Path = CACHE_DIR, keys: int = ANALYSIS_CACHE_KEYS, params: int = ANALYSIS_CACHE_PARAMS):
+        self.dir = Path(root) / "analysis"
+        self.index_path = self.dir / "index.json"
+        self.keys, self.params = keys, params
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()    # digest -> 条目，末尾为最近使用
+        self._lock  = threading.Lock()
+        self._dirty = False
+        if self.index_path.exists():
+            try:
+                for d, e in json.loads(self.index_path.read_text(encoding="utf-8")).items():
+                    self._entries[d] = _Entry(tuple(e["key"]), None, e["std"], OrderedDict(
+                        (tuple(p), _frame(lv)) for p, lv in e["levels"]))
+            except (ValueError, KeyError, TypeError) as ex:
+                logger.warning(f"Analysis cache index unreadable, starting empty: {ex}")
+                self._entries.clear()
+
+    @staticmethod
+    def _digest(key: tuple) -> str:
+        return hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+
+    def _pivot_path(self, digest: str) -> Path:
+        return self.dir / f"{digest}.npz"
+
+    def _get(self, digest: str) -> _Entry | None:
+        e = self._entries.get(digest)
+        if e is None:
+            return None
+        self._entries.move_to_end(digest)
+        if e.pivots is None:                     # 从磁盘恢复的条目，枢轴价按需读取
+            try:
+                with np.load(self._pivot_path(digest)) as z:
+                    e.pivots = z["pivots"]
+            except OSError:
+                del self._entries[digest]
+                return None
+        return e
+
+    def _put(self, digest: str, e: _Entry):
+        self._entries[digest] = e
+        self._entries.move_to_end(digest)
+        self._dirty = True
+        while len(self._entries) > self.keys:
+            old, _ = self._entries.popitem(last=False)
+            self._pivot_path(old).unlink(missing_ok=True)
+
+    def levels(self, inst: str, bar: str, df: pd.DataFrame, eps_mul: float, min_hits: int,
+               window: int = PIVOT_WINDOW, tracker: PivotTracker | None = None,
+               clusterer: LevelClusterer | None = None, backend: str = LEVEL_BACKEND,
+               cache: bool = True) -> pd.DataFrame:
+        """与 detect_levels 结果相同；tracker/clusterer 只在未命中时用于增量计算。
+        cache=False 用于实时 K 线触发的重算：每根新 K 线都是新的数据版本，查缓存只会多一次 O(n) 指纹并挤掉有用条目"""
+        if df.empty:
+            return pd.DataFrame(columns=["price", "hits"])
+        if not cache:
+            with METRICS.timer("analysis.levels_ms"):
+                return levels_from_pivots(pivot_prices(df, window, tracker), float(df["close"].std())*eps_mul,
+                                          min_hits, clusterer, backend)
+        with METRICS.timer("analysis.levels_ms"):
+            ts  = df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+            key = (inst, bar, int(ts[0]), int(ts[-1]), fingerprint(df), window)
+            d   = self._digest(key)
+            par = (round(float(eps_mul), 6), int(min_hits), backend)
+            with self._lock:
+                e = self._get(d)
+                if e is not None and par in e.levels:
+                    e.levels.move_to_end(par)
+                    METRICS.inc("analysis.hits")
+                    return e.levels[par].copy()
+            METRICS.inc("analysis.misses")
+            if e is None:
+                e = _Entry(key, pivot_prices(df, window, tracker), float(df["close"].std()))
+            if clusterer is None and backend == "gap":
+                if e.clusterer is None:
+                    e.clusterer = LevelClusterer(); e.clusterer.add(e.pivots)
+                clusterer = e.clusterer
+            lv = levels_from_pivots(e.pivots, e.std*eps_mul, min_hits, clusterer, backend)
+            with self._lock:
+                e.levels[par] = lv.copy()
+                while len(e.levels) > self.params:
+                    e.levels.popitem(last=False)
+                self._put(d, e)
+            return lv
+
+    def save(self):
+        """index.json 原子替换；枢轴价只在新条目首次落盘时写入"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            index = {}
+            for d, e in self._entries.items():
+                p = self._pivot_path(d)
+                if e.pivots is not None and not p.exists():
+                    np.savez_compressed(p, pivots=e.pivots)
+                index[d] = {"key": list(e.key), "std": e.std,
+                            "levels": [[list(k), lv[["price", "hits"]].values.tolist()] for k, lv in e.levels.items()]}
+            tmp = self.index_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(index), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+            self._dirty = False
+        logger.debug(f"Saved {len(index)} analysis cache entries to {self.dir}")
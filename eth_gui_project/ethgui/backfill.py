@@ -0,0 +1,104 @@
+# ethgui/backfill.py
+
+import time
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from .rest_client import RestClient
+from .config import BAR_MS, REST_PAGE_LIMIT, REST_WORKERS, REST_WINDOW_RETRY, REST_RECENT_BARS, REST_HISTORY_LIMIT
+from .logger import logger
+
+COLUMNS = ["ts","open","high","low","close","volume","volumeCcy"]
+
+def split_windows(after_ms: int, end_ms: int, bar: str, limit: int = REST_PAGE_LIMIT) -> list[tuple[int, int]]:
+    """把 [after_ms, end_ms] 切成每段恰好容纳 limit 根 K 线的闭区间窗口"""
+    step = BAR_MS[bar] * limit
+    return [(s, min(s + step - 1, end_ms)) for s in range(after_ms, end_ms + 1, step)]
+
+def plan_windows(after_ms: int, end_ms: int, bar: str, now_ms: int | None = None) -> list[tuple[int, int, bool]]:
+    """回补窗口 [(起, 止, 是否走 history-candles)]：最近 REST_RECENT_BARS 根以内按 REST_PAGE_LIMIT 切，
+    更早的按 history-candles 的单页上限切"""
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    end_ms = min(end_ms, now_ms)
+    cut    = (now_ms // BAR_MS[bar] - REST_RECENT_BARS) * BAR_MS[bar]
+    old    = split_windows(after_ms, min(end_ms, cut - 1), bar, REST_HISTORY_LIMIT) if after_ms < cut else []
+    new    = split_windows(max(after_ms, cut), end_ms, bar) if end_ms >= cut else []
+    return [(s, e, True) for s, e in old] + [(s, e, False) for s, e in new]
+
+def fetched_span(df: pd.DataFrame, bar: str, requested: tuple[int, int]) -> tuple[int, int] | None:
+    """回补结果实际覆盖的区间（首根开盘到末根收盘，与请求区间取交集），用作 CandleStore.write 的 covered；
+    空结果返回 None：接口对该区间无数据（如超出其历史范围）时不记覆盖，下次仍会重试"""
+    if df.empty:
+        return None
+    ts = pd.to_datetime(df["ts"]).to_numpy().astype("datetime64[ms]").astype("int64")
+    s, e = max(requested[0], int(ts.min())), min(requested[1], int(ts.max()) + BAR_MS[bar] - 1)
+    return (s, e) if s <= e else None
+
+def candles_to_frame(rows: list[list[str]]) -> pd.DataFrame:
+    """OKX 原始 K 线行 -> DataFrame（按 ts 升序、去重）"""
+    if not rows:
+        return pd.DataFrame(columns=COLUMNS)
+    trimmed = [r[:7] for r in rows]
+    df = pd.DataFrame(trimmed, columns=COLUMNS)
+    df["ts"] = pd.to_datetime(df["ts"].astype(int), unit="ms")
+    for c in ["open","high","low","close","volume","volumeCcy"]:
+        df[c] = df[c].astype(float)
+    return df.drop_duplicates("ts").sort_values("ts").reset_index(drop=True)
+
+class Backfiller:
+    """按时间窗口并发回补历史 K 线：有界线程池 + 共享令牌桶 + 失败窗口重试"""
+
+    def __init__(self, inst: str, bar: str, workers: int = REST_WORKERS,
+                 client_factory=RestClient, progress=None, pool: ThreadPoolExecutor | None = None):
+        self.inst     = inst
+        self.bar      = bar
+        self.workers  = workers
+        self.progress = progress           # callable(done, total)
+        self.pool     = pool               # 外部共享线程池（不关闭）；None 时每次 fetch 自建
+        self._factory = client_factory
+        self._local   = threading.local()  # requests.Session 不跨线程共享
+
+    def _client(self) -> RestClient:
+        if not hasattr(self._local, "client"):
+            self._local.client = self._factory()
+        return self._local.client
+
+    def _fetch_window(self, win: tuple[int, int, bool]) -> list[list[str]]:
+        # OKX: after 取更早（ts < after），before 取更新（ts > before）
+        w0, w1, history = win
+        return self._client().get_candles(self.inst, self.bar, history=history, after=w1 + 1, before=w0 - 1,
+                                          limit=REST_HISTORY_LIMIT if history else REST_PAGE_LIMIT)
+
+    def fetch(self, after_ms: int, end_ms: int) -> pd.DataFrame:
+        windows = plan_windows(after_ms, end_ms, self.bar)
+        total, done = len(windows), 0
+        results: dict[int, list] = {}
+        pending = list(range(total))
+        logger.debug(f"Backfill {self.inst} {self.bar}: {total} windows, workers={self.workers}")
+        with (ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill")
+              if self.pool is None else nullcontext(self.pool)) as pool:
+            for rnd in range(REST_WINDOW_RETRY + 1):
+                if not pending:
+                    break
+                if rnd:
+                    logger.warning(f"Backfill retry round {rnd}: {len(pending)} windows")
+                    time.sleep(min(2 ** rnd, 8))
+                futs = {pool.submit(self._fetch_window, windows[i]): i for i in pending}
+                pending = []
+                for fut in as_completed(futs):
+                    i = futs[fut]
+                    try:
+                        results[i] = fut.result()
+                    except Exception as e:
+                        logger.warning(f"Backfill window {windows[i][:2]} failed: {e}")
+                        pending.append(i)
+                        continue
+                    done += 1
+                    if self.progress:
+                        self.progress(done, total)
+        if pending:
+            raise RuntimeError(f"回补失败：{len(pending)}/{total} 个时间窗口重试 {REST_WINDOW_RETRY} 次后仍失败")
+        rows = [r for i in range(total) for r in results[i][::-1]]
+        logger.debug(f"Backfill done rows={len(rows)}")
+        return candles_to_frame(rows)
@@ -0,0 +1,136 @@
+# ethgui/charts.py
+
+import numpy as np
+from datetime import datetime, timezone
+from matplotlib.figure import Figure
+from matplotlib.transforms import Affine2D
+from matplotlib.collections import PolyCollection, LineCollection
+from matplotlib.ticker import FuncFormatter
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+
+UP_COLOR   = (0.0, 0.39, 0.25, 1.0)   # 与 mplfinance "charles" 风格相近
+DOWN_COLOR = (0.63, 0.13, 0.16, 1.0)
+
+class LiveCandleCanvas(FigureCanvas):
+    """实时蜡烛图：固定 capacity 个矩形/影线原地复用（环形槽位），新 K 线只改一个槽位并平移变换，
+    坐标轴背景缓存后用 blit 只重画动态 artist；价格超出 y 轴范围时才整图重绘"""
+
+    def __init__(self, capacity: int = 300, title: str = "", width: float = 0.6):
+        super().__init__(Figure(figsize=(6,4)))
+        self.n     = capacity
+        self.half  = width / 2
+        self.seq   = -1                                # 最新 K 线的序号（x 坐标）
+        self.ts    = np.zeros(capacity, dtype=np.int64)
+        self.ohlc  = np.full((capacity, 4), np.nan)
+        self._colors = np.tile(UP_COLOR, (capacity, 1))
+        self._bg   = None
+        self._bg_axis  = None                          # 背景 + 当前序号下的 x 轴
+        self._axis_seq = None
+        self._full = True
+
+        ax = self.ax = self.figure.add_subplot(111)
+        ax.set_title(title)
+        ax.set_xlim(-capacity + 0.5, 0.5)
+        # x 为相对最新一根的位置，刻度显示该槽位 K 线的 UTC 时刻；刻度文字随每根新 K 线变化，
+        # 所以 x 轴不进背景缓存，只在新 K 线时重画一次并连同背景另存（_bg_axis）
+        ax.xaxis.set_major_formatter(FuncFormatter(self._fmt_time))
+        ax.xaxis.set_animated(True)
+        # 槽位 i 的 K 线画在 x=序号 处，整体平移 -seq，最新一根始终在 x=0
+        self._shift = Affine2D()
+        trans = self._shift + ax.transData
+        self.bodies = PolyCollection(np.zeros((capacity, 4, 2)), transform=trans, animated=True,
+                                     facecolors=self._colors, edgecolors=self._colors, linewidths=0.8)
+        self.wicks  = LineCollection(np.zeros((capacity, 2, 2)), transform=trans, animated=True,
+                                     colors=self._colors, linewidths=0.8)
+        ax.add_collection(self.wicks); ax.add_collection(self.bodies)
+        self.label = ax.text(0.01, 0.98, "", transform=ax.transAxes, va="top", animated=True)
+        self.mpl_connect("draw_event", self._on_draw)
+
+    # — 数据 — #
+    def reset(self, title: str | None = None):
+        """清空所有槽位（切换品种时用）"""
+        self.seq = -1
+        self.ts[:] = 0
+        self.ohlc[:] = np.nan
+        for p in (*self.bodies.get_paths(), *self.wicks.get_paths()):
+            p.vertices = np.zeros_like(p.vertices)
+        self.label.set_text("")
+        if title is not None:
+            self.ax.set_title(title)
+        self._full = True
+
+    def push(self, bar: dict):
+        """追加新 K 线或更新最后一根（按 ts 判断），只改动一个槽位"""
+        ts = int(bar["ts"])
+        if self.seq >= 0 and ts == self.ts[self.seq % self.n]:
+            pass
+        elif self.seq < 0 or ts > self.ts[self.seq % self.n]:
+            self.seq += 1
+            self._shift.clear().translate(-self.seq, 0)
+            self._check_shrink()
+        else:
+            return
+        i = self.seq % self.n
+        o, h, l, c = bar["open"], bar["high"], bar["low"], bar["close"]
+        self.ts[i] = ts
+        self.ohlc[i] = (o, h, l, c)
+        x, lo, hi = self.seq, min(o, c), max(o, c)
+        self.bodies.get_paths()[i].vertices = np.array(
+            [[x-self.half, lo], [x-self.half, hi], [x+self.half, hi], [x+self.half, lo], [x-self.half, lo]])
+        self.wicks.get_paths()[i].vertices = np.array([[x, l], [x, h]])
+        self._colors[i] = UP_COLOR if c >= o else DOWN_COLOR
+        self.bodies.set_facecolor(self._colors); self.bodies.set_edgecolor(self._colors)
+        self.wicks.set_color(self._colors)
+        y0, y1 = self.ax.get_ylim()
+        if l < y0 or h > y1:
+            self._full = True
+        dt = datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
+        self.label.set_text(f"{dt:%H:%M:%S}  O {o:.2f}  H {h:.2f}  L {l:.2f}  C {c:.2f}")
+
+    def _fmt_time(self, x, _pos=None) -> str:
+        k = self.seq + int(round(x))
+        if self.seq < 0 or not (self.seq - self.n < k <= self.seq) or k < 0:
+            return ""
+        return f"{datetime.fromtimestamp(self.ts[k % self.n] / 1000, tz=timezone.utc):%H:%M:%S}"
+
+    def _check_shrink(self):
+        # 旧的极值移出窗口后可见价格区间明显变窄，重新定 y 轴
+        if self.seq % 30 or self.seq < self.n:
+            return
+        y0, y1 = self.ax.get_ylim()
+        if np.nanmax(self.ohlc[:, 1]) - np.nanmin(self.ohlc[:, 2]) < 0.4 * (y1 - y0):
+            self._full = True
+
+    # — 绘制 — #
+    def _rescale(self):
+        if self.seq < 0:
+            return
+        lo, hi = np.nanmin(self.ohlc[:, 2]), np.nanmax(self.ohlc[:, 1])
+        pad = (hi - lo) * 0.1 or max(abs(hi) * 1e-4, 1e-6)
+        self.ax.set_ylim(lo - pad, hi + pad)
+
+    def _on_draw(self, _event):
+        self._bg = self.copy_from_bbox(self.figure.bbox)
+        self._axis_seq = None
+        self._draw_animated()
+
+    def _draw_animated(self):
+        if self._axis_seq != self.seq:
+            # 画 x 轴的开销与整批蜡烛相当，同一根 K 线内的更新复用上次的结果
+            self.restore_region(self._bg)
+            self.ax.draw_artist(self.ax.xaxis)
+            self._bg_axis, self._axis_seq = self.copy_from_bbox(self.figure.bbox), self.seq
+        else:
+            self.restore_region(self._bg_axis)
+        for a in (self.wicks, self.bodies, self.label):
+            self.ax.draw_artist(a)
+
+    def redraw(self):
+        """需要时整图重绘（会触发 draw_event 重新缓存背景），否则只 blit 动态部分"""
+        if self._full or self._bg is None:
+            self._full = False
+            self._rescale()
+            self.draw()
+            return
+        self._draw_animated()
+        self.blit(self.figure.bbox)
@@ -2,9 +2,21 @@ from pathlib import Path
 
 # ---- 调试开关 ----
 DEBUG = True
+LOG_DIR       = "logs"
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 单个日志文件上限，超过后轮转
+LOG_BACKUPS   = 3                 # 每次运行保留的轮转文件数
+LOG_KEEP_RUNS = 10                # 只保留最近几次运行的日志
+LOG_RAW_RATE  = 5                 # WebSocket 原始帧日志每频道每秒最多条数（0 关闭）
+LOG_RAW_CHARS = 500               # 原始帧日志截断长度
+METRICS_WINDOW = 2048             # 直方图分位数基于最近多少个样本
+METRICS_FILE   = Path(LOG_DIR) / "metrics.json"  # 指标导出文件
+STARTUP_REPORT = Path(LOG_DIR) / "startup.txt"   # 启动耗时报告（时间线 + 预加载导入耗时）
 
 # ---- 缓存 & 代理 ----
 CACHE_DIR = Path("cache")
+CACHE_PARTITION = "month"  # K 线缓存分区粒度："day" 或 "month"
+CACHE_ROW_GROUP = 1440     # Parquet row group 行数（1m 下为一天），范围读取按其统计信息跳过
+LIVE_SPILL_S    = 600      # 实时 1m K 线落盘间隔（秒）
 PROXIES = {
     # "https": "http://127.0.0.1:7890",
     # "http":  "http://127.0.0.1:7890",
@@ -15,9 +27,79 @@ VERIFY_SSL = False  # True 或 证书文件路径
 FONT_NAME      = "Microsoft YaHei"
 DEFAULT_EPS_MUL  = 1.2
 DEFAULT_MIN_HITS = 2
+PIVOT_WINDOW     = 5     # 枢轴点滚动窗口宽度（奇数）
+LEVEL_BACKEND    = "gap" # 价位聚类后端："gap"（排序+间隔扫描）或 "dbscan"（需 scikit-learn）
+ANALYSIS_CACHE_KEYS   = 32   # 分析缓存保留的 (品种, 周期, 区间, 数据版本) 条数，LRU 淘汰
+ANALYSIS_CACHE_PARAMS = 256  # 每条数据上保留的 (eps, min hits) 结果数
+VP_BIN_PCT     = 0.001  # 成交量分布的价格桶宽（占中位收盘价的比例）
+VP_WINDOW_BARS = 0      # 成交量分布只统计最近 N 根 K 线（滚动减去移出窗口的），0 为整个序列
+VP_NODE_MULT   = 1.5    # 高成交量节点：相邻 3 桶的均量须达到非空桶均量的倍数
+VP_MAX_NODES   = 8      # 最多取几个高成交量节点
+
+# ---- 参数扫描（python -m ethgui.sweep） ----
+SWEEP_EPS     = "0.4:3:0.2"   # eps×σ 网格："起:止:步长" 或逗号分隔
+SWEEP_HITS    = "2,3,4,6"     # min hits 网格
+SWEEP_WINDOWS = "3,5,9"       # 枢轴窗口网格（奇数）
+SWEEP_DAYS    = 30            # 默认分析最近多少天
+SWEEP_TOL     = 0.002         # 不同参数下的价位相对差在此以内视为同一价位
+
+# ---- 自选列表 ----
+WATCHLIST = ["ETH-USDT", "BTC-USDT", "SOL-USDT"]  # 同时维护的品种
+WATCH_BARS = ["1m", "15m", "1H"]                 # 每个品种同时维护的周期
+WATCH_LOOKBACK_BARS = 5000   # 每个 (品种, 周期) 常驻内存的 K 线根数
+WATCH_FG_WORKERS    = 2      # 可见品种的任务线程数
+WATCH_BG_INTERVAL   = 2.0    # 后台品种任务之间的最小间隔（秒），可见品种有任务时后台暂停
+INST_TYPES    = ["SPOT", "SWAP"]   # 手动输入的品种按这些产品类型的 OKX 品种列表校验
+INST_LIST_TTL = 86_400             # 品种列表缓存 cache/instruments.json 的有效期（秒）
+
+# ---- 渲染 ----
+RENDER_FPS = 20  # 实时视图合并重绘的帧率上限
+LOD_POINTS_PER_PX = 2  # 1m 折线每像素列的点数预算（min/max 各一）
 
 # ---- OKX 接口地址 ----
 OKX_REST_URL = "https://www.okx.com/api/v5/market/candles"
 # WebSocket 市场行情地址根据官方文档应使用 /ws/v5/market
 WS_URL       = "wss://ws.okx.com:8443/ws/v5/market"
 WS_PROXY = "http://127.0.0.1:7890"
+WS_PING_INTERVAL = 20     # 秒；无消息则发 "ping"（OKX 30s 无数据会断开）
+WS_PONG_TIMEOUT  = 10     # 秒；ping 后仍无任何消息则视为断线
+WS_RECONNECT_MIN = 1      # 重连退避起点（秒），每次失败翻倍
+WS_RECONNECT_MAX = 60     # 重连退避上限（秒）
+OB_CHANNEL = "books5"     # 深度频道：books5 / books / books-l2-tbt
+OB_DEPTH   = 5            # 界面显示的档位数
+SEC_BAR_WIDTHS = (1000, 5000, 15000)  # 成交聚合的 K 线周期（毫秒），须为最小周期的整数倍
+
+# ---- 行情录制/回放 ----
+RECORD_WS      = False            # True 时把共享 WebSocket 收到的原始帧录制到 RECORD_DIR
+RECORD_DIR     = Path("recordings")
+RECORD_CHUNK   = 4096             # 每个 Arrow record batch 的帧数
+RECORD_FLUSH_S = 2.0              # 不满一批时最长多久落盘一次（秒）
+RECORD_COMPRESSION = "zstd"       # 批内压缩："zstd" / "lz4" / None
+
+# ---- 本机行情守护进程（python -m ethgui.daemon） ----
+DAEMON_NAME   = "ethgui-md"  # 本地套接字名（Linux/macOS 为临时目录下的 Unix socket，Windows 为命名管道）
+DAEMON_CLIENT = True         # 守护进程在运行时 GUI 作为其客户端：不直连交易所、不写 K 线库与分析缓存
+DAEMON_CONNECT_MS   = 300          # 启动时探测守护进程的超时（毫秒）
+DAEMON_WORLD_ACCESS = False        # True 时同机其他用户也可连接（多人共用一个守护进程）
+DAEMON_BOOK_BACKLOG = 1 << 20      # 客户端未读字节超过此值时跳过深度帧（下一帧即全量前 N 档）
+DAEMON_MAX_BACKLOG  = 64 << 20     # 超过此值视为客户端卡死，断开
+
+# ---- REST 回补 ----
+REST_PAGE_LIMIT   = 300   # 单页最大行数，亦即每个时间窗口的 K 线根数
+REST_WORKERS      = 4     # 并发窗口数
+REST_RATE         = 15    # 令牌桶速率（次/秒），OKX 行情接口限 40 次/2s
+REST_BURST        = 10    # 令牌桶容量；须满足 REST_BURST + 2 × REST_RATE ≤ 40，冷启动也不会触发 429
+REST_WINDOW_RETRY = 3     # 失败窗口的重试轮数
+REST_RECENT_BARS  = 1400  # /market/candles 只提供最近 1440 根（留出余量），更早的窗口走 /market/history-candles
+REST_HISTORY_LIMIT = 100  # history-candles 单页最大行数
+REST_HISTORY_RATE  = 8    # history-candles 另限 20 次/2s，单独一个令牌桶
+REST_HISTORY_BURST = 4
+BAR_MS = {
+    "1m": 60_000, "5m": 300_000, "15m": 900_000,
+    "1H": 3_600_000, "4H": 14_400_000, "1D": 86_400_000,
+}
+BAR_OFFSET_MS = {"1D": 28_800_000}  # OKX 日线按香港时间（UTC+8）0 点开盘；4H 及以下与 UTC 对齐
+
+# ---- 高周期派生 ----
+DERIVE_BARS        = ["5m", "15m", "1H", "4H", "1D"]  # 由 1m K 线库本地聚合的周期
+DERIVE_FETCH_LIMIT = 10_080  # 1m 缺口不超过该根数（7 天）才回补 1m 再聚合，否则直接回补该周期
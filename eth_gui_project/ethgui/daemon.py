@@ -0,0 +1,267 @@
+# ethgui/daemon.py
+"""本机行情守护进程：独占交易所连接（一条 WebSocket、一个回补线程池）与 K 线库/分析缓存的写入，
+经本地套接字把 1s K 线、深度、自选列表的 K 线与支撑阻力、手动回补结果以 wire 二进制帧分发给多个 GUI
+
+    python -m ethgui.daemon                              # 常驻 WATCHLIST，客户端按需追加品种/周期
+    python -m ethgui.daemon --insts ETH-USDT,BTC-USDT --name ethgui-md
+
+GUI 启动时若探测到守护进程（DAEMON_CLIENT=True）即进入客户端模式，N 个窗口只占一套上游连接与一份缓存写入
+"""
+
+import sys
+import signal
+import argparse
+from pathlib import Path
+from PyQt6.QtCore import Qt, QCoreApplication, QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from .config import (CACHE_DIR, WATCHLIST, METRICS_FILE, DAEMON_NAME, DAEMON_CONNECT_MS, DAEMON_WORLD_ACCESS,
+                     DAEMON_BOOK_BACKLOG, DAEMON_MAX_BACKLOG)
+from . import wire
+from .watchlist import Watchlist
+from .ws_manager import WSManager
+from .ws_clients import WSSecCandle, WSOrderBook
+from .fetcher import FetchWorker
+from .instruments import Instruments
+from .metrics import METRICS
+from .logger import logger, setup_logging
+
+class _Client:
+    """一个已连接的 GUI：读缓冲与各类订阅"""
+
+    def __init__(self, sock: QLocalSocket, name: str):
+        self.sock, self.name = sock, name
+        self.reader  = wire.FrameReader()
+        self.trades: set[str] = set()
+        self.books:  set[str] = set()
+        self.watches: set[tuple[str, str]] = set()
+        self.focus: tuple[str, str] | None = None
+
+class MarketDaemon(QObject):
+    """客户端请求在主线程处理；WebSocket/回补线程里的结果先编码或打包，再经队列信号回到主线程写套接字"""
+
+    _stream = pyqtSignal(object, bytes)        # WebSocket 线程 -> 主线程：(("trades"|"book", 品种), 已编码帧)
+    _fetch_evt = pyqtSignal(object, str, object)  # 回补线程 -> 主线程：(回补键, "progress"|"done"|"error", 结果)
+
+    def __init__(self, name: str = DAEMON_NAME, insts=WATCHLIST, cache_dir: Path = CACHE_DIR, parent=None):
+        super().__init__(parent)
+        self.name      = name
+        self.cache_dir = Path(cache_dir)
+        self.base      = set(insts)            # 常驻品种，没有客户端关注时也不移除
+        self.manager   = WSManager.shared()
+        self.watch     = Watchlist(insts, cache_dir=self.cache_dir, manager=self.manager, parent=self)
+        self.instruments = Instruments(self.cache_dir); self.instruments.refresh()
+        self._clients: dict[QLocalSocket, _Client] = {}
+        self._streams: dict[tuple[str, str], WSSecCandle | WSOrderBook] = {}
+        self._fetches: dict[tuple, list[tuple[_Client, int]]] = {}   # (inst, bar, start, end) -> [(客户端, 请求号)]
+        self._workers: dict[tuple, FetchWorker] = {}
+        self._seq = 0
+        self._stream.connect(self._fanout)
+        self._fetch_evt.connect(self._on_fetch)
+        self.watch.loaded.connect(self._on_loaded)
+        self.watch.updated.connect(lambda i, b, c: self._to_watchers(i, b, wire.candle(wire.CANDLE, i, b, c)))
+        self.watch.levels_ready.connect(lambda i, b, lv: self._to_watchers(i, b, wire.levels(i, b, lv)))
+        self.watch.error.connect(lambda i, b, msg: self._to_watchers(i, b, wire.error(0, i, b, msg)))
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.WorldAccessOption if DAEMON_WORLD_ACCESS
+                                     else QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+        METRICS.gauge("daemon.clients", lambda: len(self._clients))
+        METRICS.gauge("daemon.streams", lambda: len(self._streams))
+
+    def listen(self) -> bool:
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(DAEMON_CONNECT_MS):
+            probe.abort()
+            logger.error(f"Market daemon already running at {self.name}")
+            return False
+        QLocalServer.removeServer(self.name)    # 上次异常退出残留的 socket 文件
+        if not self.server.listen(self.name):
+            logger.error(f"Market daemon cannot listen on {self.name}: {self.server.errorString()}")
+            return False
+        logger.info(f"Market daemon listening on {self.server.fullServerName()}")
+        return True
+
+    def close(self):
+        self.server.close()
+        for s in self._streams.values():
+            s.stop()
+        self._streams.clear()
+        self.watch.close()
+        self.manager.stop()
+        METRICS.export(METRICS_FILE)
+        logger.info("Market daemon stopped")
+
+    # — 连接 — #
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self._seq += 1
+            c = self._clients[sock] = _Client(sock, f"client#{self._seq}")
+            sock.readyRead.connect(lambda s=sock: self._on_read(s))
+            sock.disconnected.connect(lambda s=sock: self._drop(s))
+            logger.info(f"Market daemon: {c.name} connected ({len(self._clients)} clients)")
+
+    def _drop(self, sock: QLocalSocket):
+        c = self._clients.pop(sock, None)
+        if c is None:
+            return
+        for inst in list(c.trades):
+            self._unsub(c, "trades", inst)
+        for inst in list(c.books):
+            self._unsub(c, "book", inst)
+        watches, c.watches = c.watches, set()
+        for key in watches:
+            self._release(key)
+        for reqs in self._fetches.values():
+            reqs[:] = [r for r in reqs if r[0] is not c]
+        self._refocus()
+        sock.deleteLater()
+        logger.info(f"Market daemon: {c.name} disconnected ({len(self._clients)} clients)")
+
+    def _send(self, c: _Client, frame: bytes):
+        if c.sock.bytesToWrite() > DAEMON_MAX_BACKLOG:
+            logger.warning(f"Market daemon: {c.name} is not reading ({c.sock.bytesToWrite()} bytes queued), dropping")
+            c.sock.abort()
+            return
+        c.sock.write(frame)
+        METRICS.inc("daemon.bytes_out", len(frame))
+
+    def _on_read(self, sock: QLocalSocket):
+        c = self._clients.get(sock)
+        if c is None:
+            return
+        for kind, payload in c.reader.feed(bytes(sock.readAll())):
+            try:
+                self._handle(c, kind, wire.decode(kind, payload))
+            except Exception as e:
+                logger.exception(f"Market daemon: bad request {kind} from {c.name}: {e}")
+
+    def _handle(self, c: _Client, kind: int, args: tuple):
+        if kind in (wire.SUB_TRADES, wire.SUB_BOOK):
+            self._sub(c, "trades" if kind == wire.SUB_TRADES else "book", args[0])
+        elif kind in (wire.UNSUB_TRADES, wire.UNSUB_BOOK):
+            self._unsub(c, "trades" if kind == wire.UNSUB_TRADES else "book", args[0])
+        elif kind == wire.WATCH:
+            self._watch(c, *args)
+        elif kind == wire.UNWATCH:
+            c.watches.discard(args)
+            self._release(args)
+        elif kind == wire.FOCUS:
+            c.focus = args
+            self._refocus()
+        elif kind == wire.FETCH:
+            self._fetch(c, *args)
+        else:
+            logger.warning(f"Market daemon: unexpected frame {kind} from {c.name}")
+
+    # — 1s K 线 / 深度：按品种引用计数，最后一个客户端退订时停止上游订阅 — #
+    def _sub(self, c: _Client, kind: str, inst: str):
+        (c.trades if kind == "trades" else c.books).add(inst)
+        if (kind, inst) in self._streams:
+            return
+        direct = Qt.ConnectionType.DirectConnection     # 在 WebSocket 线程里编码
+        if kind == "trades":
+            s = WSSecCandle(inst, self.manager)
+            s.new_candle.connect(lambda bar: self._stream.emit(("trades", inst), wire.candle(wire.SEC, inst, "1s", bar)),
+                                 direct)
+        else:
+            s = WSOrderBook(inst, self.manager)
+            s.new_book.connect(lambda bids, asks: self._stream.emit(("book", inst), wire.book(inst, s.book.ts, bids, asks)),
+                               direct)
+        self._streams[(kind, inst)] = s
+        s.start()
+
+    def _unsub(self, c: _Client, kind: str, inst: str):
+        (c.trades if kind == "trades" else c.books).discard(inst)
+        if any(inst in (o.trades if kind == "trades" else o.books) for o in self._clients.values()):
+            return
+        s = self._streams.pop((kind, inst), None)
+        if s is not None:
+            s.stop()
+
+    def _fanout(self, key: tuple[str, str], frame: bytes):
+        kind, inst = key
+        for c in list(self._clients.values()):
+            if inst not in (c.trades if kind == "trades" else c.books):
+                continue
+            if kind == "book" and c.sock.bytesToWrite() > DAEMON_BOOK_BACKLOG:
+                METRICS.inc("daemon.books_skipped")
+                continue
+            self._send(c, frame)
+
+    # — 自选列表 — #
+    def _watch(self, c: _Client, inst: str, bar: str):
+        if not self.instruments.valid(inst):
+            self._send(c, wire.error(0, inst, bar, f"未知品种 {inst}"))
+            return
+        c.watches.add((inst, bar))
+        w = self.watch.watch(inst, bar) or self.watch.add(inst, [bar])[0]
+        if w.loaded:
+            self._send(c, wire.bars(0, inst, bar, w.bars.frame(), w.complete))
+            if w.levels is not None:
+                self._send(c, wire.levels(inst, bar, w.levels))
+
+    def _release(self, key: tuple[str, str]):
+        """没有客户端再关注、也不是常驻的 (品种, 周期) 从自选列表移除"""
+        inst, bar = key
+        if (inst in self.base and bar in self.watch.bars) or any(key in o.watches for o in self._clients.values()):
+            return
+        self.watch.remove(inst, [bar])
+
+    def _refocus(self):
+        self.watch.set_visible({c.focus for c in self._clients.values() if c.focus})
+
+    def _to_watchers(self, inst: str, bar: str, frame: bytes):
+        for c in list(self._clients.values()):
+            if (inst, bar) in c.watches:
+                self._send(c, frame)
+
+    def _on_loaded(self, inst: str, bar: str):
+        w = self.watch.watch(inst, bar)
+        if w is not None and any((inst, bar) in c.watches for c in self._clients.values()):
+            self._to_watchers(inst, bar, wire.bars(0, inst, bar, w.bars.frame(), w.complete))
+
+    # — 手动回补：同一区间只跑一个 FetchWorker，结果发给所有请求者 — #
+    def _fetch(self, c: _Client, req: int, inst: str, bar: str, start_ms: int, end_ms: int):
+        key = (inst, bar, start_ms, end_ms)
+        self._fetches.setdefault(key, []).append((c, req))
+        if key in self._workers:
+            return
+        direct = Qt.ConnectionType.DirectConnection
+        wk = self._workers[key] = FetchWorker(inst, bar, start_ms, end_ms, self.cache_dir)
+        wk.progress.connect(lambda d, t: self._fetch_evt.emit(key, "progress", (d, t)), direct)
+        wk.finished.connect(lambda df: self._fetch_evt.emit(key, "done", df), direct)
+        wk.error.connect(lambda msg: self._fetch_evt.emit(key, "error", msg), direct)
+        wk.start()
+
+    def _on_fetch(self, key: tuple, what: str, res):
+        reqs = self._fetches.get(key, [])
+        if what == "progress":
+            for c, req in reqs:
+                self._send(c, wire.progress(req, *res))
+            return
+        self._fetches.pop(key, None)
+        self._workers.pop(key).wait()
+        inst, bar = key[:2]
+        for c, req in reqs:
+            self._send(c, wire.bars(req, inst, bar, res) if what == "done" else wire.error(req, inst, bar, res))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="本机行情守护进程")
+    ap.add_argument("--name",  default=DAEMON_NAME, help="本地套接字名")
+    ap.add_argument("--insts", default=",".join(WATCHLIST), help="常驻品种，逗号分隔")
+    args = ap.parse_args(argv)
+    setup_logging()
+    app = QCoreApplication(sys.argv[:1])
+    daemon = MarketDaemon(args.name, [i for i in args.insts.split(",") if i])
+    if not daemon.listen():
+        sys.exit(1)
+    app.aboutToQuit.connect(daemon.close)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: app.quit())
+    tick = QTimer(); tick.timeout.connect(lambda: None); tick.start(500)   # 让 Python 信号处理有机会运行
+    sys.exit(app.exec())
+
+if __name__ == "__main__":
+    main()
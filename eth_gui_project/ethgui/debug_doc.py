@@ -4,9 +4,10 @@ import sys, platform, json
 from pathlib import Path
 from datetime import datetime
 from .config import DEBUG, CACHE_DIR, PROXIES, VERIFY_SSL, FONT_NAME, DEFAULT_EPS_MUL, DEFAULT_MIN_HITS
+from .metrics import METRICS
 
 def generate_debug_doc():
-    """生成 debug_report.md，包含环境信息和当前配置"""
+    """生成 debug_report.md，包含环境信息、当前配置和运行指标快照"""
     now = datetime.now().isoformat(timespec="seconds")
     lines = [
         f"# Debug Report  —  {now}",
@@ -28,6 +29,11 @@ def generate_debug_doc():
         }, indent=2, ensure_ascii=False),
         "```",
         "",
+        "## 指标快照",
+        "```json",
+        json.dumps(METRICS.snapshot(), indent=2, default=float),
+        "```",
+        "",
         "## 说明",
         "- `logs/debug.log` 包含详细运行日志。",
         "- 本文件可用于排查启动/运行过程中的配置与环境问题。"
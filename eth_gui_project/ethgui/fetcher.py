@@ -3,8 +3,10 @@
 from pathlib import Path
 import pandas as pd
 from PyQt6.QtCore import QThread, pyqtSignal
-from .rest_client import RestClient
-from .config import CACHE_DIR
+from .backfill import Backfiller, plan_windows, fetched_span
+from .store import CandleStore
+from .resample import Deriver
+from .config import CACHE_DIR, DERIVE_BARS
 from .logger import logger
 
 class FetchWorker(QThread):
@@ -12,67 +14,49 @@ class FetchWorker(QThread):
     finished = pyqtSignal(pd.DataFrame)
     error    = pyqtSignal(str)
 
-    def __init__(self, inst, bar, start_ms, end_ms, cache_path: Path):
+    def __init__(self, inst, bar, start_ms, end_ms, cache_dir: Path = CACHE_DIR, columns=None):
         super().__init__()
-        self.client    = RestClient()
         self.inst      = inst
         self.bar       = bar
         self.start_ms  = start_ms
         self.end_ms    = end_ms
-        self.cache     = cache_path
+        self.columns   = columns
+        self.deriver   = Deriver(cache_dir, inst, bar) if bar in DERIVE_BARS else None
+        self.store     = self.deriver.store if self.deriver else CandleStore.open(cache_dir, inst, bar)
 
     def run(self):
         try:
-            df = self._load_cache()
-            if not df.empty:
-                # 如果请求的 start 比缓存最早记录还早，就清空缓存
-                earliest_ms = int(df["ts"].iloc[0].timestamp() * 1000)
-                if self.start_ms < earliest_ms:
-                    logger.debug(f"Requested start {self.start_ms} < cache earliest {earliest_ms}, clearing cache")
-                    df = pd.DataFrame(columns=["ts","open","high","low","close","volume","volumeCcy"])
-
-            newest_ms = int(df["ts"].iloc[-1].timestamp() * 1000) if not df.empty else self.start_ms
-            if newest_ms < self.end_ms:
-                df_new = self._fetch_inc(newest_ms + 1, self.end_ms)
-                df = pd.concat([df, df_new]).drop_duplicates("ts").sort_values("ts")
-                self._save_cache(df)
-            self.finished.emit(df)
+            # 只回补覆盖索引里缺失的区间（最早记录之前、最新记录之后以及中间的洞）；
+            # 可派生的周期优先回补 1m 再本地聚合
+            if self.deriver:
+                jobs = self.deriver.plan(self.start_ms, self.end_ms)
+            else:
+                jobs = [(self.bar, s, e) for s, e in self.store.missing(self.start_ms, self.end_ms)]
+            total = sum(len(plan_windows(s, e, b)) for b, s, e in jobs)
+            done  = 0
+            logger.debug(f"Cache gaps {jobs}")
+            for b, s, e in jobs:
+                df_new = self._fetch_inc(s, e, lambda d, _t, base=done: self.progress.emit(base + d, total), bar=b)
+                done  += len(plan_windows(s, e, b))
+                # 只把实际返回的区间记为已覆盖，接口没有数据的部分下次仍会回补
+                if b == self.bar:
+                    self._save_cache(df_new, fetched_span(df_new, b, (s, e)))
+                else:
+                    self.deriver.base.write(df_new, fetched_span(df_new, b, (s, e)))
+            if self.deriver:
+                self.deriver.materialize(self.start_ms, self.end_ms)
+            self.finished.emit(self._load_cache())
         except Exception as e:
             self.error.emit(str(e))
 
     def _load_cache(self):
-        if self.cache.exists():
-            logger.debug(f"Loading cache {self.cache}")
-            df = pd.read_parquet(self.cache)
-            df["ts"] = pd.to_datetime(df["ts"])
-            return df.sort_values("ts").reset_index(drop=True)
-        return pd.DataFrame(columns=["ts","open","high","low","close","volume","volumeCcy"])
+        logger.debug(f"Loading cache {self.store.dir} [{self.start_ms}, {self.end_ms}]")
+        return self.store.load(self.start_ms, self.end_ms, self.columns)
 
-    def _save_cache(self, df: pd.DataFrame):
-        self.cache.parent.mkdir(parents=True, exist_ok=True)
-        df.to_parquet(self.cache, index=False)
+    def _save_cache(self, df: pd.DataFrame, covered: tuple[int, int] | None):
+        self.store.write(df, covered)
         logger.debug(f"Saved cache rows={len(df)}")
 
-    def _fetch_inc(self, after_ms, end_ms):
-        rows, page, before = [], 0, end_ms
-        while True:
-            data = self.client.get_candles(self.inst, self.bar, before=before, limit=300)
-            if not data:
-                break
-            rows.extend(data[::-1])
-            page += 1
-            self.progress.emit(page, -1)
-            first_ts = int(data[0][0])
-            logger.debug(f"Page {page}: {len(data)} rows, first_ts={first_ts}")
-            if len(data) < 300 or first_ts <= after_ms:
-                break
-            before = first_ts - 1
-        self.progress.emit(1, 1)
-        if not rows:
-            return pd.DataFrame(columns=["ts","open","high","low","close","volume","volumeCcy"])
-        trimmed = [r[:7] for r in rows]
-        df = pd.DataFrame(trimmed, columns=["ts","open","high","low","close","volume","volumeCcy"])
-        df["ts"] = pd.to_datetime(df["ts"].astype(int), unit="ms")
-        for c in ["open","high","low","close","volume"]:
-            df[c] = df[c].astype(float)
-        return df
+    def _fetch_inc(self, after_ms, end_ms, progress=None, bar=None):
+        bf = Backfiller(self.inst, bar or self.bar, progress=progress or self.progress.emit)
+        return bf.fetch(after_ms, end_ms)
@@ -1,25 +1,171 @@
 import numpy as np
 import pandas as pd
-from sklearn.cluster import DBSCAN
-
-def detect_levels(df: pd.DataFrame, eps_mul: float, min_hits: int) -> pd.DataFrame:
-    pivots = []
-    for i in range(2, len(df)-2):
-        if (
-            df["high"][i] == max(df["high"][i-2:i+3])
-            or df["low"][i] == min(df["low"][i-2:i+3])
-        ):
-            pivots.append(df["close"][i])
+from numpy.lib.stride_tricks import sliding_window_view
+from .config import PIVOT_WINDOW, LEVEL_BACKEND
+from .metrics import METRICS
+
+def find_pivots(high: np.ndarray, low: np.ndarray, window: int = PIVOT_WINDOW) -> np.ndarray:
+    """滚动窗口找枢轴点：high 为窗口最大值或 low 为窗口最小值，返回 bool 掩码"""
+    if window < 3 or window % 2 == 0:
+        raise ValueError(f"pivot window must be odd and >= 3, got {window}")
+    high, low = np.asarray(high, dtype=float), np.asarray(low, dtype=float)
+    k, n = window // 2, len(high)
+    mask = np.zeros(n, dtype=bool)
+    if n < window:
+        return mask
+    hmax = sliding_window_view(high, window).max(axis=1)
+    lmin = sliding_window_view(low, window).min(axis=1)
+    mask[k:n-k] = (high[k:n-k] == hmax) | (low[k:n-k] == lmin)
+    return mask
+
+class PivotTracker:
+    """增量枢轴点：追加/更新最后一根 K 线后只复查尾部窗口"""
+
+    def __init__(self, window: int = PIVOT_WINDOW):
+        self.window = window
+        self.mask   = np.zeros(0, dtype=bool)
+        self._seen  = 0          # 上次 update 时的行数
+
+    def reset(self):
+        self.mask  = np.zeros(0, dtype=bool)
+        self._seen = 0
+
+    def update(self, df: pd.DataFrame) -> np.ndarray:
+        n, k = len(df), self.window // 2
+        if n < self._seen:
+            self.reset()
+        if self._seen == 0:
+            self.mask  = find_pivots(df["high"].to_numpy(), df["low"].to_numpy(), self.window)
+            self._seen = n
+            return self.mask
+        # 旧的最后一行可能被改写、其后为新增行，受影响的下标从 lo 开始
+        lo   = max(k, min(self._seen, n) - 1 - k)
+        tail = find_pivots(df["high"].to_numpy()[lo-k:], df["low"].to_numpy()[lo-k:], self.window)
+        mask = np.zeros(n, dtype=bool)
+        mask[:lo] = self.mask[:lo]
+        mask[lo:] = tail[k:]
+        self.mask  = mask
+        self._seen = n
+        return self.mask
+
+    def prices(self, df: pd.DataFrame) -> np.ndarray:
+        return df["close"].to_numpy()[self.mask[:len(df)]]
+
+def _gap_labels(xs: np.ndarray, order: np.ndarray, eps: float, min_hits: int) -> np.ndarray:
+    """有序一维数据上的 DBSCAN：排序 + 间隔扫描，标签/边界点归属与 sklearn 一致（按有序位置返回）"""
+    n = len(xs)
+    labels = np.full(n, -1, dtype=np.intp)
+    if n == 0:
+        return labels
+    cnt  = np.searchsorted(xs, xs + eps, "right") - np.searchsorted(xs, xs - eps, "left")
+    core = cnt >= min_hits
+    cpos = np.flatnonzero(core)
+    if len(cpos) == 0:
+        return labels
+    # 相邻核心点间距 <= eps 即连通
+    comp  = np.concatenate(([0], np.cumsum(np.diff(xs[cpos]) > eps)))
+    ncomp = comp[-1] + 1
+    # sklearn 按原始顺序遇到的第一个核心点给簇编号
+    first = np.full(ncomp, n, dtype=np.intp)
+    np.minimum.at(first, comp, order[cpos])
+    rank = np.empty(ncomp, dtype=np.intp); rank[np.argsort(first, kind="stable")] = np.arange(ncomp)
+    labels[cpos] = rank[comp]
+    # 边界点：左右最近核心点在 eps 内则归属，两边都可达时归编号小（先扩展）的簇
+    border = np.flatnonzero(~core)
+    j = np.searchsorted(cpos, border)
+    left, right = cpos[np.maximum(j - 1, 0)], cpos[np.minimum(j, len(cpos) - 1)]
+    ok_l = (j > 0) & (xs[border] - xs[left] <= eps)
+    ok_r = (j < len(cpos)) & (xs[right] - xs[border] <= eps)
+    ll, lr = labels[left], labels[right]
+    labels[border] = np.where(ok_l & ok_r, np.minimum(ll, lr), np.where(ok_l, ll, np.where(ok_r, lr, -1)))
+    return labels
+
+def _dbscan_labels(pivots: np.ndarray, eps: float, min_hits: int) -> np.ndarray:
+    from sklearn.cluster import DBSCAN
+    return DBSCAN(eps=eps, min_samples=min_hits).fit(pivots.reshape(-1,1)).labels_
+
+def _levels_frame(pivots: np.ndarray, labels: np.ndarray) -> pd.DataFrame:
+    """各簇的均价与点数，按价格升序（bincount 代替 groupby，调参重算时的主要开销）"""
+    ok   = labels != -1
+    hits = np.bincount(labels[ok])
+    keep = np.flatnonzero(hits)
+    sums = np.bincount(labels[ok], weights=pivots[ok])
+    lv   = pd.DataFrame({"price": sums[keep] / hits[keep], "hits": hits[keep]}, index=keep)
+    return lv.sort_values("price")
+
+def cluster_levels(pivots, eps: float, min_hits: int, backend: str = LEVEL_BACKEND) -> pd.DataFrame:
+    """按时间顺序的枢轴价聚类为价位带；backend: "gap"（排序+间隔扫描）或 "dbscan"（sklearn）"""
+    pivots = np.asarray(pivots, dtype=float)
     if len(pivots) < min_hits:
         return pd.DataFrame(columns=["price","hits"])
-    X = np.array(pivots).reshape(-1,1)
-    kms = DBSCAN(eps=df["close"].std()*eps_mul, min_samples=min_hits).fit(X)
-    pv = pd.DataFrame({"price":pivots, "cluster":kms.labels_})
-    lv = (
-        pv.query("cluster!=-1")
-          .groupby("cluster")
-          .agg(price=("price","mean"), hits=("price","size"))
-          .reset_index(drop=True)
-          .sort_values("price")
-    )
-    return lv
+    if backend == "dbscan":
+        return _levels_frame(pivots, _dbscan_labels(pivots, eps, min_hits))
+    if backend != "gap":
+        raise ValueError(f"unknown level backend {backend!r}")
+    order  = np.argsort(pivots, kind="stable")
+    labels = np.empty(len(pivots), dtype=np.intp)
+    labels[order] = _gap_labels(pivots[order], order, eps, min_hits)
+    return _levels_frame(pivots, labels)
+
+class LevelClusterer:
+    """流式一维聚类：维护有序枢轴价，新增/回退枢轴只做有序插入/删除，无需重新拟合"""
+
+    def __init__(self):
+        self.xs    = np.zeros(0)                   # 有序价格
+        self.order = np.zeros(0, dtype=np.intp)    # 对应的时间顺序下标
+        self._src  = np.zeros(0)                   # 时间顺序的枢轴价
+
+    def reset(self):
+        self.__init__()
+
+    def sync(self, pivots):
+        """与最新的（时间顺序）枢轴序列对齐：只处理变化的尾部"""
+        pivots = np.asarray(pivots, dtype=float)
+        m    = min(len(pivots), len(self._src))
+        diff = np.flatnonzero(pivots[:m] != self._src[:m])
+        keep = diff[0] if len(diff) else m
+        if keep < len(self._src):
+            sel = self.order < keep
+            self.xs, self.order = self.xs[sel], self.order[sel]
+        self._src = self._src[:keep]
+        self.add(pivots[keep:])
+
+    def add(self, prices):
+        """追加新的枢轴价（时间顺序在已有之后）"""
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) == 0:
+            return
+        srt = np.argsort(prices, kind="stable")
+        pos = np.searchsorted(self.xs, prices[srt], "right")
+        self.xs    = np.insert(self.xs, pos, prices[srt])
+        self.order = np.insert(self.order, pos, len(self._src) + srt)
+        self._src  = np.concatenate((self._src, prices))
+
+    def levels(self, eps: float, min_hits: int) -> pd.DataFrame:
+        if len(self._src) < min_hits:
+            return pd.DataFrame(columns=["price","hits"])
+        labels = np.empty(len(self._src), dtype=np.intp)
+        labels[self.order] = _gap_labels(self.xs, self.order, eps, min_hits)
+        return _levels_frame(self._src, labels)
+
+def pivot_prices(df: pd.DataFrame, window: int = PIVOT_WINDOW, tracker: PivotTracker | None = None) -> np.ndarray:
+    """时间顺序的枢轴价（收盘价）；与 eps/min_hits 无关，参数变化时可复用"""
+    if tracker is not None:
+        tracker.update(df)
+        return tracker.prices(df)
+    mask = find_pivots(df["high"].to_numpy(), df["low"].to_numpy(), window)
+    return df["close"].to_numpy()[mask]
+
+def levels_from_pivots(pivots, eps: float, min_hits: int, clusterer: LevelClusterer | None = None,
+                       backend: str = LEVEL_BACKEND) -> pd.DataFrame:
+    if clusterer is not None and backend == "gap":
+        clusterer.sync(pivots)
+        return clusterer.levels(eps, min_hits)
+    return cluster_levels(pivots, eps, min_hits, backend)
+
+def detect_levels(df: pd.DataFrame, eps_mul: float, min_hits: int,
+                  window: int = PIVOT_WINDOW, tracker: PivotTracker | None = None,
+                  clusterer: LevelClusterer | None = None, backend: str = LEVEL_BACKEND) -> pd.DataFrame:
+    with METRICS.timer("indicators.detect_levels_ms"):
+        pivots = pivot_prices(df, window, tracker)
+        return levels_from_pivots(pivots, df["close"].std()*eps_mul, min_hits, clusterer, backend)
@@ -0,0 +1,75 @@
+# ethgui/instruments.py
+
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from .config import CACHE_DIR, INST_TYPES, INST_LIST_TTL
+from .rest_client import RestClient
+from .logger import logger
+
+INST_RE = re.compile(r"[A-Z0-9]+(?:-[A-Z0-9]+)+")   # ETH-USDT / ETH-USDT-SWAP / BTC-USD-250627
+
+class Instruments:
+    """OKX 可交易品种列表，用于校验手动输入的 instId。
+    列表缓存在 cache/instruments.json，超过 INST_LIST_TTL 后由后台线程刷新；
+    尚未取到列表（首次启动且离线）时只做格式检查，不因网络问题拒绝所有输入"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, types=INST_TYPES, client_factory=RestClient):
+        self.path    = Path(cache_dir) / "instruments.json"
+        self.types   = list(types)
+        self._client = client_factory
+        self._ids: frozenset[str] = frozenset()
+        self._stamp  = 0.0                 # 列表取得的时刻（epoch 秒）
+        self._lock   = threading.Lock()
+        self._thread: threading.Thread | None = None
+        try:
+            d = json.loads(self.path.read_text(encoding="utf-8"))
+            self._ids, self._stamp = frozenset(d["ids"]), float(d["ts"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Instruments: unreadable {self.path}: {e}")
+
+    @property
+    def known(self) -> bool:
+        """已有品种列表（可能过期）"""
+        return bool(self._ids)
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self._stamp > INST_LIST_TTL
+
+    def valid(self, inst: str) -> bool:
+        if not INST_RE.fullmatch(inst):
+            return False
+        return inst in self._ids if self._ids else True
+
+    def refresh(self, wait: bool = False):
+        """列表过期时在后台线程重新拉取；wait=True 时等待完成"""
+        with self._lock:
+            if self._thread is None and self.stale:
+                self._thread = threading.Thread(target=self._fetch, name="instruments", daemon=True)
+                self._thread.start()
+            t = self._thread
+        if wait and t is not None:
+            t.join()
+
+    def _fetch(self):
+        try:
+            client = self._client()
+            ids = frozenset(i for t in self.types for i in client.get_instruments(t))
+            if not ids:
+                raise RuntimeError("empty instrument list")
+            self._ids, self._stamp = ids, time.time()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"ts": self._stamp, "ids": sorted(ids)}), encoding="utf-8")
+            tmp.replace(self.path)
+            logger.info(f"Instruments: {len(ids)} instIds ({', '.join(self.types)})")
+        except Exception as e:
+            logger.warning(f"Instruments: refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._thread = None
@@ -0,0 +1,90 @@
+# ethgui/lod.py
+
+import numpy as np
+
+class _Level:
+    """一层金字塔：第 b 个桶覆盖原始点 [b*2^k, (b+1)*2^k)，记录最小/最大值及其原始下标"""
+    __slots__ = ("mn", "mni", "mx", "mxi", "n")
+
+    def __init__(self):
+        self.mn,  self.mx  = np.zeros(0), np.zeros(0)
+        self.mni, self.mxi = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        self.n = 0
+
+    def reserve(self, nb: int):
+        if nb <= len(self.mn):
+            return
+        cap = max(nb, 2 * len(self.mn), 16)
+        for name in self.__slots__[:4]:
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype); new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+class MinMaxPyramid:
+    """折线降采样：2 的幂次分桶的 min/max 金字塔，按可见区间和点数预算选层，
+    每个桶输出其最小、最大两点（按时间顺序），可见区间内的极值不会丢失；追加/改最后一点只重算尾部桶"""
+
+    def __init__(self):
+        self.y = np.zeros(0)
+        self.levels: list[_Level] = []
+
+    def rebuild(self, y: np.ndarray):
+        self.y, self.levels = y, []
+        self.update(y, n_old=0)
+
+    def update(self, y: np.ndarray, n_old: int | None = None):
+        """y 为最新的完整序列（可为零拷贝视图）；只有最后一点被改写或在尾部追加时用增量路径"""
+        n_old = len(self.y) if n_old is None else n_old
+        self.y = y
+        n, k = len(y), 1
+        start = max(n_old - 1, 0)          # 受影响的第一个原始点
+        while (1 << (k - 1)) < n:
+            if len(self.levels) < k:
+                self.levels.append(_Level())
+            lv, s = self.levels[k - 1], 1 << k
+            nb = -(-n // s)
+            b0 = min(start // s, lv.n)
+            lv.reserve(nb)
+            self._fill(k, b0, nb)
+            lv.n = nb
+            k += 1
+        del self.levels[k - 1:]
+
+    def _fill(self, k: int, b0: int, b1: int):
+        """由下一层（k=1 时为原始点）计算第 k 层的 [b0, b1) 桶"""
+        c0 = 2 * b0
+        if k == 1:
+            c1  = len(self.y)
+            mn  = mx = self.y[c0:c1]
+            mni = mxi = np.arange(c0, c1, dtype=np.int64)
+        else:
+            src = self.levels[k - 2]
+            c1  = src.n
+            mn, mni, mx, mxi = src.mn[c0:c1], src.mni[c0:c1], src.mx[c0:c1], src.mxi[c0:c1]
+        # 左右孩子两两合并，最后一个桶可能只有左孩子
+        L = np.arange(0, c1 - c0, 2)
+        R = np.minimum(L + 1, c1 - c0 - 1)
+        pick_r = mn[R] < mn[L]
+        lv = self.levels[k - 1]
+        lv.mn[b0:b1]  = np.where(pick_r, mn[R], mn[L])
+        lv.mni[b0:b1] = np.where(pick_r, mni[R], mni[L])
+        pick_r = mx[R] > mx[L]
+        lv.mx[b0:b1]  = np.where(pick_r, mx[R], mx[L])
+        lv.mxi[b0:b1] = np.where(pick_r, mxi[R], mxi[L])
+
+    def query(self, i0: int, i1: int, budget: int) -> np.ndarray:
+        """原始下标区间 [i0, i1) 在不超过约 budget 个点时的下标选取（升序）"""
+        i0, i1 = max(i0, 0), min(i1, len(self.y))
+        count  = i1 - i0
+        if count <= max(budget, 2):
+            return np.arange(i0, i1)
+        k = min(int(np.ceil(np.log2(2 * count / max(budget, 2)))), len(self.levels))
+        lv, s = self.levels[k - 1], 1 << k
+        # 只用完全落在区间内的桶；首尾只露出一部分的桶，其记录的极值可能在区间外，改为直接扫原始点（各不足 s 个）
+        b0, b1 = -(-i0 // s), i1 // s
+        parts = [(i0, b0 * s), (b1 * s, i1)] if b0 < b1 else [(i0, i1)]
+        edge = [p + f(self.y[p:q]) for p, q in parts if q > p for f in (np.argmin, np.argmax)]
+        a, b = lv.mni[b0:b1], lv.mxi[b0:b1]
+        idx = np.column_stack((np.minimum(a, b), np.maximum(a, b))).ravel()
+        # 首尾点保留，保证折线覆盖整个可见区间
+        return np.unique(np.concatenate(([i0], edge, idx, [i1 - 1]))).astype(np.int64)
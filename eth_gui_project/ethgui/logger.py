@@ -1,18 +1,26 @@
 # ethgui/logger.py
 
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
 from pathlib import Path
 from datetime import datetime
-from .config import DEBUG
+from .config import DEBUG, LOG_DIR, LOG_MAX_BYTES, LOG_BACKUPS, LOG_KEEP_RUNS, LOG_RAW_RATE, LOG_RAW_CHARS
+from .metrics import METRICS
 
-# 创建日志目录
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-
-# 根据当前时间戳生成每次运行的日志文件名
+# 每次运行的日志文件名；目录与文件由入口的 setup_logging() 创建，导入本模块不写磁盘
+log_dir = Path(LOG_DIR)
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 log_file = log_dir / f"debug_{timestamp}.log"
 
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """入队时不格式化：消息拼接、时间格式化和文件 I/O 全部在后台写线程完成，调用线程只做一次入队"""
+
+    def prepare(self, record):
+        return record
+
 # 获取 logger
 logger = logging.getLogger("ethgui")
 logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
@@ -22,13 +30,76 @@ ch = logging.StreamHandler()
 ch.setLevel(logging.DEBUG if DEBUG else logging.INFO)
 fmt = "[%(asctime)s] %(levelname)s: %(message)s"
 ch.setFormatter(logging.Formatter(fmt, "%H:%M:%S"))
-logger.addHandler(ch)
 
-# 文件输出，每次运行一个新文件
-fh = logging.FileHandler(log_file, encoding="utf-8")
-fh.setLevel(logging.DEBUG)
-fh.setFormatter(logging.Formatter(fmt, "%Y-%m-%d %H:%M:%S"))
-logger.addHandler(fh)
+# logger 只挂队列，输出由后台线程消费；文件输出在 setup_logging() 时加入
+_queue    = queue.SimpleQueue()
+_listener = logging.handlers.QueueListener(_queue, ch, respect_handler_level=True)
+fh: logging.Handler | None = None
+logger.addHandler(_LazyQueueHandler(_queue))
+logger.propagate = False
+_listener.start()
+METRICS.gauge("queue.log", _queue.qsize)
+atexit.register(_listener.stop)
+
+class RawSampler:
+    """原始帧日志限速：每个 key 每秒最多记录 rate 条，其余只计数，下一条放行时附带被省略的条数"""
+
+    def __init__(self, rate: float = LOG_RAW_RATE):
+        self.rate = rate
+        self._win: dict = {}     # key -> [窗口起点, 本窗口已记录, 已省略]
+
+    def allow(self, key) -> int | None:
+        """放行返回此前省略的条数，否则返回 None"""
+        if self.rate <= 0:
+            return None
+        now = time.monotonic()
+        w = self._win.get(key)
+        if w is None or now - w[0] >= 1.0:
+            skipped = w[2] if w else 0
+            self._win[key] = [now, 1, 0]
+            return skipped
+        if w[1] < self.rate:
+            w[1] += 1
+            skipped, w[2] = w[2], 0
+            return skipped
+        w[2] += 1
+        return None
+
+_raw_sampler = RawSampler()
+
+def log_raw(key, raw):
+    """热路径原始帧日志：未开 DEBUG 时只有一次级别判断；开启后按 key 限速、截断到 LOG_RAW_CHARS"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    skipped = _raw_sampler.allow(key)
+    if skipped is None:
+        return
+    if skipped:
+        logger.debug("WS RAW %s (+%d skipped): %.*s", key, skipped, LOG_RAW_CHARS, raw)
+    else:
+        logger.debug("WS RAW %s: %.*s", key, LOG_RAW_CHARS, raw)
+
+def prune_logs(keep: int = LOG_KEEP_RUNS):
+    """只保留最近 keep 次运行的日志（含各自的轮转文件）；由 setup_logging() 调用，导入本模块不删任何文件"""
+    for old in sorted(log_dir.glob("debug_*.log"), reverse=True):
+        if old == log_file:
+            continue
+        keep -= 1
+        if keep > 0:
+            continue
+        for p in log_dir.glob(old.name + "*"):
+            p.unlink(missing_ok=True)
 
-# 简单提示
-logger.debug(f"Logging to console and file: {log_file}")
+def setup_logging() -> Path:
+    """由各入口的 main() 调用：创建日志目录，挂上本次运行的文件输出（超过 LOG_MAX_BYTES 轮转），并清理旧日志"""
+    global fh
+    if fh is None:
+        log_dir.mkdir(exist_ok=True)
+        fh = logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                  encoding="utf-8", delay=True)
+        fh.setLevel(logging.DEBUG)
+        fh.setFormatter(logging.Formatter(fmt, "%Y-%m-%d %H:%M:%S"))
+        _listener.handlers = (*_listener.handlers, fh)
+        prune_logs()
+        logger.debug("Logging to console and file: %s", log_file)
+    return log_file
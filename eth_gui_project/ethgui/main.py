@@ -1,13 +1,19 @@
-import sys 
+import sys
+import threading
+from .startup import PROFILE
 from PyQt6.QtWidgets import QApplication
 from .ui import MainWindow
 from .debug_doc import generate_debug_doc
+from .logger import setup_logging
 
 def main():
-    generate_debug_doc()
+    setup_logging()
     app = QApplication(sys.argv)
     win = MainWindow()
     win.show()
+    PROFILE.mark("window")
+    # 环境报告不阻塞首帧
+    threading.Thread(target=generate_debug_doc, name="debug-doc", daemon=True).start()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
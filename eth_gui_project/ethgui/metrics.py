@@ -0,0 +1,127 @@
+# ethgui/metrics.py
+
+import json
+import time
+import threading
+from pathlib import Path
+from array import array
+from contextlib import contextmanager
+from .config import METRICS_WINDOW
+
+class Counter:
+    """累计计数 + 最近一整秒的速率（按秒分桶，inc 为 O(1)）"""
+    __slots__ = ("total", "_sec", "_cur", "_last", "_lock")
+
+    def __init__(self):
+        self.total = 0
+        self._sec, self._cur, self._last = 0, 0, 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1):
+        s = int(time.monotonic())
+        with self._lock:
+            if s != self._sec:
+                self._last = self._cur if s == self._sec + 1 else 0
+                self._sec, self._cur = s, 0
+            self._cur  += n
+            self.total += n
+
+    def rate(self) -> float:
+        s = int(time.monotonic())
+        with self._lock:
+            if s == self._sec:
+                return self._last
+            return self._cur if s == self._sec + 1 else 0
+
+class Histogram:
+    """最近 size 个样本的环形窗口（分位数）+ 全程计数/均值/最大值"""
+    __slots__ = ("count", "total", "max", "_buf", "_lock")
+
+    def __init__(self, size: int = METRICS_WINDOW):
+        self.count, self.total, self.max = 0, 0.0, 0.0
+        self._buf  = array("d", bytes(8 * size))    # 不依赖 numpy，启动路径上不必导入
+        self._lock = threading.Lock()
+
+    def observe(self, v: float):
+        with self._lock:
+            self._buf[self.count % len(self._buf)] = v
+            self.count += 1
+            self.total += v
+            if v > self.max:
+                self.max = v
+
+    def summary(self) -> dict:
+        with self._lock:
+            win = self._buf[:min(self.count, len(self._buf))]
+            count, total, mx = self.count, self.total, self.max
+        if not count:
+            return {"count": 0}
+        import numpy as np
+        p50, p90, p99 = np.percentile(win, [50, 90, 99])
+        return {"count": count, "mean": total / count, "p50": p50, "p90": p90, "p99": p99, "max": mx}
+
+class Metrics:
+    """进程内指标注册表：计数器/直方图按名字懒创建，队列深度等用回调型 gauge 在快照时采样；
+    耗时类直方图统一以毫秒为单位"""
+
+    def __init__(self):
+        self._counters: dict[str, Counter]   = {}
+        self._hists:    dict[str, Histogram] = {}
+        self._gauges:   dict[str, object]    = {}
+        self._lock    = threading.Lock()
+        self.started  = time.time()
+
+    def counter(self, name: str) -> Counter:
+        c = self._counters.get(name)
+        if c is None:
+            with self._lock:
+                c = self._counters.setdefault(name, Counter())
+        return c
+
+    def histogram(self, name: str) -> Histogram:
+        h = self._hists.get(name)
+        if h is None:
+            with self._lock:
+                h = self._hists.setdefault(name, Histogram())
+        return h
+
+    def inc(self, name: str, n: int = 1):
+        self.counter(name).inc(n)
+
+    def observe(self, name: str, v: float):
+        self.histogram(name).observe(v)
+
+    @contextmanager
+    def timer(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - t) * 1000)
+
+    def gauge(self, name: str, fn):
+        """fn() 在快照时调用，返回当前值（如队列长度）"""
+        self._gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        gauges = {}
+        for name, fn in list(self._gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception:
+                gauges[name] = None
+        return {
+            "uptime_s":   round(time.time() - self.started, 1),
+            "counters":   {k: {"total": c.total, "rate": c.rate()} for k, c in sorted(self._counters.items())},
+            "histograms": {k: h.summary() for k, h in sorted(self._hists.items())},
+            "gauges":     dict(sorted(gauges.items())),
+        }
+
+    def export(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2, default=float), encoding="utf-8")
+        return path
+
+# 全进程共享
+METRICS = Metrics()
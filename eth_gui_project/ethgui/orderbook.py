@@ -0,0 +1,113 @@
+# ethgui/orderbook.py
+
+import zlib
+import numpy as np
+
+class _Side:
+    """一侧深度：按“越优越靠前”排序的数组（买盘以 -price 为键），另存原始字符串供校验和使用"""
+
+    def __init__(self, descending: bool):
+        self.sign  = -1.0 if descending else 1.0
+        self.keys  = np.zeros(0)      # sign*price，升序
+        self.sizes = np.zeros(0)
+        self.raw: dict[float, tuple[str, str]] = {}
+
+    def clear(self):
+        self.keys, self.sizes, self.raw = np.zeros(0), np.zeros(0), {}
+
+    def apply(self, levels: list[list[str]]):
+        """合并增量档位（[px, sz, ...]，sz 为 0 表示删除）"""
+        if not levels:
+            return
+        uniq = {float(l[0]): l for l in levels}     # 同一价格以最后一条为准
+        levels = list(uniq.values())
+        px = np.fromiter(uniq.keys(), dtype=float, count=len(uniq))
+        sz = np.array([float(l[1]) for l in levels])
+        for l, p, s in zip(levels, px, sz):
+            if s == 0:
+                self.raw.pop(p, None)
+            else:
+                self.raw[p] = (l[0], l[1])
+        k   = px * self.sign
+        pos = np.searchsorted(self.keys, k)
+        hit = pos < len(self.keys)
+        hit[hit] = self.keys[pos[hit]] == k[hit]
+        self.sizes[pos[hit]] = sz[hit]
+        new = ~hit & (sz > 0)
+        if new.any():
+            nk, ns = k[new], sz[new]
+            o = np.argsort(nk, kind="stable")
+            ins = np.searchsorted(self.keys, nk[o])
+            self.keys  = np.insert(self.keys, ins, nk[o])
+            self.sizes = np.insert(self.sizes, ins, ns[o])
+        if (sz == 0).any():
+            keep = self.sizes > 0
+            self.keys, self.sizes = self.keys[keep], self.sizes[keep]
+
+    def prices(self, n: int | None = None) -> np.ndarray:
+        return self.keys[:n] * self.sign
+
+class OrderBook:
+    """OKX 深度簿：snapshot + update 增量合并、CRC32 校验和、seqId 连续性检查"""
+
+    def __init__(self):
+        self.bids = _Side(descending=True)
+        self.asks = _Side(descending=False)
+        self.seq  = None
+        self.ts   = 0
+
+    def reset(self):
+        self.bids.clear(); self.asks.clear()
+        self.seq = None
+
+    def apply(self, msg: dict, action: str = "snapshot") -> bool:
+        """应用一条 data 元素；返回 False 表示序号不连续或校验和不符，需要重新订阅快照"""
+        if action == "snapshot":
+            self.reset()
+        elif self.seq is not None and msg.get("prevSeqId") not in (None, self.seq):
+            return False
+        self.bids.apply(msg.get("bids", []))
+        self.asks.apply(msg.get("asks", []))
+        self.seq = msg.get("seqId", self.seq)
+        self.ts  = int(msg.get("ts", 0))
+        cs = msg.get("checksum")
+        return cs is None or int(cs) == self.checksum()
+
+    def checksum(self) -> int:
+        """OKX 校验：前 25 档按 bid:ask 交错拼接原始字符串后取有符号 CRC32"""
+        parts = []
+        bk, ak = self.bids.keys[:25], self.asks.keys[:25]
+        for i in range(max(len(bk), len(ak))):
+            if i < len(bk):
+                parts.extend(self.bids.raw[bk[i] * self.bids.sign])
+            if i < len(ak):
+                parts.extend(self.asks.raw[ak[i] * self.asks.sign])
+        crc = zlib.crc32(":".join(parts).encode())
+        return crc - (1 << 32) if crc >= 1 << 31 else crc
+
+    # — 查询 — #
+    def top(self, n: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """前 n 档，各返回 (n,2) 的 [price, size] 数组（买盘价格降序、卖盘升序）"""
+        bids = np.column_stack((self.bids.prices(n), self.bids.sizes[:n]))
+        asks = np.column_stack((self.asks.prices(n), self.asks.sizes[:n]))
+        return bids, asks
+
+    def depth_at(self, price: float) -> float:
+        """指定价格档位上的挂单量（买卖任一侧），不存在为 0"""
+        for side in (self.bids, self.asks):
+            k = price * side.sign
+            i = np.searchsorted(side.keys, k)
+            if i < len(side.keys) and side.keys[i] == k:
+                return float(side.sizes[i])
+        return 0.0
+
+    def cum_size(self, side: str, price: float) -> float:
+        """从最优价到 price（含）的累计挂单量；side 取 bid 或 ask"""
+        s = self.bids if side == "bid" else self.asks
+        i = np.searchsorted(s.keys, price * s.sign, side="right")
+        return float(s.sizes[:i].sum())
+
+    def best(self) -> tuple[float, float]:
+        bid = float(self.bids.prices(1)[0]) if len(self.bids.keys) else float("nan")
+        ask = float(self.asks.prices(1)[0]) if len(self.asks.keys) else float("nan")
+        return bid, ask
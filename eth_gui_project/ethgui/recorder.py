@@ -0,0 +1,91 @@
+# ethgui/recorder.py
+
+import atexit
+import threading
+from pathlib import Path
+from datetime import datetime
+import pyarrow as pa
+from .config import RECORD_DIR, RECORD_CHUNK, RECORD_FLUSH_S, RECORD_COMPRESSION
+from .logger import logger
+from .metrics import METRICS
+
+SCHEMA = pa.schema([
+    ("recv_ns", pa.int64()),     # 本机收到该帧的时刻（time.time_ns）
+    ("channel", pa.string()),
+    ("inst",    pa.string()),
+    ("raw",     pa.string()),    # 交易所原始文本帧，回放时原样交给 WSManager._dispatch
+])
+
+class Recorder:
+    """WebSocket 原始帧录制：Arrow IPC 流格式（只追加、按批压缩，可 memory map 读取）。
+    add 只在调用线程里追加到列表；满 RECORD_CHUNK 帧或每 RECORD_FLUSH_S 秒由后台线程写一批。
+    进程异常退出时最多丢失最后一批，已写入的批仍可读"""
+
+    def __init__(self, path: Path | None = None, chunk: int = RECORD_CHUNK,
+                 flush_s: float = RECORD_FLUSH_S, compression: str | None = RECORD_COMPRESSION):
+        self.path = Path(path) if path else RECORD_DIR / f"ws_{datetime.now():%Y%m%d_%H%M%S}.arrows"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk, self.flush_s = chunk, flush_s
+        self.frames  = 0          # 已落盘帧数
+        self._cols   = ([], [], [], [])
+        self._lock   = threading.Lock()
+        self._wake   = threading.Event()
+        self._closed = False
+        self._sink   = pa.OSFile(str(self.path), "wb")
+        self._writer = pa.ipc.new_stream(self._sink, SCHEMA, options=pa.ipc.IpcWriteOptions(compression=compression))
+        self._thread = threading.Thread(target=self._run, name="ws-recorder", daemon=True)
+        self._thread.start()
+        METRICS.gauge("queue.recorder", lambda: len(self._cols[0]))
+        atexit.register(self.close)
+        logger.info(f"Recording WebSocket frames to {self.path}")
+
+    def add(self, recv_ns: int, channel: str, inst: str, raw: str):
+        with self._lock:
+            c = self._cols
+            c[0].append(recv_ns); c[1].append(channel); c[2].append(inst); c[3].append(raw)
+            full = len(c[0]) >= self.chunk
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            cols, self._cols = self._cols, ([], [], [], [])
+        if not cols[0]:
+            return
+        try:
+            self._writer.write_batch(pa.record_batch([pa.array(c, f.type) for c, f in zip(cols, SCHEMA)],
+                                                     schema=SCHEMA))
+            self._sink.flush()
+            self.frames += len(cols[0])
+            METRICS.inc("recorder.frames", len(cols[0]))
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Recorder write to {self.path} failed: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._flush()
+        self._writer.close()
+        self._sink.close()
+        logger.info(f"Recorded {self.frames} frames to {self.path}")
+
+def iter_batches(path: Path):
+    """按批读取录制文件（memory map，批内缓冲引用映射而非拷贝）；
+    正在写入或被截断的文件读到最后一个完整批为止"""
+    try:
+        for batch in pa.ipc.open_stream(pa.memory_map(str(path))):
+            yield batch
+    except (pa.ArrowInvalid, OSError) as e:
+        logger.warning(f"Recording {path} ends with an incomplete batch: {e}")
+
+def read_recording(path: Path) -> pa.Table:
+    return pa.Table.from_batches(list(iter_batches(path)), schema=SCHEMA)
@@ -0,0 +1,331 @@
+# ethgui/remote.py
+"""GUI 的守护进程客户端模式：DaemonClient 连接本机 ethgui.daemon；
+RemoteWatchlist / RemoteSecCandle / RemoteOrderBook / RemoteFetch 的信号与方法和
+Watchlist / WSSecCandle / WSOrderBook / FetchWorker 一致，MainWindow 按模式选用其一"""
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QLocalSocket
+from .config import DAEMON_NAME, DAEMON_CONNECT_MS, WATCH_BARS, WS_RECONNECT_MIN, WS_RECONNECT_MAX
+from . import wire
+from .series import BarBuffer
+from .metrics import METRICS
+from .logger import logger
+
+class DaemonClient(QObject):
+    """一条本地套接字连接；订阅按引用计数，断线后指数退避重连并重发全部订阅与当前视图"""
+
+    sec      = pyqtSignal(str, str, dict)               # 品种, "1s", K 线
+    candle   = pyqtSignal(str, str, dict)               # 自选列表实时 K 线
+    book     = pyqtSignal(str, object, object, object)  # 品种, ts（毫秒）, bids, asks
+    levels   = pyqtSignal(str, str, object)
+    bars     = pyqtSignal(int, str, str, bool, object)  # 请求号（0 为自选列表）, 品种, 周期, 缺口已回补, DataFrame
+    progress = pyqtSignal(int, int, int)
+    error    = pyqtSignal(int, str, str, str)
+    connected    = pyqtSignal()
+    disconnected = pyqtSignal()
+
+    _UNSUB = {wire.SUB_TRADES: wire.UNSUB_TRADES, wire.SUB_BOOK: wire.UNSUB_BOOK, wire.WATCH: wire.UNWATCH}
+
+    @classmethod
+    def connect_to(cls, name: str = DAEMON_NAME, timeout_ms: int = DAEMON_CONNECT_MS, parent=None) -> "DaemonClient | None":
+        """守护进程未运行时返回 None"""
+        c = cls(name, parent)
+        c.sock.connectToServer(name)
+        if c.sock.waitForConnected(timeout_ms):
+            logger.info(f"Connected to market daemon {c.sock.fullServerName()}")
+            return c
+        c.deleteLater()
+        return None
+
+    def __init__(self, name: str = DAEMON_NAME, parent=None):
+        super().__init__(parent)
+        self.name   = name
+        self.reader = wire.FrameReader()
+        self._subs: dict[tuple[int, str, str], int] = {}
+        self._focus: tuple[str, str] | None = None
+        self._req   = 0
+        self._delay = WS_RECONNECT_MIN
+        self._ever_connected = False
+        self._retrying = False
+        self._signals = {wire.SEC: self.sec, wire.CANDLE: self.candle, wire.BOOK: self.book, wire.LEVELS: self.levels,
+                         wire.BARS: self.bars, wire.PROGRESS: self.progress, wire.ERROR: self.error}
+        self.sock = QLocalSocket(self)
+        self.sock.readyRead.connect(self._on_read)
+        self.sock.connected.connect(self._on_connected)
+        self.sock.disconnected.connect(self._on_disconnected)
+        self.sock.errorOccurred.connect(self._on_error)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.sock.state() == QLocalSocket.LocalSocketState.ConnectedState
+
+    # — 请求 — #
+    def subscribe(self, kind: int, inst: str, bar: str = ""):
+        key = (kind, inst, bar)
+        self._subs[key] = self._subs.get(key, 0) + 1
+        if self._subs[key] == 1:
+            self._write(wire.key(kind, inst, bar))
+
+    def unsubscribe(self, kind: int, inst: str, bar: str = ""):
+        key = (kind, inst, bar)
+        if self._subs.get(key, 0) > 1:
+            self._subs[key] -= 1
+        elif self._subs.pop(key, None) is not None:
+            self._write(wire.key(self._UNSUB[kind], inst, bar))
+
+    def focus(self, inst: str, bar: str):
+        self._focus = (inst, bar)
+        self._write(wire.key(wire.FOCUS, inst, bar))
+
+    def fetch(self, inst: str, bar: str, start_ms: int, end_ms: int) -> int | None:
+        """返回请求号；未连接时返回 None"""
+        if not self.is_connected:
+            return None
+        self._req += 1
+        self._write(wire.fetch(self._req, inst, bar, start_ms, end_ms))
+        return self._req
+
+    def _write(self, frame: bytes):
+        if self.is_connected:
+            self.sock.write(frame)
+
+    # — 接收与重连 — #
+    def _on_read(self):
+        for kind, payload in self.reader.feed(bytes(self.sock.readAll())):
+            sig = self._signals.get(kind)
+            if sig is None:
+                logger.warning(f"DaemonClient: unexpected frame {kind}")
+                continue
+            METRICS.inc("daemon.frames_in")
+            sig.emit(*wire.decode(kind, payload))
+
+    def _on_connected(self):
+        self._ever_connected = True
+        self._delay  = WS_RECONNECT_MIN
+        self.reader  = wire.FrameReader()
+        for kind, inst, bar in self._subs:
+            self._write(wire.key(kind, inst, bar))
+        if self._focus:
+            self._write(wire.key(wire.FOCUS, *self._focus))
+        self.connected.emit()
+
+    def _on_disconnected(self):
+        logger.warning("Market daemon connection lost")
+        self.disconnected.emit()
+        self._retry()
+
+    def _on_error(self, err):
+        # 重连失败（守护进程尚未起来）不会触发 disconnected；启动时的探测失败不重试
+        if self._ever_connected and self.sock.state() == QLocalSocket.LocalSocketState.ConnectingState:
+            logger.debug(f"DaemonClient: {err.name}")
+            self._retry()
+
+    def _retry(self):
+        if self._retrying:
+            return
+        self._retrying = True
+        wait, self._delay = self._delay, min(self._delay * 2, WS_RECONNECT_MAX)
+        def reconnect():
+            self._retrying = False
+            self.sock.connectToServer(self.name)
+        QTimer.singleShot(int(wait * 1000), reconnect)
+
+class RemoteSecCandle(QObject):
+    """守护进程聚合好的 1s K 线（对应 WSSecCandle.new_candle）"""
+    new_candle = pyqtSignal(dict)
+    channel = "trades"
+
+    def __init__(self, inst: str, client: DaemonClient):
+        super().__init__()
+        self.inst, self.client = inst, client
+
+    def start(self):
+        self.client.sec.connect(self._on_sec)
+        self.client.subscribe(wire.SUB_TRADES, self.inst)
+
+    def stop(self):
+        self.client.unsubscribe(wire.SUB_TRADES, self.inst)
+        self.client.sec.disconnect(self._on_sec)
+
+    def _on_sec(self, inst: str, _bar: str, bar: dict):
+        if inst == self.inst:
+            self.new_candle.emit(bar)
+
+class _BookTop:
+    """守护进程推送的前 N 档；ts 与 OrderBook.ts 同义"""
+    __slots__ = ("ts", "bids", "asks")
+
+    def __init__(self):
+        self.ts, self.bids, self.asks = 0, None, None
+
+class RemoteOrderBook(QObject):
+    """守护进程合并、校验后的前 N 档（对应 WSOrderBook.new_book）"""
+    new_book = pyqtSignal(object, object)
+
+    def __init__(self, inst: str, client: DaemonClient):
+        super().__init__()
+        self.inst, self.client = inst, client
+        self.book = _BookTop()
+
+    def start(self):
+        self.client.book.connect(self._on_book)
+        self.client.subscribe(wire.SUB_BOOK, self.inst)
+
+    def stop(self):
+        self.client.unsubscribe(wire.SUB_BOOK, self.inst)
+        self.client.book.disconnect(self._on_book)
+
+    def _on_book(self, inst: str, ts: int, bids, asks):
+        if inst == self.inst:
+            self.book.ts, self.book.bids, self.book.asks = ts, bids, asks
+            self.new_book.emit(bids, asks)
+
+class RemoteWatch:
+    """与 watchlist.Watch 对应的只读状态：K 线由守护进程整块下发，之后按实时 K 线合并"""
+
+    def __init__(self, inst: str, bar: str):
+        self.inst, self.bar = inst, bar
+        self.bars     = BarBuffer()
+        self.levels   = None
+        self.loaded   = False
+        self.complete = False
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.inst, self.bar
+
+class RemoteWatchlist(QObject):
+    """与 Watchlist 相同的信号；加载、回补、落盘与分析都在守护进程里完成"""
+
+    loaded       = pyqtSignal(str, str)
+    updated      = pyqtSignal(str, str, dict)
+    levels_ready = pyqtSignal(str, str, object)
+    error        = pyqtSignal(str, str, str)
+
+    def __init__(self, client: DaemonClient, insts=(), bars=WATCH_BARS, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.bars   = list(bars)
+        self._watches: dict[tuple[str, str], RemoteWatch] = {}
+        self._transient: set[tuple[str, str]] = set()      # 只因 focus 加入的，焦点移走时 UNWATCH，守护进程随之释放
+        client.bars.connect(self._on_bars)
+        client.candle.connect(self._on_candle)
+        client.levels.connect(self._on_levels)
+        client.error.connect(self._on_error)
+        for inst in insts:
+            self.add(inst)
+
+    def add(self, inst: str, bars=None) -> list[RemoteWatch]:
+        out = []
+        for bar in bars or self.bars:
+            w = self._watches.get((inst, bar))
+            if w is None:
+                w = self._watches[(inst, bar)] = RemoteWatch(inst, bar)
+                self.client.subscribe(wire.WATCH, inst, bar)
+            self._transient.discard((inst, bar))
+            out.append(w)
+        return out
+
+    def remove(self, inst: str, bars=None):
+        for key in [k for k in self._watches if k[0] == inst and (bars is None or k[1] in bars)]:
+            self._drop(key)
+
+    def _drop(self, key: tuple[str, str]):
+        del self._watches[key]
+        self._transient.discard(key)
+        self.client.unsubscribe(wire.WATCH, *key)
+
+    def watch(self, inst: str, bar: str) -> RemoteWatch | None:
+        return self._watches.get((inst, bar))
+
+    def focus(self, inst: str, bar: str) -> RemoteWatch:
+        """与 Watchlist.focus 相同：不在列表中则临时加入，焦点移到别处时移除"""
+        key = (inst, bar)
+        for k in self._transient - {key}:
+            self._drop(k)
+        w = self.watch(inst, bar)
+        if w is None:
+            w = self.add(inst, [bar])[0]
+            self._transient.add(key)
+        self.client.focus(inst, bar)
+        return w
+
+    def close(self):
+        for key in list(self._watches):
+            self.client.unsubscribe(wire.WATCH, *key)
+        self._watches.clear()
+        self._transient.clear()
+
+    def _on_bars(self, req: int, inst: str, bar: str, complete: bool, df):
+        w = self._watches.get((inst, bar))
+        if req or w is None:
+            return
+        w.bars = BarBuffer.from_frame(df); w.bars.mark_spilled()
+        w.loaded, w.complete = True, complete
+        self.loaded.emit(inst, bar)
+
+    def _on_candle(self, inst: str, bar: str, candle: dict):
+        w = self._watches.get((inst, bar))
+        if w is None or not w.loaded:
+            return
+        w.bars.push(candle)
+        self.updated.emit(inst, bar, candle)
+
+    def _on_levels(self, inst: str, bar: str, lv):
+        w = self._watches.get((inst, bar))
+        if w is not None:
+            w.levels = lv
+            self.levels_ready.emit(inst, bar, lv)
+
+    def _on_error(self, req: int, inst: str, bar: str, msg: str):
+        if req == 0:
+            self.error.emit(inst, bar, msg)
+
+class RemoteFetch(QObject):
+    """由守护进程回补并写入 K 线库（对应 FetchWorker 的 progress/finished/error）"""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    error    = pyqtSignal(str)
+
+    def __init__(self, client: DaemonClient, inst: str, bar: str, start_ms: int, end_ms: int):
+        super().__init__()
+        self.client = client
+        self.inst, self.bar, self.start_ms, self.end_ms = inst, bar, start_ms, end_ms
+        self.req = None
+
+    def start(self):
+        self.req = self.client.fetch(self.inst, self.bar, self.start_ms, self.end_ms)
+        if self.req is None:
+            self.error.emit("行情守护进程未连接")
+            return
+        self.client.progress.connect(self._on_progress)
+        self.client.bars.connect(self._on_bars)
+        self.client.error.connect(self._on_error)
+        self.client.disconnected.connect(self._on_lost)
+
+    def isRunning(self) -> bool:
+        return self.req is not None
+
+    def _finish(self):
+        self.req = None
+        for sig, slot in ((self.client.progress, self._on_progress), (self.client.bars, self._on_bars),
+                          (self.client.error, self._on_error), (self.client.disconnected, self._on_lost)):
+            sig.disconnect(slot)
+
+    def _on_progress(self, req: int, done: int, total: int):
+        if req == self.req:
+            self.progress.emit(done, total)
+
+    def _on_bars(self, req: int, _inst: str, _bar: str, _complete: bool, df):
+        if req == self.req:
+            self._finish()
+            self.finished.emit(df)
+
+    def _on_error(self, req: int, _inst: str, _bar: str, msg: str):
+        if req == self.req:
+            self._finish()
+            self.error.emit(msg)
+
+    def _on_lost(self):
+        self._finish()
+        self.error.emit("行情守护进程已断开")
@@ -0,0 +1,90 @@
+# ethgui/render.py
+
+import time
+from PyQt6.QtCore import QObject, QTimer
+from .config import RENDER_FPS
+from .logger import logger
+from .metrics import METRICS
+
+class _View:
+    __slots__ = ("name", "renderer", "min_dt", "pending", "state", "last", "since",
+                 "posted", "rendered", "coalesced")
+
+    def __init__(self, name, renderer, fps):
+        self.name     = name
+        self.renderer = renderer
+        self.min_dt   = 1.0 / fps if fps else 0.0
+        self.pending  = False
+        self.state    = None
+        self.last     = 0.0
+        self.since    = 0.0       # 本轮第一次 post 的时间
+        self.posted = self.rendered = self.coalesced = 0
+
+class RenderScheduler(QObject):
+    """渲染调度：每个视图只保留最新状态，定时器按固定帧率统一重绘，统计合并次数与丢帧"""
+
+    def __init__(self, fps: float = RENDER_FPS, parent=None):
+        super().__init__(parent)
+        self._views: dict[str, _View] = {}
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self.dropped = 0                # 帧处理超时导致错过的帧数
+        self._last_tick = 0.0
+        self.set_fps(fps)
+
+    def set_fps(self, fps: float):
+        self.fps = fps
+        self._timer.setInterval(max(1, int(1000 / fps)))
+
+    def register(self, name: str, renderer, fps: float | None = None):
+        """renderer(state) 在 GUI 线程调用；fps 可为该视图单独设置更低的上限"""
+        self._views[name] = _View(name, renderer, fps)
+
+    def start(self):
+        self._last_tick = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def post(self, name: str, state=None):
+        """提交最新状态；尚未绘制的旧状态直接被覆盖"""
+        v = self._views[name]
+        v.posted += 1
+        if v.pending:
+            v.coalesced += 1
+        else:
+            v.since = time.perf_counter()
+        v.pending, v.state = True, state
+
+    def _tick(self):
+        now = time.perf_counter()
+        interval = self._timer.interval() / 1000
+        late = now - self._last_tick
+        if late > 1.5 * interval:
+            self.dropped += int(late / interval) - 1
+        self._last_tick = now
+        for v in self._views.values():
+            if not v.pending or now - v.last < v.min_dt:
+                continue
+            state, v.pending, v.state = v.state, False, None
+            v.last = now
+            try:
+                v.renderer(state)
+                v.rendered += 1
+                done = time.perf_counter()
+                METRICS.observe(f"render.{v.name}.wait_ms", (now - v.since) * 1000)
+                METRICS.observe(f"render.{v.name}.draw_ms", (done - now) * 1000)
+            except Exception as e:
+                logger.exception(f"Render {v.name} failed: {e}")
+
+    def pending(self) -> int:
+        return sum(v.pending for v in self._views.values())
+
+    def stats(self) -> dict:
+        return {
+            "fps": self.fps,
+            "dropped": self.dropped,
+            "views": {v.name: {"posted": v.posted, "rendered": v.rendered, "coalesced": v.coalesced}
+                      for v in self._views.values()},
+        }
@@ -0,0 +1,138 @@
+# ethgui/replay.py
+"""回放录制的 WebSocket 原始帧：与实盘走同一条路径（WSManager._dispatch -> WSSecCandle/WSOrderBook/WSLive）
+
+    python -m ethgui.replay recordings/ws_20250704_120000.arrows             # 按原始节奏
+    python -m ethgui.replay recordings/ws_….arrows --speed 20                # 20 倍速
+    python -m ethgui.replay recordings/ws_….arrows --max                     # 最快，压测指标与聚合
+    python -m ethgui.replay recordings/ws_….arrows --speed 10 --gui          # 回放到主窗口
+"""
+
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+from .ws_manager import WSManager
+from .recorder import iter_batches
+from .logger import logger, setup_logging
+
+class ReplayManager(WSManager):
+    """不联网的 WSManager：订阅只登记回调，play() 在回放线程里把录制帧按接收时刻间隔（除以 speed）
+    交给 _dispatch，speed=None 时不等待。lat.* 延迟指标按当前时钟计算，回放时没有意义"""
+
+    def __init__(self, path: Path, speed: float | None = 1.0, channels=None):
+        super().__init__(url=f"replay:{path}")
+        self.path     = Path(path)
+        self.speed    = speed
+        self.channels = set(channels) if channels else None
+        self.frames   = 0
+        self.done     = threading.Event()
+
+    def start(self):
+        pass                      # subscribe() 会调用；回放由 play() 显式开始
+
+    def _post(self, op: str, keys):
+        pass                      # 订阅/退订/重订阅在回放中无需发送
+
+    def stop(self):
+        self._closing = True
+
+    def play(self, block: bool = False):
+        self._thread = threading.Thread(target=self._replay, name="ws-replay", daemon=True)
+        self._thread.start()
+        if block:
+            self._thread.join()
+
+    def _replay(self):
+        t0 = rec0 = None
+        try:
+            for batch in iter_batches(self.path):
+                ns   = batch.column("recv_ns").to_numpy()
+                chs  = batch.column("channel").to_pylist()
+                raws = batch.column("raw").to_pylist()
+                for i, raw in enumerate(raws):
+                    if self._closing:
+                        return
+                    if self.channels is not None and chs[i] not in self.channels:
+                        continue
+                    if self.speed:
+                        if t0 is None:
+                            t0, rec0 = time.perf_counter(), int(ns[i])
+                        wait = (int(ns[i]) - rec0) / 1e9 / self.speed - (time.perf_counter() - t0)
+                        if wait > 0:
+                            time.sleep(wait)
+                    self._dispatch(raw)
+                    self.frames += 1
+        finally:
+            self.done.set()
+
+def subscriptions(path: Path) -> list[tuple[str, str]]:
+    """录制中出现过数据帧的 (channel, instId)"""
+    subs = set()
+    for b in iter_batches(path):
+        subs.update(zip(b.column("channel").to_pylist(), b.column("inst").to_pylist()))
+    return sorted((ch, inst) for ch, inst in subs if ch and inst)
+
+def clients_for(manager: WSManager, subs) -> list:
+    """按录制内容建立与实盘相同的客户端：trades -> WSSecCandle，深度频道 -> WSOrderBook，candle* -> WSLive"""
+    from .ws_clients import WSSecCandle, WSOrderBook, WSLive
+    out = []
+    for channel, inst in subs:
+        if channel == "trades":
+            out.append(WSSecCandle(inst, manager))
+        elif channel.startswith("books"):
+            out.append(WSOrderBook(inst, manager, channel=channel))
+        elif channel.startswith("candle"):
+            out.append(WSLive(inst, manager, bar=channel[len("candle"):]))
+    return out
+
+def _headless(mgr: ReplayManager, channels) -> dict:
+    from PyQt6.QtCore import Qt
+    subs = [s for s in subscriptions(mgr.path) if channels is None or s[0] in channels]
+    counts, clients = {}, clients_for(mgr, subs)
+    for c in clients:
+        key = f"{c.channel} {c.inst}"
+        counts[key] = 0
+        sig = getattr(c, "new_candle", None) or c.new_book
+        # 回放线程里直接计数，无需事件循环
+        sig.connect(lambda *_, k=key: counts.__setitem__(k, counts[k] + 1), Qt.ConnectionType.DirectConnection)
+        c.start()
+    t = time.perf_counter()
+    mgr.play(block=True)
+    wall = time.perf_counter() - t
+    for c in clients:
+        c.stop()                  # 收掉流末尾未完成的 1s K 线，计入输出
+    print(f"回放 {mgr.frames} 帧，用时 {wall:.2f}s，{mgr.frames / max(wall, 1e-9):,.0f} 帧/s")
+    for k, n in counts.items():
+        print(f"  {k:<28} 输出 {n}")
+    return counts
+
+def _gui(mgr: ReplayManager):
+    from PyQt6.QtWidgets import QApplication
+    from .ui import MainWindow
+    app = QApplication(sys.argv[:1])
+    WSManager._shared = mgr
+    win = MainWindow()
+    win.ready.connect(lambda: mgr.play())
+    win.show()
+    sys.exit(app.exec())
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="回放录制的 WebSocket 行情")
+    ap.add_argument("path", type=Path, help="录制文件（.arrows）")
+    ap.add_argument("--speed",    type=float, default=1.0, help="倍速（1 为原始节奏）")
+    ap.add_argument("--max",      action="store_true", help="不等待，尽快回放")
+    ap.add_argument("--channels", default="", help="只回放这些频道，逗号分隔")
+    ap.add_argument("--gui",      action="store_true", help="回放到主窗口（当前品种的 1s K 线与深度、自选列表实时 K 线）")
+    args = ap.parse_args(argv)
+    setup_logging()
+    channels = [c for c in args.channels.split(",") if c] or None
+    mgr = ReplayManager(args.path, None if args.max else args.speed, channels)
+    logger.info(f"Replaying {args.path} at {'max' if args.max else f'{args.speed:g}x'}")
+    if args.gui:
+        _gui(mgr)
+    else:
+        _headless(mgr, channels)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# ethgui/resample.py
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .config import BAR_MS, BAR_OFFSET_MS, DERIVE_FETCH_LIMIT
+from .store import CandleStore, COLUMNS
+from .logger import logger
+
+def bucket_start(ts_ms, bar: str):
+    """ts（毫秒，标量或数组）所在 bar 周期的开盘时刻，与 OKX 对齐（日线按 UTC+8）"""
+    w, off = BAR_MS[bar], BAR_OFFSET_MS.get(bar, 0)
+    return (ts_ms + off) // w * w - off
+
+def resample(df: pd.DataFrame, bar: str) -> pd.DataFrame:
+    """把更细周期的 OHLCV（1m 或成交聚合的 1s，ts 升序）聚合成 bar 周期；
+    最后一桶可能不完整，与交易所未收盘的 K 线一致"""
+    if df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    ts  = pd.to_datetime(df["ts"]).to_numpy().astype("datetime64[ms]").astype(np.int64)
+    b   = bucket_start(ts, bar)
+    idx = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    last = np.r_[idx[1:] - 1, len(b) - 1]
+    col = lambda c: df[c].to_numpy(dtype=float) if c in df else np.zeros(len(df))
+    return pd.DataFrame({
+        "ts":        b[idx].astype("datetime64[ms]"),
+        "open":      col("open")[idx],
+        "high":      np.maximum.reduceat(col("high"), idx),
+        "low":       np.minimum.reduceat(col("low"), idx),
+        "close":     col("close")[last],
+        "volume":    np.add.reduceat(col("volume"), idx),
+        "volumeCcy": np.add.reduceat(col("volumeCcy"), idx),
+    })
+
+class Deriver:
+    """高周期 K 线库的物化视图：缺口优先用 1m K 线库本地聚合补上；
+    1m 也缺得太多（超过 DERIVE_FETCH_LIMIT 根）时才让调用方直接回补该周期"""
+
+    def __init__(self, root: Path, inst: str, bar: str, base: str = "1m"):
+        self.bar   = bar
+        self.store = CandleStore.open(root, inst, bar)
+        self.base  = CandleStore.open(root, inst, base)
+
+    def _expand(self, s: int, e: int) -> tuple[int, int]:
+        return int(bucket_start(s, self.bar)), int(bucket_start(e, self.bar)) + BAR_MS[self.bar] - 1
+
+    def plan(self, start_ms: int, end_ms: int) -> list[tuple[str, int, int]]:
+        """[start_ms, end_ms] 需要的 REST 回补：[(周期, s, e)]，周期为 1m 或本周期"""
+        out = []
+        for s, e in self.store.missing(start_ms, end_ms):
+            s0, e1 = self._expand(s, e)
+            gaps = self._base_gaps(s0, e1)
+            if sum(ge - gs + 1 for gs, ge in gaps) // self.base.bar_ms <= DERIVE_FETCH_LIMIT:
+                out += [(self.base.bar, gs, ge) for gs, ge in gaps]
+            else:
+                out.append((self.bar, s, e))
+        return out
+
+    def _base_gaps(self, s0: int, e1: int) -> list[tuple[int, int]]:
+        # 1m 尚未收盘的那一根总在缺口里，不算
+        last = self.base._last_closed_ms()
+        return [(s, min(e, last)) for s, e in self.base.missing(s0, e1) if s <= last]
+
+    def materialize(self, start_ms: int, end_ms: int) -> int:
+        """用 1m 聚合补上本周期 [start_ms, end_ms] 中 1m 已覆盖的缺口，返回写入的 K 线根数"""
+        rows = 0
+        for s, e in self.store.missing(start_ms, end_ms):
+            s0, e1 = self._expand(s, e)
+            if self._base_gaps(s0, e1):
+                continue
+            df = resample(self.base.load(s0, e1), self.bar)
+            self.store.write(df, (s0, e1))          # 未收盘的最后一桶会写入，但不计入覆盖
+            rows += len(df)
+        if rows:
+            logger.debug(f"Derived {rows} {self.bar} bars for {self.store.dir.name}")
+        return rows
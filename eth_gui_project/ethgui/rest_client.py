@@ -1,28 +1,81 @@
+import time, threading
 import requests, certifi
-from .config import PROXIES, VERIFY_SSL, OKX_REST_URL
+from .config import (PROXIES, VERIFY_SSL, OKX_REST_URL, REST_RATE, REST_BURST,
+                     REST_HISTORY_RATE, REST_HISTORY_BURST)
 from .logger import logger
+from .metrics import METRICS
+
+class TokenBucket:
+    """客户端令牌桶限速（线程安全），按 OKX 每 IP 限频配置"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate    = rate
+        self.burst   = burst
+        self._tokens = float(burst)
+        self._last   = time.monotonic()
+        self._lock   = threading.Lock()
+
+    def acquire(self, n: int = 1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last   = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+
+# 同一进程内所有 RestClient 共享限速器（近期与历史 K 线接口分别限频）
+REST_LIMITER    = TokenBucket(REST_RATE, REST_BURST)
+HISTORY_LIMITER = TokenBucket(REST_HISTORY_RATE, REST_HISTORY_BURST)
 
 class RestClient:
-    def __init__(self):
+    def __init__(self, url: str = OKX_REST_URL, limiter: TokenBucket | None = REST_LIMITER,
+                 history_limiter: TokenBucket | None = HISTORY_LIMITER):
+        self.url     = url
+        self.history_url = url.rsplit("/", 1)[0] + "/history-candles"   # 同级的 /market/history-candles
+        self.instruments_url = url.rsplit("/market/", 1)[0] + "/public/instruments"
+        self.limiter = limiter
+        self.history_limiter = history_limiter
         self.session = requests.Session()
         self.session.proxies = PROXIES or None
         self.session.verify  = certifi.where() if VERIFY_SSL is True else VERIFY_SSL
         self.session.headers.update({"User-Agent": "ETH-GUI/RestClient"})
 
-    def get_candles(self, inst: str, bar: str, **params) -> list[list[str]]:
-        url = OKX_REST_URL
+    def get_candles(self, inst: str, bar: str, history: bool = False, **params) -> list[list[str]]:
+        """history=True 时请求 history-candles（更早的 K 线）"""
+        url     = self.history_url if history else self.url
+        limiter = self.history_limiter if history else self.limiter
         params.update(instId=inst, bar=bar)
         for attempt in range(1, 4):
             try:
-                logger.debug(f"REST GET {url} params={params}")
-                r = self.session.get(url, params=params, timeout=20)
+                if limiter:
+                    limiter.acquire()
+                logger.debug("REST GET %s params=%s", url, params)
+                with METRICS.timer("rest.page_ms"):
+                    r = self.session.get(url, params=params, timeout=20)
                 r.raise_for_status()
                 data = r.json()
                 if data.get("code") != "0":
                     raise RuntimeError(data.get("msg", "OKX error"))
+                METRICS.inc("rest.pages")
                 return data["data"]
             except Exception as e:
                 logger.warning(f"REST error {e} (retry {attempt}/3)")
                 if attempt == 3:
+                    METRICS.inc("rest.errors")
                     raise
+                METRICS.inc("rest.retries")
         return []
+
+    def get_instruments(self, inst_type: str) -> list[str]:
+        """某一产品类型下可交易品种的 instId 列表（/public/instruments，不经 K 线限速器）"""
+        with METRICS.timer("rest.page_ms"):
+            r = self.session.get(self.instruments_url, params={"instType": inst_type}, timeout=20)
+        r.raise_for_status()
+        data = r.json()
+        if data.get("code") != "0":
+            raise RuntimeError(data.get("msg", "OKX error"))
+        return [d["instId"] for d in data["data"] if d.get("state", "live") == "live"]
@@ -0,0 +1,152 @@
+# ethgui/series.py
+
+import numpy as np
+import pandas as pd
+from .logger import logger
+
+FIELDS = ("open","high","low","close","volume","volumeCcy")
+
+class BarBuffer:
+    """列式 OHLCV 缓冲：NumPy 预分配、容量倍增（追加摊销 O(1)）、原地改最后一根；
+    ring=N 时为固定容量的环形模式（底层 2N 槽位，写满后把最近 N-1 根搬到开头，视图始终连续）；
+    frame()/列访问返回零拷贝视图"""
+
+    def __init__(self, capacity: int = 4096, ring: int | None = None):
+        self.ring    = ring
+        cap          = 2 * ring if ring else max(capacity, 16)
+        self._ts     = np.zeros(cap, dtype=np.int64)          # 毫秒
+        self._cols   = {f: np.zeros(cap) for f in FIELDS}
+        self._start  = 0
+        self._end    = 0
+        self.version = 0                                      # 每次写入递增，供缓存判断数据是否变化
+        self._spilled_ms = None                               # 已写入 K 线库的最新 ts
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ring: int | None = None) -> "BarBuffer":
+        buf = cls(capacity=2 * len(df), ring=ring)
+        buf.extend(df)
+        return buf
+
+    def __len__(self):
+        return self._end - self._start
+
+    # — 写入 — #
+    def _reserve(self, n: int):
+        cap = len(self._ts)
+        if self._end + n <= cap:
+            return
+        if self.ring:
+            keep = min(len(self), self.ring - n) if n < self.ring else 0
+            src  = slice(self._end - keep, self._end)
+            self._ts[:keep] = self._ts[src]
+            for a in self._cols.values():
+                a[:keep] = a[src]
+            self._start, self._end = 0, keep
+            return
+        new = max(cap * 2, self._end + n)
+        self._ts = np.concatenate((self._ts[:self._end], np.zeros(new - self._end, dtype=np.int64)))
+        self._cols = {f: np.concatenate((a[:self._end], np.zeros(new - self._end)))
+                      for f, a in self._cols.items()}
+
+    def extend(self, df: pd.DataFrame):
+        """批量追加（DataFrame 需含 ts 列且按 ts 升序）"""
+        if self.ring and len(df) > self.ring:
+            df = df.iloc[-self.ring:]
+        n = len(df)
+        if n == 0:
+            return
+        self._reserve(n)
+        e = self._end
+        self._ts[e:e+n] = pd.to_datetime(df["ts"]).to_numpy().astype("datetime64[ms]").astype(np.int64)
+        for f, a in self._cols.items():
+            a[e:e+n] = df[f].to_numpy(dtype=float) if f in df else 0.0
+        self._end += n
+        self._trim()
+        self.version += 1
+
+    def append(self, ts_ms: int, **vals):
+        self._reserve(1)
+        e = self._end
+        self._ts[e] = ts_ms
+        for f, a in self._cols.items():
+            a[e] = vals.get(f, 0.0)
+        self._end += 1
+        self._trim()
+        self.version += 1
+
+    def update_last(self, **vals):
+        e = self._end - 1
+        for f, v in vals.items():
+            self._cols[f][e] = v
+        self.version += 1
+
+    def push(self, bar: dict) -> bool:
+        """按 ts 合并一根实时 K 线：同 ts 更新最后一根，更新的 ts 追加，更早的忽略；返回是否新增"""
+        ts   = int(bar["ts"])
+        vals = {f: bar[f] for f in FIELDS if f in bar}
+        if len(self) and ts == self._ts[self._end - 1]:
+            self.update_last(**vals)
+            return False
+        if len(self) and ts < self._ts[self._end - 1]:
+            return False
+        c = vals.get("close", 0.0)
+        for f in ("open","high","low"):
+            vals.setdefault(f, c)
+        self.append(ts, **vals)
+        return True
+
+    def _trim(self):
+        if self.ring and len(self) > self.ring:
+            self._start = self._end - self.ring
+
+    # — 零拷贝读取 — #
+    def ts_ms(self) -> np.ndarray:
+        return self._ts[self._start:self._end]
+
+    def dates(self) -> np.ndarray:
+        return self.ts_ms().view("datetime64[ms]")
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == "ts":
+            return self.dates()
+        return self._cols[name][self._start:self._end]
+
+    def last_ts(self) -> int | None:
+        return int(self._ts[self._end - 1]) if len(self) else None
+
+    def frame(self) -> pd.DataFrame:
+        cols = {"ts": self.dates()}
+        cols.update({f: a[self._start:self._end] for f, a in self._cols.items()})
+        return pd.DataFrame(cols, copy=False)
+
+    # — 落盘 — #
+    def mark_spilled(self, ts_ms: int | None = None):
+        """声明 ts_ms（默认倒数第二根）及之前的 K 线已在 K 线库中"""
+        if ts_ms is None and len(self) >= 2:
+            ts_ms = int(self._ts[self._end - 2])
+        self._spilled_ms = ts_ms
+
+    def unspilled(self, bar_ms: int) -> tuple[pd.DataFrame, list[tuple[int, int]]] | None:
+        """尚未写入的已收盘 K 线（不含最后一根）的副本及其覆盖区间，可交给其它线程写盘；
+        覆盖区间只取相邻 ts 恰差 bar_ms 的连续段，缓冲里的洞（如重连回补失败）不记为已覆盖，之后仍会回补"""
+        if len(self) < 2:
+            return None
+        ts   = self.ts_ms()[:-1]
+        lo   = 0 if self._spilled_ms is None else int(np.searchsorted(ts, self._spilled_ms, "right"))
+        if lo >= len(ts):
+            return None
+        t    = ts[lo:]
+        brk  = np.flatnonzero(np.diff(t) != bar_ms)
+        runs = list(zip(t[np.r_[0, brk + 1]].tolist(), (t[np.r_[brk, len(t) - 1]] + bar_ms - 1).tolist()))
+        return self.frame().iloc[lo:len(ts)].copy(), runs
+
+    def spill(self, store, bar_ms: int):
+        """把尚未写入的已收盘 K 线（不含最后一根）追加到 CandleStore，并把其中的连续段记为已覆盖"""
+        todo = self.unspilled(bar_ms)
+        if todo is None:
+            return 0
+        df, covered = todo
+        store.write(df, covered=covered)
+        self.mark_spilled(covered[-1][1] - bar_ms + 1)
+        logger.debug(f"Spilled {len(df)} live bars into {store.dir}")
+        return len(df)
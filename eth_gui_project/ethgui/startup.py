@@ -0,0 +1,57 @@
+# ethgui/startup.py
+
+import sys
+import time
+import threading
+import importlib
+from pathlib import Path
+
+T0 = time.perf_counter()          # 入口最先导入本模块，作为启动计时起点（不含解释器自身启动）
+
+from .config import STARTUP_REPORT
+from .metrics import METRICS
+
+class StartupProfile:
+    """启动时间线（各阶段距起点的毫秒数）+ 后台预加载各重模块的累计导入耗时，
+    格式仿 python -X importtime；完整导入树仍可用 python -X importtime -m ethgui.main 2> import.log 查看"""
+
+    def __init__(self, t0: float = T0):
+        self.t0 = t0
+        self.phases:  list[tuple[str, float]] = []
+        self.imports: list[tuple[str, float, str]] = []    # (模块, 毫秒, 导入线程)
+
+    def mark(self, phase: str) -> float:
+        ms = (time.perf_counter() - self.t0) * 1000
+        self.phases.append((phase, ms))
+        METRICS.observe(f"startup.{phase}_ms", ms)
+        return ms
+
+    def preload(self, modules):
+        """逐个导入（已导入的耗时约为 0，与 importtime 的 cumulative 列同义），返回失败的模块"""
+        failed = []
+        for name in modules:
+            t = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                failed.append((name, str(e)))
+            self.imports.append((name, (time.perf_counter() - t) * 1000, threading.current_thread().name))
+        return failed
+
+    def report(self) -> str:
+        lines = ["启动时间线（ms，自 ethgui 导入起）:"]
+        lines += [f"  {ms:9.1f}  {name}" for name, ms in self.phases]
+        if self.imports:
+            lines.append("预加载导入（ms，cumulative | 模块 | 线程）:")
+            lines += [f"  {ms:9.1f} | {name} | {th}" for name, ms, th in self.imports]
+            lines.append(f"  {sum(ms for _, ms, _ in self.imports):9.1f} | 合计")
+        lines.append(f"已加载模块数: {len(sys.modules)}")
+        return "\n".join(lines)
+
+    def save(self, path: Path = STARTUP_REPORT) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.report() + "\n", encoding="utf-8")
+        return path
+
+PROFILE = StartupProfile()
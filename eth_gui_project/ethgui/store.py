@@ -0,0 +1,169 @@
+# ethgui/store.py
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from .config import BAR_MS, BAR_OFFSET_MS, CACHE_PARTITION, CACHE_ROW_GROUP
+from .logger import logger
+
+COLUMNS = ["ts","open","high","low","close","volume","volumeCcy"]
+_PART_FMT = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+_PART_FREQ = {"day": "D", "month": "M"}
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """统一列类型：ts 为毫秒精度时间戳，其余为 float"""
+    df = df[COLUMNS].copy()
+    df["ts"] = pd.to_datetime(df["ts"]).astype("datetime64[ms]")
+    for c in COLUMNS[1:]:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype(float)
+    return df
+
+class CandleStore:
+    """按日/月分区的 Parquet K 线库，附带已覆盖时间区间索引，只回补缺口、只改写受影响的分区"""
+
+    _open: dict[tuple[str, str, str], "CandleStore"] = {}
+    _open_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, root: Path, inst: str, bar: str) -> "CandleStore":
+        """同一目录在进程内共用一个实例，覆盖索引不会被不同实例互相覆盖"""
+        key = (str(Path(root).resolve()), inst, bar)
+        with cls._open_lock:
+            if key not in cls._open:
+                cls._open[key] = cls(root, inst, bar)
+            return cls._open[key]
+
+    def __init__(self, root: Path, inst: str, bar: str, partition: str = CACHE_PARTITION):
+        self.inst   = inst
+        self.bar    = bar
+        self.bar_ms = BAR_MS[bar]
+        self.offset = BAR_OFFSET_MS.get(bar, 0)
+        self.dir    = Path(root) / f"{inst}_{bar}"
+        self.index_path = self.dir / "index.json"
+        self._lock  = threading.RLock()      # 写分区与索引（可能来自多个任务线程）
+        if self.index_path.exists():
+            meta = json.loads(self.index_path.read_text(encoding="utf-8"))
+            self.partition = meta["partition"]
+            self.coverage  = [tuple(c) for c in meta["coverage"]]
+        else:
+            self.partition = partition
+            self.coverage  = []
+            legacy = Path(root) / f"{inst}_{bar}.parquet"
+            if legacy.exists():
+                self._import_legacy(legacy)
+
+    # — 覆盖区间 — #
+    def _last_closed_ms(self) -> int:
+        """最后一根已收盘 K 线的结束时刻，之后的数据仍可能变化，不计入覆盖"""
+        now = int(time.time() * 1000) + self.offset
+        return now // self.bar_ms * self.bar_ms - self.offset - 1
+
+    def missing(self, start_ms: int, end_ms: int) -> list[tuple[int, int]]:
+        """[start_ms, end_ms] 中尚未覆盖的闭区间"""
+        end_ms = min(end_ms, self._last_closed_ms() + self.bar_ms)
+        gaps, cur = [], start_ms
+        for s, e in self.coverage:
+            if e < cur:
+                continue
+            if s > end_ms:
+                break
+            if s > cur:
+                gaps.append((cur, s - 1))
+            cur = max(cur, e + 1)
+        if cur <= end_ms:
+            gaps.append((cur, end_ms))
+        return gaps
+
+    def _mark(self, start_ms: int, end_ms: int):
+        end_ms = min(end_ms, self._last_closed_ms())
+        if end_ms < start_ms:
+            return
+        merged = []
+        for s, e in sorted(self.coverage + [(start_ms, end_ms)]):
+            if merged and s <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        self.coverage = merged
+
+    def _save_index(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"partition": self.partition,
+                                   "coverage": [list(c) for c in self.coverage]}), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    # — 分区读写 — #
+    def _part_path(self, key: str) -> Path:
+        return self.dir / f"{key}.parquet"
+
+    def partitions(self, start_ms: int | None = None, end_ms: int | None = None) -> list[Path]:
+        """按分区名裁剪出与 [start_ms, end_ms] 相交的分区文件"""
+        paths = sorted(self.dir.glob("*.parquet")) if self.dir.exists() else []
+        if start_ms is None and end_ms is None:
+            return paths
+        lo = pd.Timestamp(start_ms, unit="ms") if start_ms is not None else pd.Timestamp.min
+        hi = pd.Timestamp(end_ms, unit="ms") if end_ms is not None else pd.Timestamp.max
+        freq = _PART_FREQ[self.partition]
+        out = []
+        for p in paths:
+            per = pd.Period(p.stem, freq=freq)
+            if per.end_time >= lo and per.start_time <= hi:
+                out.append(p)
+        return out
+
+    def write(self, df: pd.DataFrame, covered: tuple[int, int] | list[tuple[int, int]] | None = None):
+        """写入新行（只改写涉及的分区），并把 covered 区间（一个或一组）记入覆盖索引"""
+        with self._lock:
+            if not df.empty:
+                df = normalize(df)
+                self.dir.mkdir(parents=True, exist_ok=True)
+                keys = df["ts"].dt.to_period(_PART_FREQ[self.partition])
+                for key, part in df.groupby(keys, sort=True):
+                    path = self._part_path(key.strftime(_PART_FMT[self.partition]))
+                    if path.exists():
+                        part = pd.concat([pd.read_parquet(path), part])
+                    part = part.drop_duplicates("ts", keep="last").sort_values("ts")
+                    tmp = path.with_suffix(".tmp")
+                    part.to_parquet(tmp, index=False, row_group_size=CACHE_ROW_GROUP)
+                    os.replace(tmp, path)
+                logger.debug(f"Store {self.dir.name}: wrote {len(df)} rows into {keys.nunique()} partitions")
+            for c in ([covered] if isinstance(covered, tuple) else covered or ()):
+                self._mark(*c)
+            self._save_index()
+
+    def load(self, start_ms: int | None = None, end_ms: int | None = None,
+             columns: list[str] | None = None) -> pd.DataFrame:
+        """读取 [start_ms, end_ms]：分区按文件名裁剪，ts 条件下推到 row group 统计，只读所需列"""
+        cols  = list(COLUMNS if columns is None else dict.fromkeys(["ts", *columns]))
+        paths = self.partitions(start_ms, end_ms)
+        if not paths:
+            return pd.DataFrame(columns=cols)
+        dset  = ds.dataset([str(p) for p in paths], format="parquet")
+        ts_t  = dset.schema.field("ts").type
+        cond  = None
+        if start_ms is not None:
+            cond = ds.field("ts") >= pa.scalar(start_ms, pa.timestamp("ms")).cast(ts_t)
+        if end_ms is not None:
+            c_hi = ds.field("ts") <= pa.scalar(end_ms, pa.timestamp("ms")).cast(ts_t)
+            cond = c_hi if cond is None else cond & c_hi
+        df = dset.to_table(columns=cols, filter=cond).to_pandas()
+        if not df["ts"].is_monotonic_increasing:
+            df = df.sort_values("ts", ignore_index=True)
+        return df
+
+    def _import_legacy(self, path: Path):
+        """把旧的单文件缓存拆成分区，原文件保留不动；最后一根可能未收盘，不计入覆盖"""
+        df = pd.read_parquet(path)
+        if df.empty:
+            return
+        df = normalize(df).sort_values("ts")
+        first = int(df["ts"].iloc[0].timestamp() * 1000)
+        last  = int(df["ts"].iloc[-1].timestamp() * 1000)
+        logger.debug(f"Importing legacy cache {path} rows={len(df)}")
+        self.write(df, covered=(first, last - 1))
@@ -0,0 +1,174 @@
+# ethgui/sweep.py
+"""支撑/阻力参数扫描：(eps×σ, min hits, 枢轴窗口) 网格 × 品种 × 周期，进程池并行，输出价位稳定性报告
+
+    python -m ethgui.sweep                                   # 自选列表 × 自选周期，最近 SWEEP_DAYS 天
+    python -m ethgui.sweep --insts ETH-USDT --bars 1m,1H --eps 0.5:2:0.1 --hits 2,3 --windows 5
+    python -m ethgui.sweep --fetch --out sweep.json          # 先回补缺口，报告另存为 JSON
+
+结果与 indicators.detect_levels 逐项一致：主进程对每个 (数据, 窗口) 找一次枢轴点，
+所有枢轴价拼进一块共享内存，任务只传偏移和参数；子进程只导入 numpy/pandas/indicators
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+import numpy as np
+import pandas as pd
+from .config import (CACHE_DIR, LEVEL_BACKEND, WATCHLIST, WATCH_BARS,
+                     SWEEP_EPS, SWEEP_HITS, SWEEP_WINDOWS, SWEEP_DAYS, SWEEP_TOL)
+from .indicators import LevelClusterer, pivot_prices, levels_from_pivots
+
+def parse_grid(spec: str, cast=float) -> list:
+    """"a:b:step"（含 b）或 "a,b,c" -> 升序去重列表"""
+    if ":" in spec:
+        a, b, step = (float(x) for x in spec.split(":"))
+        vals = np.round(np.arange(a, b + step/2, step), 6)
+    else:
+        vals = [x for x in spec.split(",") if x.strip()]
+    return sorted({cast(v) for v in vals})
+
+def load_frame(inst: str, bar: str, start_ms: int, end_ms: int, fetch: bool = False) -> pd.DataFrame:
+    """从 K 线库读取；fetch 时先回补缺口（可派生周期优先回补 1m 再本地聚合）"""
+    # 延迟导入：K 线库/回补会启动日志，子进程不需要
+    from .store import CandleStore
+    from .resample import Deriver
+    from .backfill import Backfiller, fetched_span
+    from .config import DERIVE_BARS
+    deriver = Deriver(CACHE_DIR, inst, bar) if bar in DERIVE_BARS else None
+    store   = deriver.store if deriver else CandleStore.open(CACHE_DIR, inst, bar)
+    if fetch:
+        jobs = deriver.plan(start_ms, end_ms) if deriver else [(bar, s, e) for s, e in store.missing(start_ms, end_ms)]
+        for b, s, e in jobs:
+            df = Backfiller(inst, b).fetch(s, e)
+            (store if b == bar else deriver.base).write(df, fetched_span(df, b, (s, e)))
+    if deriver:
+        deriver.materialize(start_ms, end_ms)
+    return store.load(start_ms, end_ms)
+
+# — 子进程 — #
+_SHM: dict[str, shared_memory.SharedMemory] = {}
+
+def _pivots(name: str, off: int, n: int) -> np.ndarray:
+    shm = _SHM.get(name)
+    if shm is None:
+        shm = _SHM[name] = shared_memory.SharedMemory(name)
+    return np.ndarray((n,), dtype=np.float64, buffer=shm.buf, offset=off * 8)
+
+def _run(task: tuple) -> list[tuple[float, np.ndarray]]:
+    """一个 (数据, 窗口, min hits) 上扫所有 eps：枢轴价只排序一次"""
+    name, off, n, std, eps_list, min_hits, backend = task
+    pivots    = _pivots(name, off, n)
+    clusterer = None
+    if backend == "gap":
+        clusterer = LevelClusterer(); clusterer.add(pivots)
+    out = []
+    for eps_mul in eps_list:
+        lv = levels_from_pivots(pivots, std*eps_mul, min_hits, clusterer, backend)
+        out.append((eps_mul, lv[["price", "hits"]].to_numpy(dtype=float)))
+    return out
+
+# — 稳定性 — #
+def stability(found: list[tuple[float, int, int, float, int]], combos: int, tol: float = SWEEP_TOL) -> list[dict]:
+    """found: [(eps, min_hits, window, price, hits)]。按价格排序后相邻相对差 <= tol 的归为同一价位，
+    persistence 为出现该价位的参数组合占比"""
+    if not found:
+        return []
+    arr   = np.array(found, dtype=float)
+    arr   = arr[np.argsort(arr[:, 3], kind="stable")]
+    px    = arr[:, 3]
+    group = np.concatenate(([0], np.cumsum(np.diff(px) > tol * px[1:])))
+    out   = []
+    for g in np.split(arr, np.flatnonzero(np.diff(group)) + 1):
+        n = len({tuple(r) for r in g[:, :3]})
+        out.append({"price": round(float(np.average(g[:, 3], weights=g[:, 4])), 4),
+                    "persistence": round(n / combos, 4), "combos": n,
+                    "hits_mean": round(float(g[:, 4].mean()), 2), "hits_max": int(g[:, 4].max()),
+                    "eps": [float(g[:, 0].min()), float(g[:, 0].max())],
+                    "windows": sorted({int(w) for w in g[:, 2]})})
+    return sorted(out, key=lambda r: (-r["persistence"], -r["hits_mean"]))
+
+def grid_levels(frames: dict[tuple[str, str], pd.DataFrame], eps: list[float], hits: list[int], windows: list[int],
+                workers: int | None = None, backend: str = LEVEL_BACKEND) -> dict[tuple[str, str], list[tuple]]:
+    """frames: {(品种, 周期): K 线}，返回 {(品种, 周期): [(eps, min hits, 窗口, 价位, hits)]}；
+    每组参数的价位与 detect_levels(df, eps, min hits, 窗口) 相同"""
+    segs, chunks, off = {}, [], 0
+    for key, df in frames.items():
+        if df.empty:
+            continue
+        std = float(df["close"].std())
+        for w in windows:
+            p = pivot_prices(df, w)
+            segs[(*key, w)] = (off, len(p), std)
+            chunks.append(p); off += len(p)
+    found = {key: [] for key in frames}
+    if segs:
+        shm = shared_memory.SharedMemory(create=True, size=max(off, 1) * 8)
+        try:
+            np.ndarray((off,), dtype=np.float64, buffer=shm.buf)[:] = np.concatenate(chunks)
+            tasks = [((inst, bar, w, h), (shm.name, o, n, std, eps, h, backend))
+                     for (inst, bar, w), (o, n, std) in segs.items() for h in hits]
+            with ProcessPoolExecutor(workers or os.cpu_count(), mp_context=get_context("spawn")) as ex:
+                for ((inst, bar, w, h), _), res in zip(tasks, ex.map(_run, [t for _, t in tasks])):
+                    for e, lv in res:
+                        found[(inst, bar)] += [(e, h, w, p, n) for p, n in lv]
+        finally:
+            shm.close(); shm.unlink()
+    return found
+
+def sweep(frames: dict[tuple[str, str], pd.DataFrame], eps: list[float], hits: list[int], windows: list[int],
+          workers: int | None = None, backend: str = LEVEL_BACKEND, tol: float = SWEEP_TOL) -> list[dict]:
+    """frames: {(品种, 周期): K 线}，返回每个 (品种, 周期) 的稳定性报告"""
+    combos = len(eps) * len(hits) * len(windows)
+    found  = grid_levels(frames, eps, hits, windows, workers, backend)
+    return [{"inst": inst, "bar": bar, "bars": len(frames[(inst, bar)]), "combos": combos,
+             "levels": stability(found[(inst, bar)], combos, tol)} for inst, bar in frames]
+
+def _print(report: list[dict], top: int):
+    for r in report:
+        print(f"\n{r['inst']} {r['bar']}  {r['bars']} 根 K 线  {r['combos']} 组参数")
+        if not r["levels"]:
+            print("  （无价位）")
+            continue
+        print(f"  {'价位':>12}  {'稳定性':>6}  {'hits均值':>8}  {'hits最大':>8}  eps 范围     窗口")
+        for lv in r["levels"][:top]:
+            print(f"  {lv['price']:>12.4f}  {lv['persistence']:>6.0%}  {lv['hits_mean']:>8.2f}  {lv['hits_max']:>8d}"
+                  f"  {lv['eps'][0]:.2f}–{lv['eps'][1]:.2f}  {','.join(map(str, lv['windows']))}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="支撑/阻力参数扫描与价位稳定性报告")
+    ap.add_argument("--insts",   default=",".join(WATCHLIST), help="品种，逗号分隔")
+    ap.add_argument("--bars",    default=",".join(WATCH_BARS), help="周期，逗号分隔")
+    ap.add_argument("--days",    type=float, default=SWEEP_DAYS, help="分析最近多少天")
+    ap.add_argument("--eps",     default=SWEEP_EPS, help="eps×σ 网格：起:止:步长 或 逗号分隔")
+    ap.add_argument("--hits",    default=SWEEP_HITS, help="min hits 网格")
+    ap.add_argument("--windows", default=SWEEP_WINDOWS, help="枢轴窗口网格（奇数）")
+    ap.add_argument("--tol",     type=float, default=SWEEP_TOL, help="同一价位的相对容差")
+    ap.add_argument("--workers", type=int, default=None, help="进程数（默认全部核心）")
+    ap.add_argument("--fetch",   action="store_true", help="先回补 K 线库缺口（需联网）")
+    ap.add_argument("--top",     type=int, default=15, help="每个品种/周期打印前几个价位")
+    ap.add_argument("--out",     help="报告另存为 JSON")
+    args = ap.parse_args(argv)
+
+    eps, hits, windows = parse_grid(args.eps), parse_grid(args.hits, int), parse_grid(args.windows, int)
+    if any(w < 3 or w % 2 == 0 for w in windows):
+        ap.error(f"pivot windows must be odd and >= 3: {windows}")
+    end   = int(time.time() * 1000)
+    start = end - int(args.days * 86_400_000)
+    frames = {(i, b): load_frame(i, b, start, end, args.fetch)
+              for i in args.insts.split(",") if i for b in args.bars.split(",") if b}
+    t = time.perf_counter()
+    report = sweep(frames, eps, hits, windows, args.workers, tol=args.tol)
+    print(f"{len(frames)} 组数据 × {len(eps)*len(hits)*len(windows)} 组参数，用时 {time.perf_counter()-t:.2f}s")
+    _print(report, args.top)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"start": start, "end": end, "eps": eps, "hits": hits, "windows": windows,
+                       "tol": args.tol, "results": report}, f, ensure_ascii=False, indent=1)
+        print(f"\n报告已写入 {args.out}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 # ethgui/ui.py
 
-import pandas as pd
-import matplotlib.dates as mdates
+import time
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING
 from datetime import datetime, timedelta, time as dtime
 
-from PyQt6.QtCore    import Qt
+from PyQt6.QtCore    import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui     import QColor, QBrush
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QLabel, QPushButton, QDateEdit, QComboBox,
@@ -13,24 +14,48 @@ from PyQt6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QTabWidget, QDoubleSpinBox,
     QSpinBox, QMessageBox
 )
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import mplfinance as mpf
-
-from .config     import DEFAULT_EPS_MUL, DEFAULT_MIN_HITS, CACHE_DIR
-from .fetcher    import FetchWorker
-from .indicators import detect_levels
-from .ws_clients import WSLive, WSSecCandle, WSOrderBook
+
+from .config     import (DEFAULT_EPS_MUL, DEFAULT_MIN_HITS, CACHE_DIR, BAR_MS, LIVE_SPILL_S, LOD_POINTS_PER_PX,
+                         METRICS_FILE, WATCHLIST, DAEMON_CLIENT)
+from .render     import RenderScheduler
+from .metrics    import METRICS
+from .startup    import PROFILE
+from .debug_doc  import generate_debug_doc
 from .logger     import logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 窗口显示后由后台线程预加载（pandas/matplotlib/pyarrow/requests/websockets 及依赖它们的模块），
+# 本模块只在用到的方法里局部导入，首帧只需要 PyQt
+HEAVY_MODULES = [
+    "numpy", "pandas", "pyarrow.dataset", "matplotlib.figure", "matplotlib.dates",
+    "matplotlib.backends.backend_qtagg", *(f"{__package__}.{m}" for m in (
+        "series", "lod", "charts", "indicators", "volume_profile", "analysis_cache", "store", "resample",
+        "backfill", "fetcher", "ws_manager", "ws_clients", "watchlist", "remote")),
+]
+
 class MainWindow(QMainWindow):
+    _preloaded = pyqtSignal(list)               # 预加载线程 -> GUI 线程：导入失败的 [(模块, 错误)]
+    ready      = pyqtSignal()                   # 图表、自选列表与实时流已启动
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("ETH 支撑/阻力 & 实时 K 线")
         self.resize(1280, 760)
-        self.inst    = "ETH-USDT"
-        self.df_min  = pd.DataFrame()
-        self.df_sec  = pd.DataFrame()
+        self.inst    = WATCHLIST[0]
+        self.bar_min  = None                    # 当前 1m 视图加载的周期
+        self._watch_key = None                  # 折线视图直接展示自选列表的 (品种, 周期) 时非空
+        self._want_key  = None                  # 等待加载完成后展示的 (品种, 周期)
+        self._ready   = False                   # 重模块已加载、图表与后台已启动
+        self.bars_min = self.bars_sec = None
+        self.watch = self.ws1s = self.wsob = None
+        self.remote  = None                     # remote.DaemonClient：连上本机行情守护进程时为客户端模式
+        self._level_lines = []                  # 折线图上的支撑/阻力虚线，参数调整时替换
+        self._analyzed = False                  # 当前折线已手动分析过
+        self.vprofile  = None                   # volume_profile.VolumeProfile：当前折线的成交量分布，随实时 K 线增量更新
+        self._hit_levels = self._vp_nodes = None
+        self._hit_texts  = []                   # list_hits 当前内容，不变时不重建
 
         # — Central & Status — #
         central = QWidget(); root = QHBoxLayout(central)
@@ -39,30 +64,38 @@ class MainWindow(QMainWindow):
 
         # — Tabs — #
         self.tabs = QTabWidget()
-        # 1m 折线
-        self.fig1, self.canvas1 = Figure(figsize=(6,4)), None
-        self.canvas1 = FigureCanvas(self.fig1)
-        t1 = QWidget(); QVBoxLayout(t1).addWidget(self.canvas1)
-        self.tabs.addTab(t1, "1m 折线")
-        # 1s 蜡烛图
-        self.fig2, self.canvas2 = Figure(figsize=(6,4)), None
-        self.canvas2 = FigureCanvas(self.fig2)
-        t2 = QWidget(); QVBoxLayout(t2).addWidget(self.canvas2)
-        self.tabs.addTab(t2, "1s K线")
+        # 1m 折线、1s 蜡烛图：matplotlib 画布在 _build_charts 中放入
+        self._tab_layouts = []
+        for name in ("1m 折线", "1s K线"):
+            t = QWidget(); lay = QVBoxLayout(t)
+            lay.addWidget(QLabel("加载中…", alignment=Qt.AlignmentFlag.AlignCenter))
+            self.tabs.addTab(t, name); self._tab_layouts.append(lay)
+        # 运行指标
+        self.table_metrics = QTableWidget(0,2)
+        self.table_metrics.setHorizontalHeaderLabels(["指标","值"])
+        self.table_metrics.horizontalHeader().setStretchLastSection(True)
+        self.btn_export = QPushButton("导出指标"); self.btn_export.clicked.connect(self.export_metrics)
+        t3 = QWidget(); l3 = QVBoxLayout(t3); l3.addWidget(self.table_metrics); l3.addWidget(self.btn_export)
+        self.tabs.addTab(t3, "指标")
 
         # — Controls — #
         today = datetime.utcnow().date()
         self.dte_start = QDateEdit(calendarPopup=True); self.dte_start.setDate(today - timedelta(days=30))
         self.dte_end   = QDateEdit(calendarPopup=True); self.dte_end.setDate(today)
+        self.cmb_inst  = QComboBox(editable=True); self.cmb_inst.addItems(WATCHLIST)
+        self.cmb_inst.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)   # 校验通过后由 switch_view 加入
         self.cmb_bar   = QComboBox(); self.cmb_bar.addItems(["1m","5m","15m","1H","4H","1D"])
         self.spin_eps  = QDoubleSpinBox(); self.spin_eps.setRange(0.1,5); self.spin_eps.setValue(DEFAULT_EPS_MUL)
         self.spin_hits = QSpinBox();       self.spin_hits.setRange(1,10); self.spin_hits.setValue(DEFAULT_MIN_HITS)
-        self.btn_fetch = QPushButton("抓取/刷新");    self.btn_fetch.clicked.connect(self.fetch)
+        self.btn_fetch = QPushButton("抓取/刷新");    self.btn_fetch.setEnabled(False); self.btn_fetch.clicked.connect(self.fetch)
         self.btn_analy = QPushButton("分析支撑阻力"); self.btn_analy.setEnabled(False); self.btn_analy.clicked.connect(self.analyze)
         self.progress  = QProgressBar(); self.progress.setFixedWidth(140)
+        # 已分析过时，调参直接用缓存重算
+        self.spin_eps.valueChanged.connect(self._reanalyze); self.spin_hits.valueChanged.connect(self._reanalyze)
 
         ctl = QHBoxLayout()
         for w in [
+            QLabel("品种:"), self.cmb_inst,
             QLabel("开始:"), self.dte_start,
             QLabel("结束:"), self.dte_end,
             QLabel("周期:"), self.cmb_bar,
@@ -78,6 +111,12 @@ class MainWindow(QMainWindow):
         self.table_ob  = QTableWidget(10,3)
         self.table_ob.setHorizontalHeaderLabels(["价","量","买/卖"])
         self.table_ob.setFixedWidth(300)
+        # 30 个单元格只创建一次，之后只改文字
+        for i in range(10):
+            color = QBrush(QColor(180,0,0) if i<5 else QColor(0,180,0))
+            for c in range(3):
+                it = QTableWidgetItem(""); it.setForeground(color)
+                self.table_ob.setItem(i,c,it)
 
         right = QVBoxLayout()
         right.addWidget(QLabel("关键价位 (hits)")); right.addWidget(self.list_hits,1)
@@ -86,22 +125,169 @@ class MainWindow(QMainWindow):
         left = QVBoxLayout(); left.addWidget(self.tabs,1); left.addLayout(ctl)
         root.addLayout(left,3); root.addLayout(right,1)
 
-        # — WebSocket 实时 — #
-        self.ws1m = WSLive(self.inst)
-        self.ws1m.new_candle.connect(self.on_live_min)
-        self.ws1m.start()
+        # — 渲染调度：实时数据只更新模型，按帧率合并重绘 — #
+        self._line_min = None
+        self._rendering = False
+        self.render = RenderScheduler(parent=self)
+        self.render.register("min", self._render_min)
+        self.render.register("sec", self._render_sec)
+        self.render.register("ob",  self._render_ob)
+        self.render.register("vp",  self._render_vp)
+        self.render.start()
+        METRICS.gauge("queue.render_pending", self.render.pending)
+        self.lbl_render = QLabel(); self.status.addPermanentWidget(self.lbl_render)
+        self._stats_timer = QTimer(self); self._stats_timer.timeout.connect(self._show_render_stats)
+        self._stats_timer.start(1000)
+        self.status.showMessage("启动中…")
 
-        self.ws1s = WSSecCandle(self.inst)
+        # 首帧之后：后台线程导入重模块，完成后在 GUI 线程建图表、启动自选列表与实时流
+        self._preloaded.connect(self._start_background)
+        QTimer.singleShot(0, lambda: threading.Thread(target=self._preload, name="preload", daemon=True).start())
+
+    # — 延迟启动 — #
+    def _preload(self):
+        self._preloaded.emit(PROFILE.preload(HEAVY_MODULES))
+
+    def _start_background(self, failed: list):
+        PROFILE.mark("preloaded")
+        for name, err in failed:
+            logger.error(f"Preload of {name} failed: {err}")
+        from .series import BarBuffer
+        from .lod import MinMaxPyramid
+        from .indicators import PivotTracker, LevelClusterer
+        from .analysis_cache import AnalysisCache
+        from .watchlist import Watchlist
+        from .instruments import Instruments
+        self.instruments = Instruments(Path(CACHE_DIR)); self.instruments.refresh()
+        self.bars_min = BarBuffer()
+        self.pivots   = PivotTracker()
+        self.levels   = LevelClusterer()
+        self.lod      = MinMaxPyramid()
+        self.analysis = AnalysisCache.open(Path(CACHE_DIR))
+        self._build_charts()
+        # 实时 1m K 线定期落盘到 K 线库
+        self._spill_timer = QTimer(self); self._spill_timer.timeout.connect(self._spill_live)
+        self._spill_timer.start(LIVE_SPILL_S*1000)
+
+        # — 行情来源：本机守护进程在运行则作为其客户端，否则直连交易所 — #
+        if DAEMON_CLIENT:
+            from .remote import DaemonClient, RemoteWatchlist
+            self.remote = DaemonClient.connect_to(parent=self)
+        if self.remote is not None:
+            self.remote.disconnected.connect(lambda: self.status.showMessage("行情守护进程已断开，重连中…"))
+            self.remote.connected.connect(lambda: self.status.showMessage("已重新连接行情守护进程", 5000))
+            self.setWindowTitle(self.windowTitle() + "（守护进程客户端）")
+
+        # — 自选列表：各品种各周期的 K 线、实时流、支撑阻力常驻内存 — #
+        self.watch = RemoteWatchlist(self.remote, parent=self) if self.remote else Watchlist(parent=self)
+        self.watch.loaded.connect(self.on_watch_loaded)
+        self.watch.updated.connect(self.on_watch_live)
+        self.watch.levels_ready.connect(self.on_watch_levels)
+        self.watch.error.connect(lambda i, b, msg: self.status.showMessage(f"{i} {b} 加载失败：{msg}", 5000))
+
+        # — WebSocket 实时（当前品种） — #
+        self._start_streams()
+        # 可编辑的品种框只在选中或输入完成（回车/失焦）时切换，不随每次按键
+        self.cmb_inst.activated.connect(self.switch_view)
+        self.cmb_inst.lineEdit().editingFinished.connect(self.switch_view)
+        self.cmb_bar.currentTextChanged.connect(self.switch_view)
+        self.switch_view()                      # 当前品种先加入并设为可见，优先加载
+        for inst in WATCHLIST:
+            self.watch.add(inst)
+        self.btn_fetch.setEnabled(True)
+        self._ready = True
+        PROFILE.mark("ready"); PROFILE.save()   # 首批数据展示后再更新一次
+        self.ready.emit()
+
+    def _build_charts(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
+        from .charts import LiveCandleCanvas
+        l1, l2 = self._tab_layouts
+        for lay in self._tab_layouts:
+            lay.takeAt(0).widget().deleteLater()
+        # 1m 折线
+        self.fig1    = Figure(figsize=(6,4))
+        self.canvas1 = FigureCanvas(self.fig1)
+        l1.addWidget(NavigationToolbar(self.canvas1, l1.parentWidget())); l1.addWidget(self.canvas1)
+        # 1s 蜡烛图
+        self.canvas2 = LiveCandleCanvas(capacity=300, title="ETH 1s K线")
+        self.fig2    = self.canvas2.figure
+        l2.addWidget(self.canvas2)
+
+    def _start_streams(self):
+        from .series import BarBuffer
+        for ws in (self.ws1s, self.wsob):
+            if ws is not None:
+                ws.stop()
+        self.bars_sec = BarBuffer(ring=300)
+        self.canvas2.reset(f"{self.inst} 1s K线")
+        if self.remote is not None:
+            from .remote import RemoteSecCandle, RemoteOrderBook
+            self.ws1s, self.wsob = RemoteSecCandle(self.inst, self.remote), RemoteOrderBook(self.inst, self.remote)
+        else:
+            from .ws_clients import WSSecCandle, WSOrderBook
+            self.ws1s, self.wsob = WSSecCandle(self.inst), WSOrderBook(self.inst)
         self.ws1s.new_candle.connect(self.on_live_sec)
         self.ws1s.start()
-
-        self.wsob = WSOrderBook(self.inst)
         self.wsob.new_book.connect(self.on_orderbook)
         self.wsob.start()
 
+    # — 自选列表切换：已加载的直接从内存展示 — #
+    def switch_view(self, *_):
+        inst, bar = self.cmb_inst.currentText().strip().upper(), self.cmb_bar.currentText()
+        if not inst or (inst == self.inst and (inst, bar) == self._want_key):
+            return                                  # 回车同时触发 activated 与 editingFinished
+        if not self.instruments.valid(inst):
+            self.status.showMessage(f"未知品种 {inst}", 5000)
+            self.cmb_inst.setCurrentText(self.inst)
+            return
+        if self.cmb_inst.findText(inst) < 0:
+            self.cmb_inst.addItem(inst)
+        if inst != self.inst:
+            self.inst = inst
+            self._start_streams()
+        w = self.watch.focus(inst, bar)
+        self._want_key = w.key
+        if w.loaded:
+            self._show_watch(w)
+        else:
+            self.status.showMessage(f"加载 {inst} {bar}…")
+
+    def _show_watch(self, w):
+        self.bars_min, self.bar_min, self._watch_key = w.bars, w.bar, w.key
+        self.pivots.reset(); self.pivots.update(self.df_min); self.levels.reset()
+        self._rebuild_profile()
+        self.plot_min()
+        self._show_levels(w.levels)
+        self.btn_analy.setEnabled(True)
+        self.status.showMessage(f"{w.inst} {w.bar}：{len(w.bars)} 根 K 线", 5000)
+        if "first_data" not in dict(PROFILE.phases):
+            PROFILE.mark("first_data")
+            logger.debug(PROFILE.report())
+            PROFILE.save()
+
+    def on_watch_loaded(self, inst: str, bar: str):
+        # 缓存部分先到，回补完成后缓冲被替换，需重新展示
+        w = self.watch.watch(inst, bar)
+        if (inst, bar) == self._want_key and ((inst, bar) != self._watch_key or w.bars is not self.bars_min):
+            self._show_watch(w)
+
+    def on_watch_live(self, inst: str, bar: str, candle: dict):
+        if (inst, bar) == self._watch_key:
+            self._on_min_changed()                  # 自选列表已把 K 线合并进同一个缓冲
+        elif self._watch_key is None and (inst, bar) == (self.inst, self.bar_min):
+            self.on_live_min(candle)
+
+    def on_watch_levels(self, inst: str, bar: str, lv):
+        if (inst, bar) == self._watch_key:
+            self._show_levels(lv)
+
     # — 历史数据抓取 — #
     def fetch(self):
         logger.debug("start_fetch clicked")
+        self._want_key = None
         st = self.dte_start.date().toPyDate()
         ed = self.dte_end.date().toPyDate()
         today = datetime.utcnow().date()
@@ -112,10 +298,13 @@ class MainWindow(QMainWindow):
         s_ms = int(datetime.combine(st, dtime.min).timestamp()*1000)
         e_ms = int(datetime.combine(ed, dtime.max).timestamp()*1000)
         bar  = self.cmb_bar.currentText()
-        cache_path = Path(CACHE_DIR)/f"{self.inst}_{bar}.parquet"
-
-        self.worker = FetchWorker(self.inst, bar, s_ms, e_ms, cache_path)
-        self.worker.progress.connect(lambda done,_: self.progress.setValue(done))
+        if self.remote is not None:
+            from .remote import RemoteFetch   # 由守护进程回补并写 K 线库
+            self.worker = RemoteFetch(self.remote, self.inst, bar, s_ms, e_ms)
+        else:
+            from .fetcher import FetchWorker
+            self.worker = FetchWorker(self.inst, bar, s_ms, e_ms, Path(CACHE_DIR))
+        self.worker.progress.connect(self.on_fetch_progress)
         self.worker.finished.connect(self.on_fetch_ok)
         self.worker.error.connect(lambda msg: QMessageBox.critical(self, "错误", msg))
 
@@ -124,13 +313,23 @@ class MainWindow(QMainWindow):
         self.status.showMessage("抓取中…")
         self.worker.start()
 
-    def on_fetch_ok(self, df: pd.DataFrame):
+    def on_fetch_progress(self, done: int, total: int):
+        self.progress.setMaximum(total); self.progress.setValue(done)
+        self.status.showMessage(f"抓取中… {done}/{total}")
+
+    def on_fetch_ok(self, df: "pd.DataFrame"):
+        import pandas as pd
+        from .series import BarBuffer
         # 先按用户日期过滤
         st = pd.to_datetime(self.dte_start.date().toPyDate())
-        ed = pd.to_datetime(self.dte_end.date().toPyDate()) + pd.Timedelta(days=1) - pd.Timedelta(ms=1)
+        ed = pd.to_datetime(self.dte_end.date().toPyDate()) + pd.Timedelta(days=1) - pd.Timedelta(milliseconds=1)
         df = df[(df["ts"] >= st) & (df["ts"] <= ed)].reset_index(drop=True)
 
-        self.df_min = df
+        self.bars_min = BarBuffer.from_frame(df); self.bars_min.mark_spilled()
+        self.bar_min  = self.worker.bar
+        self._watch_key = None
+        self.pivots.reset(); self.pivots.update(self.df_min); self.levels.reset()
+        self._rebuild_profile()
         self.plot_min()
         self.status.showMessage(f"已加载 {len(df)} 根 K 线", 5000)
         self.btn_fetch.setEnabled(True); self.btn_analy.setEnabled(True)
@@ -138,76 +337,192 @@ class MainWindow(QMainWindow):
 
     # — 实时 1m 折线 — #
     def on_live_min(self, data: dict):
-        if self.df_min.empty: return
-        ts = pd.to_datetime(data["ts"], unit="ms")
-        if ts <= self.df_min["ts"].iloc[-1]:
-            self.df_min.at[self.df_min.index[-1],"close"] = data["close"]
+        if not len(self.bars_min): return
+        self.bars_min.push(data)
+        self._on_min_changed()
+
+    def _on_min_changed(self):
+        b = self.bars_min
+        self.lod.update(b["close"])
+        self.pivots.update(self.df_min)
+        self.vprofile.push(b.last_ts(), b["high"][-1], b["low"][-1], b["close"][-1], b["volume"][-1])
+        self.render.post("min")
+        self.render.post("vp")
+
+    def _rebuild_profile(self):
+        from .volume_profile import VolumeProfile
+        self.vprofile = VolumeProfile.from_frame(self.df_min)
+        self.render.post("vp")
+
+    @property
+    def df_min(self) -> "pd.DataFrame":
+        """1m 序列的零拷贝 DataFrame 视图"""
+        return self.bars_min.frame()
+
+    def _spill_live(self, wait: bool = False):
+        # 客户端模式下 K 线库只由守护进程写
+        if (self.remote is not None or self.bar_min != "1m" or self._watch_key is not None
+                or (getattr(self, "worker", None) and self.worker.isRunning())):
+            return
+        from .store import CandleStore
+        todo = self.bars_min.unspilled(BAR_MS["1m"])
+        if todo is None:
+            return
+        # GUI 线程只取副本；读-合并-改写分区放到线程里（与 Watchlist.spill 相同），退出时同步写完
+        self.bars_min.mark_spilled(todo[1][-1][1] - BAR_MS["1m"] + 1)
+        store = CandleStore.open(Path(CACHE_DIR), self.inst, "1m")
+        if wait:
+            store.write(*todo)
         else:
-            new = {"ts":ts,"open":data["close"],"high":data["close"],
-                   "low":data["close"],"close":data["close"],
-                   "volume":0,"volumeCcy":0}
-            self.df_min = pd.concat([self.df_min,pd.DataFrame([new])],ignore_index=True)
-        ax = self.fig1.axes[0]
-        ax.lines[0].set_data(self.df_min["ts"],self.df_min["close"])
-        ax.relim(); ax.autoscale_view()
+            threading.Thread(target=store.write, args=todo, name="spill", daemon=True).start()
+
+    def closeEvent(self, event):
+        if self._ready:
+            self._spill_live(wait=True)
+            self.watch.close()
+        METRICS.export(METRICS_FILE)
+        generate_debug_doc()
+        super().closeEvent(event)
+
+    def _render_min(self, _):
+        if self._line_min is None: return
+        ax = self._line_min.axes
+        self._rendering = True
+        try:
+            self._line_min.set_data(*self._lod_points())
+            if ax.get_autoscalex_on():
+                ax.relim(); ax.autoscale_view()
+        finally:
+            self._rendering = False
         self.canvas1.draw_idle()
 
+    def _lod_points(self):
+        """按当前视图取降采样点：自动缩放时覆盖全量，缩放/平移后只取可见区间，点数约为像素宽度的倍数"""
+        import numpy as np
+        import matplotlib.dates as mdates
+        ax, ts = self._line_min.axes, self.bars_min.ts_ms()
+        if ax.get_autoscalex_on():
+            i0, i1 = 0, len(ts)
+        else:
+            lo, hi = (int(mdates.num2date(x).timestamp()*1000) for x in ax.get_xlim())
+            i0 = int(np.searchsorted(ts, lo)) - 1
+            i1 = int(np.searchsorted(ts, hi, "right")) + 1
+        idx = self.lod.query(i0, i1, int(ax.bbox.width * LOD_POINTS_PER_PX))
+        return self.bars_min.dates()[idx], self.bars_min["close"][idx]
+
+    def _on_min_xlim(self, _ax):
+        if not self._rendering:
+            self.render.post("min")
+
     # — 实时 1s 蜡烛图 — #
     def on_live_sec(self, bar: dict):
-        row = pd.DataFrame([bar]); row["ts"] = pd.to_datetime(row["ts"],unit="ms")
-        if self.df_sec.empty or row["ts"].iloc[0] > self.df_sec["ts"].iloc[-1]:
-            self.df_sec = pd.concat([self.df_sec,row],ignore_index=True)
-        else:
-            idx = self.df_sec.index[-1]
-            for c in ["open","high","low","close","volume"]:
-                self.df_sec.at[idx,c] = bar[c]
-        if len(self.df_sec)>300:
-            self.df_sec = self.df_sec.iloc[-300:].reset_index(drop=True)
-        dfm = self.df_sec.set_index("ts")
-        self.fig2.clear()
-        mpf.plot(dfm, type="candle", ax=self.fig2.add_subplot(111),
-                 axtitle="ETH 1s K线", datetime_format="%H:%M:%S",
-                 style="charles", warn_too_much_data=300)
-        self.canvas2.draw()
+        self.bars_sec.push(bar)
+        self.canvas2.push(bar)
+        self.render.post("sec")
+
+    def _render_sec(self, _):
+        self.canvas2.redraw()
 
     # — 实时订单簿 Top5 — #
     def on_orderbook(self, bids, asks):
-        asks5 = sorted(asks, key=lambda x:float(x[0]))[:5]
-        bids5 = sorted(bids, key=lambda x:float(x[0]),reverse=True)[:5]
-        rows = asks5 + bids5
-        for i in range(10):
-            if i < len(rows):
-                p,sz = rows[i][0],rows[i][1]
-                side = "卖" if i<5 else "买"
-                it_p = QTableWidgetItem(f"{float(p):.2f}")
-                it_s = QTableWidgetItem(f"{float(sz):.4f}")
-                it_d = QTableWidgetItem(side)
-                color=QColor(180,0,0) if side=="卖" else QColor(0,180,0)
-                for it in (it_p,it_s,it_d): it.setForeground(QBrush(color))
-                self.table_ob.setItem(i,0,it_p); self.table_ob.setItem(i,1,it_s); self.table_ob.setItem(i,2,it_d)
-            else:
-                for c in range(3): self.table_ob.setItem(i,c,QTableWidgetItem(""))
+        self.render.post("ob", (bids, asks, self.wsob.book.ts))
+
+    def _render_ob(self, book):
+        bids, asks, ts = book
+        for i in range(5):
+            for row, lv in ((i, asks[i] if i < len(asks) else None), (i+5, bids[i] if i < len(bids) else None)):
+                p  = self.table_ob.item(row,0); sz = self.table_ob.item(row,1); d = self.table_ob.item(row,2)
+                if lv is None:
+                    p.setText(""); sz.setText(""); d.setText("")
+                else:
+                    p.setText(f"{lv[0]:.2f}"); sz.setText(f"{lv[1]:.4f}"); d.setText("卖" if row<5 else "买")
+        if ts:
+            METRICS.observe("lat.exch_to_paint.ob_ms", time.time()*1000 - ts)
+
+    def _show_render_stats(self):
+        st = self.render.stats()
+        merged = sum(v["coalesced"] for v in st["views"].values())
+        self.lbl_render.setText(f"渲染 {st['fps']:g}fps  合并 {merged}  丢帧 {st['dropped']}")
+        if self.tabs.currentIndex() == 2:
+            self._show_metrics()
+
+    def _show_metrics(self):
+        snap, rows = METRICS.snapshot(), []
+        for k, c in snap["counters"].items():
+            rows.append((k, f"{c['total']}  ({c['rate']}/s)"))
+        for k, h in snap["histograms"].items():
+            rows.append((k, f"p50 {h['p50']:.1f}  p90 {h['p90']:.1f}  p99 {h['p99']:.1f}  max {h['max']:.1f}  n={h['count']}"
+                            if h["count"] else "—"))
+        for k, g in snap["gauges"].items():
+            rows.append((k, str(g)))
+        t = self.table_metrics
+        t.setRowCount(len(rows))
+        for i, (k, v) in enumerate(rows):
+            for c, text in ((0, k), (1, v)):
+                it = t.item(i, c)
+                if it is None:
+                    t.setItem(i, c, QTableWidgetItem(text))
+                else:
+                    it.setText(text)
+
+    def export_metrics(self):
+        path = METRICS.export(METRICS_FILE)
+        self.status.showMessage(f"指标已导出到 {path}", 5000)
 
     # — 绘制 1m 折线 — #
     def plot_min(self):
-        self.fig1.clear()
+        import matplotlib.dates as mdates
+        self.fig1.clear(); self._level_lines, self._analyzed = [], False
         ax = self.fig1.add_subplot(111)
-        ax.plot(self.df_min["ts"],self.df_min["close"],linewidth=1)
-        ax.set_title("ETH 1m 折线")
+        self.lod.rebuild(self.bars_min["close"])
+        self._line_min, = ax.plot([],[],linewidth=1)
+        self._line_min.set_data(*self._lod_points())
+        ax.relim(); ax.autoscale_view()
+        ax.callbacks.connect("xlim_changed", self._on_min_xlim)
+        ax.set_title(f"{self.inst} {self.bar_min} 折线")
         ax.xaxis.set_major_locator(mdates.AutoDateLocator())
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M'))
         self.fig1.autofmt_xdate()
         self.canvas1.draw()
 
     # — 支撑/阻力分析 — #
-    def analyze(self):
-        lv = detect_levels(self.df_min, self.spin_eps.value(), self.spin_hits.value())
+    def analyze(self, quiet: bool = False):
+        inst, bar = self._watch_key or (self.inst, self.bar_min)
+        lv = self.analysis.levels(inst, bar, self.df_min, self.spin_eps.value(), self.spin_hits.value(),
+                                  tracker=self.pivots, clusterer=self.levels)
+        for ln in self._level_lines: ln.remove()
+        self._level_lines, self._analyzed = [], True
         if lv.empty:
-            QMessageBox.information(self, "提示", "未检测到支撑/阻力；可调大 eps 或 min hits")
+            self.canvas1.draw_idle(); self._show_levels(lv)
+            if not quiet:
+                QMessageBox.information(self, "提示", "未检测到支撑/阻力；可调大 eps 或 min hits")
             return
-        ax = self.fig1.gca()
-        for y in lv["price"]: ax.axhline(y, linestyle="--", alpha=0.7)
-        self.canvas1.draw()
-        self.list_hits.clear()
-        for _,r in lv.iterrows(): self.list_hits.addItem(f"{r.price:.2f}  ({r.hits})")
+        ax = self._line_min.axes
+        self._level_lines = [ax.axhline(y, linestyle="--", alpha=0.7) for y in lv["price"]]
+        self.canvas1.draw_idle()
+        self._show_levels(lv)
         self.status.showMessage(f"检测到 {len(lv)} 条支撑/阻力带",5000)
+
+    def _reanalyze(self, *_):
+        if self._analyzed and len(self.bars_min):
+            self.analyze(quiet=True)
+
+    def _show_levels(self, lv):
+        self._hit_levels = lv
+        self._fill_hits()
+
+    def _render_vp(self, _):
+        if self.vprofile is not None:
+            self._vp_nodes = self.vprofile.nodes()
+            self._fill_hits()
+
+    def _fill_hits(self):
+        """枢轴聚类价位 (hits) 在上，高成交量节点 (占区间成交量比例) 在下"""
+        texts = [] if self._hit_levels is None else [f"{r.price:.2f}  ({r.hits})" for r in self._hit_levels.itertuples()]
+        if self._vp_nodes is not None and len(self._vp_nodes):
+            total = self.vprofile.total or 1.0
+            texts.append("— 成交量节点 —")
+            texts += [f"{r.price:.2f}  {r.volume / total:.1%}" for r in self._vp_nodes.itertuples()]
+        if texts != self._hit_texts:
+            self._hit_texts = texts
+            self.list_hits.clear(); self.list_hits.addItems(texts)
@@ -0,0 +1,122 @@
+# ethgui/volume_profile.py
+
+import math
+import numpy as np
+import pandas as pd
+from .config import VP_BIN_PCT, VP_WINDOW_BARS, VP_NODE_MULT, VP_MAX_NODES
+from .metrics import METRICS
+
+class VolumeProfile:
+    """成交量分布（volume at price）：按固定价格桶累计成交量与 K 线根数的 NumPy 直方图。
+    每根 K 线的成交量记在典型价 (H+L+C)/3 所在的桶，push 为 O(1)：同 ts 先减去该根上次的贡献再加新值，
+    新 K 线超出 window 时从环形缓冲里取出最旧一根减掉；桶数组按需两端倍增扩展。
+    节点提取只扫直方图（与桶数成正比，与历史长度无关）"""
+
+    def __init__(self, bin_size: float, window: int = VP_WINDOW_BARS):
+        if bin_size <= 0:
+            raise ValueError(f"bin size must be positive, got {bin_size}")
+        self.bin_size = float(bin_size)
+        self.window   = window                        # 0 为不滚动
+        self.vol   = np.zeros(0)                      # 各桶成交量
+        self.cnt   = np.zeros(0, dtype=np.int64)      # 各桶 K 线根数
+        self.base  = 0                                # vol[0] 对应的绝对桶号 floor(price / bin_size)
+        self.total = 0.0
+        cap = window or 1                             # 不滚动时只需记住最后一根的贡献
+        self._bins = np.zeros(cap, dtype=np.int64)    # 环形缓冲：每根 K 线的 (桶号, 成交量)
+        self._vols = np.zeros(cap)
+        self._n    = 0                                # 已计入的 K 线总数
+        self._last_ts: int | None = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, bin_size: float | None = None,
+                   window: int = VP_WINDOW_BARS) -> "VolumeProfile":
+        """整段构建（bincount，一次 O(n)）；bin_size 默认为中位收盘价 × VP_BIN_PCT"""
+        close = df["close"].to_numpy(dtype=float)
+        if bin_size is None:
+            bin_size = float(np.median(close)) * VP_BIN_PCT if len(close) else 1.0
+        vp = cls(bin_size or 1.0, window)
+        n  = len(df)
+        if n == 0:
+            return vp
+        tp   = (df["high"].to_numpy(dtype=float) + df["low"].to_numpy(dtype=float) + close) / 3
+        bins = np.floor(tp / vp.bin_size).astype(np.int64)
+        vols = df["volume"].to_numpy(dtype=float)
+        lo   = max(0, n - window) if window else 0
+        vp.base  = int(bins[lo:].min())
+        vp.vol   = np.bincount(bins[lo:] - vp.base, weights=vols[lo:])
+        vp.cnt   = np.bincount(bins[lo:] - vp.base)
+        vp.total = float(vols[lo:].sum())
+        cap  = len(vp._bins)
+        keep = np.arange(max(0, n - cap), n)
+        vp._bins[keep % cap], vp._vols[keep % cap] = bins[keep], vols[keep]
+        vp._n, vp._last_ts = n, int(pd.Timestamp(df["ts"].iloc[-1]).value // 1_000_000)
+        return vp
+
+    def __len__(self):
+        return min(self._n, self.window) if self.window else self._n
+
+    # — 增量 — #
+    def _index(self, b: int) -> int:
+        i = b - self.base
+        if 0 <= i < len(self.vol):
+            return i
+        # 越界：向缺的一侧至少扩一倍，摊销 O(1)
+        size = len(self.vol)
+        if size == 0:
+            self.base, self.vol, self.cnt = b, np.zeros(16), np.zeros(16, dtype=np.int64)
+            return 0
+        if i < 0:
+            grow = max(size, -i)
+            self.vol  = np.concatenate((np.zeros(grow), self.vol))
+            self.cnt  = np.concatenate((np.zeros(grow, dtype=np.int64), self.cnt))
+            self.base -= grow
+        else:
+            grow = max(size, i - size + 1)
+            self.vol = np.concatenate((self.vol, np.zeros(grow)))
+            self.cnt = np.concatenate((self.cnt, np.zeros(grow, dtype=np.int64)))
+        return b - self.base
+
+    def _add(self, b: int, v: float, sign: int):
+        i = self._index(b)
+        self.vol[i] += sign * v
+        self.cnt[i] += sign
+        self.total  += sign * v
+
+    def push(self, ts: int, high: float, low: float, close: float, volume: float) -> bool:
+        """按 ts 合并一根 K 线（与 BarBuffer.push 同义）：同 ts 替换最后一根的贡献，更新的 ts 追加，更早的忽略；
+        返回是否新增"""
+        cap = len(self._bins)
+        new = self._last_ts is None or ts > self._last_ts
+        if new:
+            j = self._n % cap
+            if self.window and self._n >= self.window:
+                self._add(int(self._bins[j]), float(self._vols[j]), -1)   # 移出窗口的最旧一根
+            self._n, self._last_ts = self._n + 1, ts
+        elif ts == self._last_ts:
+            j = (self._n - 1) % cap
+            self._add(int(self._bins[j]), float(self._vols[j]), -1)
+        else:
+            return False
+        b = math.floor((high + low + close) / 3 / self.bin_size)
+        self._add(b, volume, 1)
+        self._bins[j], self._vols[j] = b, volume
+        return new
+
+    # — 高成交量节点 — #
+    def nodes(self, max_nodes: int = VP_MAX_NODES, min_mult: float = VP_NODE_MULT) -> pd.DataFrame:
+        """相邻 3 桶合计的局部极大值、且 3 桶均量不低于非空桶均量 min_mult 倍的价位，取成交量最大的 max_nodes 个；
+        price 为 3 桶内成交量加权价，hits 为落在其中的 K 线根数，按价格升序"""
+        with METRICS.timer("indicators.volume_nodes_ms"):
+            # 空桶以根数为准（滚动加减后成交量可能留下浮点残差）
+            v = np.where(self.cnt > 0, np.maximum(self.vol, 0.0), 0.0)
+            if not v.any():
+                return pd.DataFrame(columns=["price", "hits", "volume"])
+            s = np.convolve(v, np.ones(3), "same")     # 价位恰好落在桶边界时不被拆开
+            c = np.convolve(self.cnt, np.ones(3, dtype=np.int64), "same")
+            left, right = np.r_[-1.0, s[:-1]], np.r_[s[1:], -1.0]
+            idx = np.flatnonzero((s >= left) & (s > right) & (s >= 3 * min_mult * v[self.cnt > 0].mean()))
+            idx = idx[np.argsort(s[idx], kind="stable")[::-1][:max_nodes]]
+            mid = (self.base + np.arange(len(v)) + 0.5) * self.bin_size
+            pv  = np.convolve(v * mid, np.ones(3), "same")
+            lv  = pd.DataFrame({"price": pv[idx] / s[idx], "hits": c[idx], "volume": s[idx]})
+            return lv.sort_values("price", ignore_index=True)
@@ -0,0 +1,268 @@
+# ethgui/watchlist.py
+
+import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from .config import (CACHE_DIR, BAR_MS, REST_WORKERS, LIVE_SPILL_S, DEFAULT_EPS_MUL, DEFAULT_MIN_HITS,
+                     DERIVE_BARS, WATCH_BARS, WATCH_LOOKBACK_BARS, WATCH_FG_WORKERS, WATCH_BG_INTERVAL)
+from .backfill import Backfiller, fetched_span
+from .store import CandleStore
+from .resample import Deriver
+from .series import BarBuffer
+from .indicators import PivotTracker, LevelClusterer
+from .analysis_cache import AnalysisCache
+from .ws_manager import WSManager
+from .ws_clients import WSLive
+from .metrics import METRICS
+from .logger import logger
+
+class Watch:
+    """一个 (品种, 周期) 的常驻状态：K 线缓冲、实时流、增量枢轴点/聚类、最近一次支撑阻力结果。
+    bars 只在 GUI 线程读写；pivots/clusterer 只在任务线程里使用"""
+
+    def __init__(self, inst: str, bar: str, cache_dir: Path):
+        self.inst, self.bar = inst, bar
+        self.deriver   = Deriver(cache_dir, inst, bar) if bar in DERIVE_BARS else None
+        self.store     = self.deriver.store if self.deriver else CandleStore.open(cache_dir, inst, bar)
+        self.bars      = BarBuffer()
+        self.pivots    = PivotTracker()
+        self.clusterer = LevelClusterer()
+        self.levels: pd.DataFrame | None = None
+        self.loaded    = False            # bars 可展示（可能先是 K 线库里已有的部分，缺口回补完成后替换）
+        self.live: WSLive | None = None
+        self._early: list[dict] | None = []   # 回补完成前到达的实时 K 线，完成后为 None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.inst, self.bar
+
+    @property
+    def complete(self) -> bool:
+        """缺口回补已完成（此前 bars 可能只是 K 线库里已有的部分）"""
+        return self._early is None
+
+class Watchlist(QObject):
+    """N 个品种 × M 个周期的后台维护：共用一个回补线程池、一条 WebSocket 连接和一个 K 线库目录。
+    任务（加载/分析/落盘）按 (品种, 周期) 串行；可见的优先，由前台线程执行，
+    后台任务只在没有可见任务时由单独一个线程按 WATCH_BG_INTERVAL 节流执行"""
+
+    loaded       = pyqtSignal(str, str)          # bars 已（重新）创建：先是缓存部分，回补完成后再一次
+    updated      = pyqtSignal(str, str, dict)    # 实时 K 线（已合并进 bars）
+    levels_ready = pyqtSignal(str, str, object)  # 支撑/阻力 DataFrame
+    error        = pyqtSignal(str, str, str)
+    _done = pyqtSignal(object, object)           # 任务线程 -> GUI 线程：(job, result)
+    _live = pyqtSignal(str, str, dict)           # WebSocket 线程 -> GUI 线程
+
+    def __init__(self, insts=(), bars=WATCH_BARS, cache_dir: Path = CACHE_DIR,
+                 manager: WSManager | None = None, parent=None):
+        super().__init__(parent)
+        self.bars      = list(bars)
+        self.cache_dir = Path(cache_dir)
+        self.manager   = manager or WSManager.shared()
+        self.pool      = ThreadPoolExecutor(REST_WORKERS, thread_name_prefix="watch-rest")
+        self.analysis  = AnalysisCache.open(self.cache_dir)
+        self._watches: dict[tuple[str, str], Watch] = {}
+        self._jobs: dict[tuple[str, str, str], object] = {}   # (inst, bar, kind) -> 参数，按提交顺序
+        self._busy: set[tuple[str, str]] = set()                # 正在执行任务的 (inst, bar)
+        self._visible: set[tuple[str, str]] = set()
+        self._transient: set[tuple[str, str]] = set()         # 只因 focus 加入的 (inst, bar)，焦点移走时移除
+        self._cond    = threading.Condition()
+        self._closing = False
+        self._done.connect(self._on_done)
+        self._live.connect(self._on_live)
+        self._threads = [threading.Thread(target=self._worker, args=(False,), name=f"watch-fg{i}", daemon=True)
+                         for i in range(WATCH_FG_WORKERS)]
+        self._threads.append(threading.Thread(target=self._worker, args=(True,), name="watch-bg", daemon=True))
+        for t in self._threads:
+            t.start()
+        self._spill_timer = QTimer(self); self._spill_timer.timeout.connect(self.spill)
+        self._spill_timer.start(LIVE_SPILL_S*1000)
+        METRICS.gauge("queue.watch_jobs", lambda: len(self._jobs))
+        for inst in insts:
+            self.add(inst)
+
+    # — 品种管理（GUI 线程） — #
+    def add(self, inst: str, bars=None) -> list[Watch]:
+        out = []
+        for bar in bars or self.bars:
+            w = self._watches.get((inst, bar))
+            if w is None:
+                w = self._watches[(inst, bar)] = Watch(inst, bar, self.cache_dir)
+                w.live = WSLive(inst, self.manager, bar, pool=self.pool)
+                w.live.new_candle.connect(lambda c, i=inst, b=bar: self._live.emit(i, b, c))
+                w.live.start()
+                self._submit(w.key, "load")
+            self._transient.discard((inst, bar))
+            out.append(w)
+        return out
+
+    def remove(self, inst: str, bars=None):
+        """移除品种的全部周期，或只移除 bars 中的周期"""
+        for key in [k for k in self._watches if k[0] == inst and (bars is None or k[1] in bars)]:
+            self._drop(key)
+
+    def _drop(self, key: tuple[str, str]):
+        with self._cond:
+            for k in [k for k in self._jobs if k[:2] == key]:
+                del self._jobs[k]
+            self._visible.discard(key)
+        self._transient.discard(key)
+        self._watches.pop(key).live.stop()
+
+    def watch(self, inst: str, bar: str) -> Watch | None:
+        return self._watches.get((inst, bar))
+
+    def focus(self, inst: str, bar: str) -> Watch:
+        """设为唯一可见的 (品种, 周期)；不在列表中则临时加入，焦点移到别处时移除（之后 add 的则常驻）。
+        已加载时可直接读取其内存状态"""
+        key = (inst, bar)
+        for k in self._transient - {key}:
+            self._drop(k)
+        w = self.watch(inst, bar)
+        if w is None:
+            w = self.add(inst, [bar])[0]
+            self._transient.add(key)
+        self.set_visible({key})
+        return w
+
+    def set_visible(self, keys):
+        """设置可见（优先执行）的 (品种, 周期) 集合；守护进程取各客户端当前视图的并集"""
+        with self._cond:
+            self._visible = {k for k in keys if k in self._watches}
+            self._cond.notify_all()
+
+    def analyze(self, inst: str, bar: str, eps_mul: float = DEFAULT_EPS_MUL, min_hits: int = DEFAULT_MIN_HITS,
+                cache: bool = True):
+        """cache=False：实时新 K 线触发，跳过分析缓存（见 AnalysisCache.levels）"""
+        w = self.watch(inst, bar)
+        if w is not None and w.loaded:
+            self._submit(w.key, "analyze", (w.bars.frame().copy(), eps_mul, min_hits, cache))
+
+    def spill(self):
+        """把各实时序列中新收盘的 K 线交给任务线程写入 K 线库"""
+        for w in self._watches.values():
+            todo = w.bars.unspilled(BAR_MS[w.bar]) if w.complete else None
+            if todo is not None:
+                w.bars.mark_spilled(todo[1][-1][1] - BAR_MS[w.bar] + 1)
+                self._submit(w.key, "spill", todo)
+
+    def close(self):
+        self._spill_timer.stop()
+        for w in self._watches.values():
+            todo = w.bars.unspilled(BAR_MS[w.bar]) if w.complete else None
+            if todo is not None:
+                w.store.write(*todo)
+            w.live.stop()
+        with self._cond:
+            self._closing = True
+            self._jobs.clear()
+            self._cond.notify_all()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.analysis.save()
+
+    # — 调度 — #
+    def _submit(self, key: tuple[str, str], kind: str, arg=None):
+        with self._cond:
+            self._jobs.pop((*key, kind), None)        # 同类任务未执行时只保留最新参数
+            self._jobs[(*key, kind)] = arg
+            self._cond.notify_all()
+
+    def _take(self, background: bool):
+        """前台线程只取可见任务；后台线程只在没有可见任务排队或执行时取任务"""
+        with self._cond:
+            while not self._closing:
+                fg_active = (any(k in self._visible for k in self._busy) or
+                             any(j[:2] in self._visible for j in self._jobs))
+                if not (background and fg_active):
+                    for job in self._jobs:
+                        key = job[:2]
+                        if key not in self._busy and (key in self._visible) != background:
+                            self._busy.add(key)
+                            return job, self._jobs.pop(job)
+                self._cond.wait()
+            return None
+
+    def _worker(self, background: bool):
+        while True:
+            item = self._take(background)
+            if item is None:
+                return
+            job, arg = item
+            w = self._watches.get(job[:2])
+            try:
+                if w is not None:
+                    t = time.perf_counter()
+                    res = getattr(self, f"_job_{job[2]}")(w, arg)
+                    METRICS.observe(f"watch.{job[2]}_ms", (time.perf_counter() - t) * 1000)
+                    self._done.emit(job, res)
+            except Exception as e:
+                logger.exception(f"Watch job {job} failed: {e}")
+                self.error.emit(job[0], job[1], str(e))
+            finally:
+                with self._cond:
+                    self._busy.discard(job[:2])
+                    self._cond.notify_all()
+                    if background:
+                        self._cond.wait_for(lambda: self._closing, WATCH_BG_INTERVAL)
+
+    # — 任务（任务线程） — #
+    def _job_load(self, w: Watch, _):
+        bar_ms = BAR_MS[w.bar]
+        end    = int(time.time()*1000)
+        start  = (end // bar_ms - WATCH_LOOKBACK_BARS) * bar_ms
+        # 可派生的周期：1m 缺得不多时回补 1m 再本地聚合
+        jobs = w.deriver.plan(start, end) if w.deriver else [(w.bar, s, e) for s, e in w.store.missing(start, end)]
+        if jobs:
+            # 需要联网回补时先把 K 线库里已有的交给 GUI 展示
+            cached = w.store.load(start, end)
+            if not cached.empty:
+                self._done.emit((*w.key, "cached"), cached)
+        for b, s, e in jobs:
+            store = w.store if b == w.bar else w.deriver.base
+            df = Backfiller(w.inst, b, pool=self.pool).fetch(s, e)
+            store.write(df, fetched_span(df, b, (s, e)))
+        if w.deriver:
+            w.deriver.materialize(start, end)
+        return w.store.load(start, end)
+
+    def _job_analyze(self, w: Watch, arg):
+        df, eps_mul, min_hits, cache = arg
+        return self.analysis.levels(w.inst, w.bar, df, eps_mul, min_hits, tracker=w.pivots, clusterer=w.clusterer,
+                                    cache=cache)
+
+    def _job_spill(self, w: Watch, arg):
+        df, covered = arg
+        w.store.write(df, covered)
+
+    # — GUI 线程 — #
+    def _on_done(self, job, res):
+        w = self._watches.get(job[:2])
+        if w is None:
+            return
+        if job[2] in ("cached", "load"):
+            w.bars = BarBuffer.from_frame(res); w.bars.mark_spilled()
+            for c in w._early:
+                w.bars.push(c)
+            if job[2] == "load":
+                w._early = None
+            w.loaded = True
+            self.loaded.emit(w.inst, w.bar)
+            self.analyze(w.inst, w.bar)
+        elif job[2] == "analyze":
+            w.levels = res
+            self.levels_ready.emit(w.inst, w.bar, res)
+
+    def _on_live(self, inst: str, bar: str, candle: dict):
+        w = self._watches.get((inst, bar))
+        if w is None:
+            return
+        if w._early is not None:
+            w._early.append(candle)
+        if not w.loaded:
+            return
+        if w.bars.push(candle):
+            self.analyze(inst, bar, cache=False)    # 新 K 线开始：上一根已收盘，更新支撑阻力
+        self.updated.emit(inst, bar, candle)
@@ -0,0 +1,150 @@
+# ethgui/wire.py
+"""守护进程与 GUI 客户端之间的二进制帧：<u32 负载长度><u8 类型><负载>，均为小端。
+字符串为 u8 长度 + UTF-8；K 线块按列存放（ts 为 int64 毫秒，其余 float64），接收端 frombuffer 直接还原"""
+
+import struct
+import numpy as np
+import pandas as pd
+from .series import FIELDS
+
+HEADER = struct.Struct("<IB")
+
+# 客户端 -> 守护进程
+SUB_TRADES, UNSUB_TRADES, SUB_BOOK, UNSUB_BOOK, WATCH, UNWATCH, FOCUS, FETCH = range(1, 9)
+# 守护进程 -> 客户端
+SEC, CANDLE, BOOK, LEVELS, BARS, PROGRESS, ERROR = range(32, 39)
+
+_CANDLE = struct.Struct("<q5d")    # ts, open, high, low, close, volume
+_BOOK   = struct.Struct("<qHH")    # ts, 买档数, 卖档数；其后买、卖各 n×[price, size] float64
+_FETCH  = struct.Struct("<Iqq")    # 请求号, 起, 止（毫秒）
+_BARS   = struct.Struct("<I?I")    # 请求号（0 为自选列表推送）, 缺口已回补, 根数
+_PROG   = struct.Struct("<III")    # 请求号, 已完成, 总数
+_U32    = struct.Struct("<I")
+
+def _str(s: str) -> bytes:
+    b = s.encode()
+    return bytes((len(b),)) + b
+
+def _read_str(buf, off: int) -> tuple[str, int]:
+    n = buf[off]
+    return bytes(buf[off+1:off+1+n]).decode(), off + 1 + n
+
+def frame(kind: int, payload: bytes) -> bytes:
+    return HEADER.pack(len(payload), kind) + payload
+
+# — 编码 — #
+def key(kind: int, inst: str, bar: str = "") -> bytes:
+    """订阅类请求（SUB_*/UNSUB_*/WATCH/UNWATCH/FOCUS）"""
+    return frame(kind, _str(inst) + _str(bar))
+
+def fetch(req: int, inst: str, bar: str, start_ms: int, end_ms: int) -> bytes:
+    return frame(FETCH, _FETCH.pack(req, start_ms, end_ms) + _str(inst) + _str(bar))
+
+def candle(kind: int, inst: str, bar: str, c: dict) -> bytes:
+    return frame(kind, _str(inst) + _str(bar) + _CANDLE.pack(
+        int(c["ts"]), c["open"], c["high"], c["low"], c["close"], c.get("volume", 0.0)))
+
+def book(inst: str, ts: int, bids: np.ndarray, asks: np.ndarray) -> bytes:
+    return frame(BOOK, _str(inst) + _BOOK.pack(int(ts or 0), len(bids), len(asks))
+                 + np.ascontiguousarray(bids, dtype="<f8").tobytes()
+                 + np.ascontiguousarray(asks, dtype="<f8").tobytes())
+
+def levels(inst: str, bar: str, lv: pd.DataFrame | None) -> bytes:
+    n = 0 if lv is None else len(lv)
+    body = _str(inst) + _str(bar) + _U32.pack(n)
+    if n:
+        body += lv["price"].to_numpy(dtype="<f8").tobytes() + lv["hits"].to_numpy(dtype="<i4").tobytes()
+    return frame(LEVELS, body)
+
+def bars(req: int, inst: str, bar: str, df: pd.DataFrame, complete: bool = True) -> bytes:
+    n    = len(df)
+    body = [_BARS.pack(req, complete, n), _str(inst), _str(bar),
+            pd.to_datetime(df["ts"]).to_numpy().astype("datetime64[ms]").astype("<i8").tobytes()]
+    body += [(df[f].to_numpy(dtype="<f8") if f in df else np.zeros(n, "<f8")).tobytes() for f in FIELDS]
+    return frame(BARS, b"".join(body))
+
+def progress(req: int, done: int, total: int) -> bytes:
+    return frame(PROGRESS, _PROG.pack(req, done, total))
+
+def error(req: int, inst: str, bar: str, msg: str) -> bytes:
+    m = msg.encode()[:65535]
+    return frame(ERROR, _U32.pack(req) + _str(inst) + _str(bar) + struct.pack("<H", len(m)) + m)
+
+# — 解码：返回与编码参数同序的元组 — #
+def _dec_key(p):
+    inst, off = _read_str(p, 0)
+    bar, _    = _read_str(p, off)
+    return inst, bar
+
+def _dec_fetch(p):
+    req, s, e = _FETCH.unpack_from(p)
+    inst, off = _read_str(p, _FETCH.size)
+    bar, _    = _read_str(p, off)
+    return req, inst, bar, s, e
+
+def _dec_candle(p):
+    inst, off = _read_str(p, 0)
+    bar, off  = _read_str(p, off)
+    ts, o, h, l, c, v = _CANDLE.unpack_from(p, off)
+    return inst, bar, {"ts": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+
+def _dec_book(p):
+    inst, off = _read_str(p, 0)
+    ts, nb, na = _BOOK.unpack_from(p, off); off += _BOOK.size
+    arr = np.frombuffer(p, dtype="<f8", count=2*(nb+na), offset=off)
+    return inst, ts, arr[:2*nb].reshape(nb, 2), arr[2*nb:].reshape(na, 2)
+
+def _dec_levels(p):
+    inst, off = _read_str(p, 0)
+    bar, off  = _read_str(p, off)
+    n, = _U32.unpack_from(p, off); off += 4
+    price = np.frombuffer(p, dtype="<f8", count=n, offset=off)
+    hits  = np.frombuffer(p, dtype="<i4", count=n, offset=off + 8*n)
+    return inst, bar, pd.DataFrame({"price": price.astype(float), "hits": hits.astype(int)})
+
+def _dec_bars(p):
+    req, complete, n = _BARS.unpack_from(p)
+    inst, off = _read_str(p, _BARS.size)
+    bar, off  = _read_str(p, off)
+    cols = {"ts": np.frombuffer(p, dtype="<i8", count=n, offset=off).astype("datetime64[ms]")}
+    for i, f in enumerate(FIELDS):
+        cols[f] = np.frombuffer(p, dtype="<f8", count=n, offset=off + 8*n*(i+1)).astype(float)
+    return req, inst, bar, complete, pd.DataFrame(cols)
+
+def _dec_error(p):
+    req, = _U32.unpack_from(p)
+    inst, off = _read_str(p, 4)
+    bar, off  = _read_str(p, off)
+    n, = struct.unpack_from("<H", p, off)
+    return req, inst, bar, bytes(p[off+2:off+2+n]).decode(errors="replace")
+
+_DECODERS = {
+    **dict.fromkeys((SUB_TRADES, UNSUB_TRADES, SUB_BOOK, UNSUB_BOOK, WATCH, UNWATCH, FOCUS), _dec_key),
+    FETCH: _dec_fetch, SEC: _dec_candle, CANDLE: _dec_candle, BOOK: _dec_book, LEVELS: _dec_levels,
+    BARS: _dec_bars, PROGRESS: _PROG.unpack_from, ERROR: _dec_error,
+}
+
+def decode(kind: int, payload: bytes) -> tuple:
+    dec = _DECODERS.get(kind)
+    if dec is None:
+        raise ValueError(f"unknown frame type {kind}")
+    return dec(payload)
+
+class FrameReader:
+    """按长度前缀切分字节流；不完整的帧留到下次 feed"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> list[tuple[int, bytes]]:
+        self._buf += data
+        out, off, n = [], 0, len(self._buf)
+        while n - off >= HEADER.size:
+            size, kind = HEADER.unpack_from(self._buf, off)
+            end = off + HEADER.size + size
+            if end > n:
+                break
+            out.append((kind, bytes(self._buf[off + HEADER.size:end])))
+            off = end
+        del self._buf[:off]
+        return out
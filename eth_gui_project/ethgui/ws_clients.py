@@ -1,150 +1,170 @@
 # ethgui/ws_clients.py
 
-import os
-import json
-import asyncio
+import time
 import threading
-import websockets
-from datetime import datetime
+from abc import ABCMeta, abstractmethod
 from PyQt6.QtCore import QObject, pyqtSignal
-from .config import WS_URL, WS_PROXY
+from .config import OB_CHANNEL, OB_DEPTH, SEC_BAR_WIDTHS
+from .ws_manager import WSManager
+from .backfill import Backfiller
+from .orderbook import OrderBook
+from .aggregator import TradeAggregator
 from .logger import logger
+from .metrics import METRICS
 
-# 如需代理，注入 ALL_PROXY
-if WS_PROXY:
-    os.environ.setdefault("ALL_PROXY", WS_PROXY)
-    logger.debug(f"Set ALL_PROXY={WS_PROXY}")
+class _ChannelMeta(type(QObject), ABCMeta):
+    pass
 
-class WSLive(QObject):
-    """1m 折线"""
-    new_candle = pyqtSignal(dict)  # dict(ts, close)
+class _Channel(QObject, metaclass=_ChannelMeta):
+    """订阅共享连接上的一个 (channel, instId)，消息在 WSManager 线程里交给 _on_msg"""
+    channel = ""
 
-    def __init__(self, inst: str):
+    def __init__(self, inst: str, manager: WSManager | None = None):
         super().__init__()
-        self.inst = inst
+        self.inst    = inst
+        self.manager = manager or WSManager.shared()
 
     def start(self):
-        threading.Thread(target=self._run, daemon=True).start()
-
-    def _run(self):
-        asyncio.run(self._ws())
-
-    async def _ws(self):
-        logger.debug("WSLive connecting…")
-        async with websockets.connect(WS_URL) as ws:
-            await ws.send(json.dumps({
-                "op":"subscribe",
-                "args":[{"channel":"candle1m","instId":self.inst}]
-            }))
-            logger.debug("WSLive subscribed candle1m")
-            async for raw in ws:
-                logger.debug(f"WSLive RAW: {raw}")
-                d = json.loads(raw)
-                if d.get("event"):
-                    continue
-                arg = d.get("arg", {})
-                if arg.get("channel") != "candle1m":
-                    continue
-                k = d["data"][0]  # [ts,o,h,l,c,vol,…]
-                self.new_candle.emit({
-                    "ts":    int(k[0]),
-                    "close": float(k[4])
-                })
-
-class WSSecCandle(QObject):
-    """1s K 线聚合（trades）"""
-    new_candle = pyqtSignal(dict)  # dict(ts, open, high, low, close, volume)
+        self.manager.subscribe(self.channel, self.inst, self._on_msg)
+        logger.debug(f"{type(self).__name__} subscribed {self.channel} {self.inst}")
 
-    def __init__(self, inst: str):
-        super().__init__()
-        self.inst = inst
-        self._bar = None
+    def stop(self):
+        self.manager.unsubscribe(self.channel, self.inst, self._on_msg)
 
-    def start(self):
-        threading.Thread(target=self._run, daemon=True).start()
-
-    def _run(self):
-        asyncio.run(self._ws())
-
-    async def _ws(self):
-        logger.debug("WSSecCandle connecting…")
-        async with websockets.connect(WS_URL) as ws:
-            await ws.send(json.dumps({
-                "op":"subscribe",
-                "args":[{"channel":"trades","instId":self.inst}]
-            }))
-            logger.debug("WSSecCandle subscribed trades")
-            async for raw in ws:
-                logger.debug(f"WS1S RAW: {raw}")
-                d = json.loads(raw)
-                if d.get("event"):
-                    continue
-                arg = d.get("arg", {})
-                if arg.get("channel") != "trades":
-                    continue
-                for t in d.get("data", []):
-                    dt = datetime.fromisoformat(t["ts"].replace("Z","+00:00"))
-                    ts_ms = int(dt.timestamp()*1000)
-                    bucket = (ts_ms//1000)*1000
-                    price = float(t["px"])
-                    size  = float(t["sz"])
-                    bar = self._bar
-                    if bar is None or bucket != bar["ts"]:
-                        if bar:
-                            logger.debug(f"WS1S emit bar: {bar}")
-                            self.new_candle.emit(bar.copy())
-                        self._bar = {
-                            "ts":     bucket,
-                            "open":   price,
-                            "high":   price,
-                            "low":    price,
-                            "close":  price,
-                            "volume": size
-                        }
-                    else:
-                        bar["high"]   = max(bar["high"], price)
-                        bar["low"]    = min(bar["low"], price)
-                        bar["close"]  = price
-                        bar["volume"] += size
-
-            # Emit the last candle when the stream ends
-        if self._bar:
-            logger.debug(f"WS1S emit final bar: {self._bar}")
-            self.new_candle.emit(self._bar.copy())
-            self._bar = None
-
-class WSOrderBook(QObject):
-    """实时深度 books5"""
-    new_book = pyqtSignal(list, list)  # bids, asks
-
-    def __init__(self, inst: str):
-        super().__init__()
-        self.inst = inst
+    @abstractmethod
+    def _on_msg(self, d: dict):
+        """处理一条已解析的推送（WSManager 线程）"""
+
+class WSLive(_Channel):
+    """实时 K 线（默认 1m）；断线重连后用 REST 精确回补缺口，回补期间的推送先缓存再按序合并"""
+    new_candle = pyqtSignal(dict)  # dict(ts, open, high, low, close, volume)
+
+    def __init__(self, inst: str, manager: WSManager | None = None, bar: str = "1m", pool=None):
+        super().__init__(inst, manager)
+        self.bar     = bar
+        self.channel = f"candle{bar}"
+        self.pool    = pool       # 回补用的共享线程池
+        self._last_ts = None      # 已发出的最新 K 线 ts
+        self._filling = False
+        self._pending = []
+        self._lock    = threading.Lock()
+        METRICS.gauge(f"queue.gapfill.{inst}.{bar}", lambda: len(self._pending))
 
     def start(self):
-        threading.Thread(target=self._run, daemon=True).start()
-
-    def _run(self):
-        asyncio.run(self._ws())
-
-    async def _ws(self):
-        logger.debug("WSOrderBook connecting…")
-        async with websockets.connect(WS_URL) as ws:
-            await ws.send(json.dumps({
-                "op":"subscribe",
-                "args":[{"channel":"books5","instId":self.inst}]
-            }))
-            logger.debug("WSOrderBook subscribed books5")
-            async for raw in ws:
-                logger.debug(f"WSOB RAW: {raw}")
-                d = json.loads(raw)
-                if d.get("event"):
-                    continue
-                arg = d.get("arg", {})
-                if arg.get("channel") != "books5":
-                    continue
-                ob = d["data"][0]
-                bids = ob.get("bids", [])
-                asks = ob.get("asks", [])
-                logger.debug(f"WSOB data bids={len(bids)} asks={len(asks)}")
-                self.new_book.emit(bids, asks)
+        super().start()
+        self.manager.add_reconnect_hook(self._on_reconnect)
+
+    def stop(self):
+        self.manager.remove_reconnect_hook(self._on_reconnect)
+        super().stop()
+
+    def _on_msg(self, d: dict):
+        for k in d["data"]:  # [ts,o,h,l,c,vol,…]
+            candle = {
+                "ts":     int(k[0]),
+                "open":   float(k[1]),
+                "high":   float(k[2]),
+                "low":    float(k[3]),
+                "close":  float(k[4]),
+                "volume": float(k[5])
+            }
+            with self._lock:
+                if self._filling:
+                    self._pending.append(candle)
+                else:
+                    self._emit(candle)
+
+    def _emit(self, candle: dict):
+        # 比已发出的更早的 K 线已被合并过，丢弃以免重复
+        if self._last_ts is not None and candle["ts"] < self._last_ts:
+            return
+        self._last_ts = candle["ts"]
+        self.new_candle.emit(candle)
+
+    def _on_reconnect(self):
+        # _last_ts 由接收路径在锁内更新，同一把锁下读取并进入缓存模式
+        with self._lock:
+            if self._last_ts is None:
+                return
+            self._filling, since = True, self._last_ts
+        threading.Thread(target=self._gap_fill, args=(since,), daemon=True).start()
+
+    def _gap_fill(self, since_ms: int):
+        try:
+            df = Backfiller(self.inst, self.bar, pool=self.pool).fetch(since_ms, int(time.time()*1000))
+            logger.info(f"WSLive gap-fill {self.inst} from {since_ms}: {len(df)} candles")
+            with self._lock:
+                for r in df.itertuples(index=False):
+                    self._emit({"ts": int(r.ts.timestamp()*1000), "open": r.open, "high": r.high,
+                                "low": r.low, "close": r.close, "volume": r.volume})
+        except Exception as e:
+            logger.warning(f"WSLive gap-fill failed: {e}")
+        finally:
+            with self._lock:
+                for candle in self._pending:
+                    self._emit(candle)
+                self._pending, self._filling = [], False
+
+class WSSecCandle(_Channel):
+    """秒级 K 线聚合（trades）：同一成交流同时聚合 SEC_BAR_WIDTHS 中的多个周期"""
+    new_candle = pyqtSignal(dict)       # 最细周期（1s）：dict(ts, open, high, low, close, volume)
+    new_bar    = pyqtSignal(int, dict)  # 所有周期：(width_ms, bar)
+    channel = "trades"
+
+    def __init__(self, inst: str, manager: WSManager | None = None, widths_ms=SEC_BAR_WIDTHS):
+        super().__init__(inst, manager)
+        self.agg = TradeAggregator(widths_ms)
+
+    def stop(self):
+        super().stop()
+        # 流结束时收掉未完成的 K 线
+        self._publish(self.agg.flush())
+
+    def _on_msg(self, d: dict):
+        data = d.get("data")
+        if not data:
+            return
+        # OKX 成交 ts 为毫秒整数字符串，直接按整数分桶
+        ts = [int(t["ts"]) for t in data]
+        px = [float(t["px"]) for t in data]
+        sz = [float(t["sz"]) for t in data]
+        METRICS.inc("ws.trades", len(data))
+        METRICS.observe("lat.exch_to_recv.trades_ms", time.time()*1000 - ts[-1])
+        self._publish(self.agg.add(ts, px, sz))
+
+    def _publish(self, closed: list[tuple[int, dict]]):
+        fine = self.agg.widths[0]
+        for w, bar in closed:
+            if w == fine:
+                logger.debug("WS1S emit bar: %s", bar)
+                self.new_candle.emit(bar)
+            self.new_bar.emit(w, bar)
+
+class WSOrderBook(_Channel):
+    """实时深度：books5 / books / books-l2-tbt，在 WSManager 线程里合并增量并校验，只把前 N 档发给界面"""
+    new_book = pyqtSignal(object, object)  # bids, asks：(n,2) 的 [price, size] 数组，已按优先级排序
+
+    def __init__(self, inst: str, manager: WSManager | None = None,
+                 channel: str = OB_CHANNEL, depth: int = OB_DEPTH):
+        super().__init__(inst, manager)
+        self.channel = channel
+        self.depth   = depth
+        self.book    = OrderBook()
+        self._resyncing = False
+
+    def _on_msg(self, d: dict):
+        action = d.get("action", "snapshot")   # books5 每条都是全量
+        if self._resyncing and action != "snapshot":
+            return
+        self._resyncing = False
+        for ob in d["data"]:
+            if not self.book.apply(ob, action):
+                logger.warning(f"WSOB {self.channel} {self.inst} checksum/seq mismatch, resubscribing")
+                self._resyncing = True
+                self.book.reset()
+                self.manager.resubscribe(self.channel, self.inst)
+                return
+        METRICS.observe(f"lat.exch_to_recv.{self.channel}_ms", time.time()*1000 - self.book.ts)
+        bids, asks = self.book.top(self.depth)
+        logger.debug("WSOB data bids=%d asks=%d", len(bids), len(asks))
+        self.new_book.emit(bids, asks)
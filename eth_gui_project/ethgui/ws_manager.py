@@ -0,0 +1,203 @@
+# ethgui/ws_manager.py
+
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import websockets
+from .config import WS_URL, WS_PROXY, RECORD_WS, WS_PING_INTERVAL, WS_PONG_TIMEOUT, WS_RECONNECT_MIN, WS_RECONNECT_MAX
+from .logger import logger, log_raw
+from .metrics import METRICS
+
+# orjson 解码更快，未安装时退回标准库
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+class WSManager:
+    """单连接多路复用：一个线程、一个事件循环、一条 socket，按 (channel, instId) 分发消息；
+    断线后指数退避重连、重新订阅，并调用重连钩子补缺口"""
+
+    _shared: "WSManager | None" = None
+
+    @classmethod
+    def shared(cls) -> "WSManager":
+        if cls._shared is None:
+            cls._shared = cls()
+            if RECORD_WS:
+                from .recorder import Recorder
+                cls._shared.recorder = Recorder()
+        return cls._shared
+
+    def __init__(self, url: str = WS_URL):
+        self.url    = url
+        self._subs: dict[tuple[str, str], list] = {}   # (channel, instId) -> [callback(msg)]
+        self._lock  = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ws    = None
+        self._thread: threading.Thread | None = None
+        self._hooks   = []        # 重连成功后在事件循环线程调用，须立即返回
+        self._closing = False
+        self._last_rx = 0.0
+        self.reconnects = 0
+        self.recorder = None      # recorder.Recorder：收到的原始帧连同接收时刻录制下来
+
+    # — 线程安全的订阅接口 — #
+    def subscribe(self, channel: str, inst: str, callback):
+        """注册回调（在事件循环线程中以解析后的消息 dict 调用）；首个订阅时发送 subscribe"""
+        key = (channel, inst)
+        with self._lock:
+            cbs = self._subs.setdefault(key, [])
+            first = not cbs
+            cbs.append(callback)
+        if first:
+            self._post("subscribe", [key])
+        self.start()
+
+    def unsubscribe(self, channel: str, inst: str, callback):
+        key = (channel, inst)
+        with self._lock:
+            cbs = self._subs.get(key, [])
+            if callback in cbs:
+                cbs.remove(callback)
+            last = key in self._subs and not cbs
+            if last:
+                del self._subs[key]
+        if last:
+            self._post("unsubscribe", [key])
+
+    def resubscribe(self, channel: str, inst: str):
+        """取消再订阅同一频道，用于让服务端重新推送全量快照"""
+        self._post("unsubscribe", [(channel, inst)])
+        self._post("subscribe", [(channel, inst)])
+
+    def add_reconnect_hook(self, hook):
+        self._hooks.append(hook)
+
+    def remove_reconnect_hook(self, hook):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def stop(self):
+        self._closing = True
+        if self.recorder is not None:
+            self.recorder.close()
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+
+    def start(self):
+        if self._thread is None:
+            # 如需代理，首次连接前注入 ALL_PROXY（不在导入时改环境变量）
+            if WS_PROXY and "ALL_PROXY" not in os.environ:
+                os.environ["ALL_PROXY"] = WS_PROXY
+                logger.debug(f"Set ALL_PROXY={WS_PROXY}")
+            self._thread = threading.Thread(target=self._run, name="ws-manager", daemon=True)
+            self._thread.start()
+
+    # — 事件循环线程 — #
+    def _post(self, op: str, keys: list[tuple[str, str]]):
+        if self._loop is not None:
+            fut = asyncio.run_coroutine_threadsafe(self._send(op, keys), self._loop)
+            fut.add_done_callback(lambda f: self._sent(f, op, keys))
+
+    @staticmethod
+    def _sent(fut, op: str, keys):
+        # 发送失败（连接恰好断开等）只记日志：重连后会按当前订阅表统一重发
+        if not fut.cancelled() and fut.exception() is not None:
+            logger.warning(f"WSManager {op} {keys} failed: {fut.exception()!r}")
+            METRICS.inc("ws.send_errors")
+
+    async def _send(self, op: str, keys: list[tuple[str, str]]):
+        if self._ws is None:
+            return  # 尚未连上，连上后会统一订阅
+        await self._ws.send(json.dumps({
+            "op": op,
+            "args": [{"channel": ch, "instId": inst} for ch, inst in keys]
+        }))
+        logger.debug(f"WSManager {op} {keys}")
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        delay, connected = WS_RECONNECT_MIN, False
+        while not self._closing:
+            opened = time.monotonic()
+            try:
+                logger.debug("WSManager connecting…")
+                async with websockets.connect(self.url, ping_interval=None) as ws:
+                    self._ws, self._last_rx = ws, time.monotonic()
+                    with self._lock:
+                        keys = list(self._subs)
+                    if keys:
+                        await self._send("subscribe", keys)
+                    if connected:
+                        self.reconnects += 1
+                        METRICS.inc("ws.reconnects")
+                        logger.info(f"WSManager reconnected (#{self.reconnects})")
+                        for hook in list(self._hooks):
+                            try:
+                                hook()
+                            except Exception as e:
+                                logger.exception(f"WS reconnect hook {hook} failed: {e}")
+                    connected = True
+                    keepalive = asyncio.create_task(self._keepalive(ws))
+                    try:
+                        async for raw in ws:
+                            self._last_rx = time.monotonic()
+                            if raw == "pong":
+                                continue
+                            self._dispatch(raw)
+                    finally:
+                        keepalive.cancel()
+                logger.warning("WSManager connection closed")
+            except Exception as e:
+                logger.warning(f"WSManager connection error: {e}")
+            self._ws = None
+            if self._closing:
+                break
+            if time.monotonic() - opened > WS_PING_INTERVAL:
+                delay = WS_RECONNECT_MIN      # 稳定运行过一段时间才重置退避
+            wait = delay * (1 + random.random() * 0.2)
+            logger.debug(f"WSManager reconnect in {wait:.1f}s")
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, WS_RECONNECT_MAX)
+
+    async def _keepalive(self, ws):
+        """OKX 心跳：空闲时发文本 ping，超时无回应则主动断开以触发重连"""
+        pinged = 0.0
+        while True:
+            await asyncio.sleep(1)
+            now  = time.monotonic()
+            idle = now - self._last_rx
+            if idle > WS_PING_INTERVAL + WS_PONG_TIMEOUT:
+                logger.warning(f"WSManager no data for {idle:.0f}s, closing")
+                await ws.close()
+                return
+            if idle > WS_PING_INTERVAL and pinged < self._last_rx:
+                await ws.send("ping")
+                pinged = now
+
+    def _dispatch(self, raw):
+        d = _loads(raw)
+        arg = d.get("arg", {})
+        if self.recorder is not None:
+            self.recorder.add(time.time_ns(), arg.get("channel", ""), arg.get("instId", ""), raw)
+        log_raw(arg.get("channel"), raw)
+        METRICS.inc(f"ws.msgs.{arg.get('channel')}")
+        if d.get("event"):
+            if d["event"] == "error":
+                logger.warning(f"WS error event: {d}")
+            return
+        with self._lock:
+            cbs = list(self._subs.get((arg.get("channel"), arg.get("instId")), ()))
+        for cb in cbs:
+            try:
+                cb(d)
+            except Exception as e:
+                logger.exception(f"WS handler {cb} failed: {e}")
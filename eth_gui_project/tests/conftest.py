@@ -0,0 +1,32 @@
+# tests/conftest.py
+"""离线测试：合成数据与本地桩来自 bench/；日志、缓存等相对路径落到临时目录，不碰工作区"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["NO_PROXY"] = ",".join(filter(None, [os.environ.get("NO_PROXY"), "127.0.0.1", "localhost"]))
+os.chdir(tempfile.mkdtemp(prefix="ethgui-tests-"))
+
+@pytest.fixture(scope="session")
+def qapp():
+    """跨线程发出的 Qt 信号排队投递，需要事件循环；图表控件需要 QApplication"""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+def wait_until(cond, timeout: float = 10.0):
+    """轮询 cond 并处理 Qt 事件，超时则失败"""
+    from PyQt6.QtCore import QCoreApplication
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "timed out"
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.processEvents()
+        time.sleep(0.01)
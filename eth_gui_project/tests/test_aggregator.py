@@ -0,0 +1,52 @@
+# tests/test_aggregator.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from ethgui.aggregator import TradeAggregator
+
+T0 = 1_700_006_400_000
+
+def _reference(ts, px, sz, w) -> list[dict]:
+    df = pd.DataFrame({"b": ts - ts % w, "px": px, "sz": sz})
+    g  = df.groupby("b", sort=True)
+    return [{"ts": int(b), "open": r.px.iloc[0], "high": r.px.max(), "low": r.px.min(),
+             "close": r.px.iloc[-1], "volume": r.sz.sum()} for b, r in g]
+
+def test_matches_groupby_for_every_width():
+    rng = np.random.default_rng(1)
+    ts  = T0 + np.cumsum(rng.exponential(120, 5000)).astype(np.int64)
+    px  = 2000 + np.cumsum(rng.normal(0, 0.05, len(ts)))
+    sz  = rng.gamma(1.5, 0.2, len(ts))
+    agg = TradeAggregator((15000, 1000, 5000))
+    out = []
+    for i in range(0, len(ts), 7):                   # 分批到达
+        out += agg.add(ts[i:i+7].tolist(), px[i:i+7].tolist(), sz[i:i+7].tolist())
+    out += agg.flush()
+    for w in (1000, 5000, 15000):
+        got, ref = [b for ww, b in out if ww == w], _reference(ts, px, sz, w)
+        assert [b["ts"] for b in got] == [r["ts"] for r in ref]
+        for g, r in zip(got, ref):
+            assert g["open"] == r["open"] and g["close"] == r["close"]
+            assert g["high"] == r["high"] and g["low"] == r["low"]
+            assert g["volume"] == pytest.approx(r["volume"])
+
+def test_bar_closes_when_next_starts():
+    agg = TradeAggregator((1000, 5000))
+    assert agg.add([T0 + 10, T0 + 900], [1.0, 2.0], [1.0, 1.0]) == []
+    closed = agg.add([T0 + 1000], [3.0], [1.0])
+    assert closed == [(1000, {"ts": T0, "open": 1.0, "high": 2.0, "low": 1.0, "close": 2.0, "volume": 2.0})]
+    closed = agg.add([T0 + 5000], [4.0], [1.0])      # 1s 收盘后折叠，5s 随之收盘
+    assert [(w, b["ts"]) for w, b in closed] == [(1000, T0 + 1000), (5000, T0)]
+    assert closed[1][1]["volume"] == 3.0 and closed[1][1]["close"] == 3.0
+
+def test_late_trade_joins_current_bar():
+    agg = TradeAggregator((1000,))
+    agg.add([T0 + 1500], [10.0], [1.0])
+    agg.add([T0 + 400], [5.0], [2.0])                # 上一桶的迟到成交
+    (w, bar), = agg.flush()
+    assert bar["ts"] == T0 + 1000 and bar["low"] == 5.0 and bar["volume"] == 3.0
+
+def test_widths_must_be_multiples():
+    with pytest.raises(ValueError):
+        TradeAggregator((1000, 1500))
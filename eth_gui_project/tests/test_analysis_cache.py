@@ -0,0 +1,38 @@
+# tests/test_analysis_cache.py
+
+import pandas as pd
+from bench import synth
+from ethgui import analysis_cache
+from ethgui.analysis_cache import AnalysisCache
+from ethgui.indicators import PivotTracker, LevelClusterer, detect_levels
+
+def _eq(a, b):
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False)
+
+def test_hit_on_repeat_and_survives_restart(tmp_path):
+    df = synth.candles(3000)
+    ac = AnalysisCache(tmp_path)
+    lv = ac.levels("ETH-USDT", "1m", df, 1.2, 2)
+    _eq(lv, detect_levels(df, 1.2, 2))
+    _eq(ac.levels("ETH-USDT", "1m", df, 0.8, 3), detect_levels(df, 0.8, 3))   # 只换参数：复用枢轴价
+    assert len(ac._entries) == 1 and len(next(iter(ac._entries.values())).levels) == 2
+    ac.save()
+    again = AnalysisCache(tmp_path)
+    _eq(again.levels("ETH-USDT", "1m", df, 1.2, 2), lv)
+    changed = df.assign(close=df["close"].where(df.index != len(df) - 1, 1.0))   # 最后一根变化：新的数据版本
+    again.levels("ETH-USDT", "1m", changed, 1.2, 2)
+    assert len(again._entries) == 2
+
+def test_live_path_skips_cache(tmp_path, monkeypatch):
+    df = synth.candles(3000)
+    ac = AnalysisCache(tmp_path)
+    ac.levels("ETH-USDT", "1m", df.iloc[:2000], 1.2, 2)
+    before = list(ac._entries)
+    def no_fingerprint(_):
+        raise AssertionError("fingerprint on the live path")
+    monkeypatch.setattr(analysis_cache, "fingerprint", no_fingerprint)
+    tracker, clusterer = PivotTracker(), LevelClusterer()
+    for n in range(2000, 3001, 250):                # 实时新 K 线：增量枢轴点/聚类，不查也不写缓存
+        lv = ac.levels("ETH-USDT", "1m", df.iloc[:n], 1.2, 2, tracker=tracker, clusterer=clusterer, cache=False)
+        _eq(lv, detect_levels(df.iloc[:n], 1.2, 2))
+    assert list(ac._entries) == before
@@ -0,0 +1,86 @@
+# tests/test_backfill.py
+
+import time
+import pytest
+from bench import synth
+from bench.stubs import RestStub
+from ethgui import backfill
+from ethgui.backfill import Backfiller, split_windows, plan_windows, fetched_span
+from ethgui.rest_client import RestClient, TokenBucket
+from ethgui.config import REST_RATE, REST_BURST, REST_RECENT_BARS, REST_HISTORY_LIMIT, REST_HISTORY_RATE, REST_HISTORY_BURST
+
+T0 = synth.T0_MS
+
+def test_split_windows_tile_range():
+    wins = split_windows(T0, T0 + 1000 * 60_000 - 1, "1m", limit=300)
+    assert wins[0][0] == T0 and wins[-1][1] == T0 + 1000 * 60_000 - 1
+    assert all(b[0] == a[1] + 1 for a, b in zip(wins, wins[1:]))
+    assert all(e - s + 1 == 300 * 60_000 for s, e in wins[:-1])
+
+def test_plan_windows_routes_old_ranges_to_history():
+    now  = T0 + 10_000 * 60_000
+    wins = plan_windows(T0, now, "1m", now_ms=now)
+    cut  = now - REST_RECENT_BARS * 60_000
+    assert all(e < cut for s, e, h in wins if h) and all(s >= cut for s, e, h in wins if not h)
+    assert all(e - s + 1 <= REST_HISTORY_LIMIT * 60_000 for s, e, h in wins if h)
+    assert wins[0][0] == T0 and wins[-1][1] == now
+    assert all(b[0] == a[1] + 1 for a, b in zip(wins, wins[1:]))
+
+def test_fetched_span_is_returned_range():
+    df = synth.candles(10, start_ms=T0 + 5 * 60_000)
+    assert fetched_span(df, "1m", (T0, T0 + 100 * 60_000)) == (T0 + 5 * 60_000, T0 + 15 * 60_000 - 1)
+    assert fetched_span(df.iloc[:0], "1m", (T0, T0 + 100 * 60_000)) is None
+
+def test_rate_fits_okx_limit():
+    # 最初 2 秒最多发出 burst + 2 × rate 个请求
+    assert REST_BURST + 2 * REST_RATE <= 40
+    assert REST_HISTORY_BURST + 2 * REST_HISTORY_RATE <= 20
+
+def test_token_bucket_paces_after_burst():
+    tb = TokenBucket(rate=50, burst=5)
+    t = time.monotonic()
+    for _ in range(15):
+        tb.acquire()
+    assert time.monotonic() - t >= (15 - 5) / 50 * 0.9
+
+def test_fetch_stitches_windows_in_order():
+    df = synth.candles(2000)
+    with RestStub(synth.candle_rows(df)) as stub:
+        seen = []
+        bf = Backfiller("ETH-USDT", "1m", workers=4, client_factory=lambda: RestClient(stub.url, limiter=None, history_limiter=None),
+                        progress=lambda d, t: seen.append((d, t)))
+        out = bf.fetch(T0, T0 + 2000 * 60_000 - 1)
+    assert len(out) == 2000
+    assert out["ts"].is_monotonic_increasing and out["ts"].is_unique
+    assert (out["ts"].to_numpy() == df["ts"].to_numpy()).all()
+    # 超出最近 REST_RECENT_BARS 根，全部走 history-candles，每窗 REST_HISTORY_LIMIT 根
+    assert seen[-1] == (20, 20) and stub.calls == 20
+
+class _Flaky(RestClient):
+    """每个窗口第一次请求失败（失败记录跨线程共享）"""
+    failed: set = set()
+
+    def get_candles(self, inst, bar, **params):
+        if params["after"] not in self.failed:
+            self.failed.add(params["after"])
+            raise ConnectionError("boom")
+        return super().get_candles(inst, bar, **params)
+
+def test_fetch_retries_failed_windows(monkeypatch):
+    monkeypatch.setattr(backfill.time, "sleep", lambda _s: None)
+    df = synth.candles(900)
+    with RestStub(synth.candle_rows(df)) as stub:
+        _Flaky.failed = set()
+        bf = Backfiller("ETH-USDT", "1m", client_factory=lambda: _Flaky(stub.url, limiter=None, history_limiter=None))
+        out = bf.fetch(T0, T0 + 900 * 60_000 - 1)
+    assert len(out) == 900 and out["ts"].is_monotonic_increasing
+    assert len(_Flaky.failed) == 9 and stub.calls == 9
+
+def test_fetch_gives_up_after_retry_rounds(monkeypatch):
+    monkeypatch.setattr(backfill.time, "sleep", lambda _s: None)
+    class Down:
+        def get_candles(self, *a, **k):
+            raise ConnectionError("down")
+    bf = Backfiller("ETH-USDT", "1m", client_factory=Down)
+    with pytest.raises(RuntimeError):
+        bf.fetch(T0, T0 + 600 * 60_000 - 1)
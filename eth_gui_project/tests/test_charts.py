@@ -0,0 +1,29 @@
+# tests/test_charts.py
+
+from ethgui.charts import LiveCandleCanvas
+
+T0 = 1_700_006_400_000      # 2023-11-15 00:00:00 UTC
+
+def _bar(i: int, close: float = 100.0) -> dict:
+    return {"ts": T0 + i * 1000, "open": 100.0, "high": 101.0, "low": 99.0, "close": close}
+
+def test_time_axis_follows_ring_slots(qapp):
+    cv = LiveCandleCanvas(capacity=10)
+    assert cv._fmt_time(0) == ""
+    for i in range(25):                              # 绕环两圈多
+        cv.push(_bar(i))
+    assert cv._fmt_time(0) == "00:00:24"
+    assert cv._fmt_time(-9) == "00:00:15"
+    assert cv._fmt_time(-10) == "" and cv._fmt_time(1) == ""
+    cv.push(_bar(24, close=100.5))                   # 同 ts 更新不移动刻度
+    assert cv._fmt_time(0) == "00:00:24"
+
+def test_tick_labels_refresh_on_new_bar(qapp):
+    cv = LiveCandleCanvas(capacity=100); cv.resize(600, 300)
+    for i in range(100):
+        cv.push(_bar(i))
+    cv.redraw()
+    before = [t.get_text() for t in cv.ax.get_xticklabels()]
+    cv.push(_bar(100)); cv.redraw()                  # blit 路径
+    after = [t.get_text() for t in cv.ax.get_xticklabels()]
+    assert "00:01:39" in before and "00:01:40" in after
@@ -0,0 +1,123 @@
+# tests/test_daemon.py
+"""DaemonClient 对本地 QLocalServer 的断线重连与重发订阅；MarketDaemon 按客户端关注释放自选列表"""
+
+import os
+import itertools
+import pandas as pd
+import pytest
+from PyQt6.QtNetwork import QLocalServer
+from ethgui import wire, remote, daemon, watchlist
+from ethgui.remote import DaemonClient, RemoteWatchlist
+from conftest import wait_until
+
+_names = itertools.count()
+
+def _name() -> str:
+    return f"ethgui-test-{os.getpid()}-{next(_names)}"
+
+class Server:
+    """记录每条连接收到的 (类型, 参数)"""
+
+    def __init__(self, name: str):
+        self.name, self.conns = name, []
+        self.srv = QLocalServer()
+        self.srv.newConnection.connect(self._accept)
+        assert self.srv.listen(name)
+
+    def _accept(self):
+        while self.srv.hasPendingConnections():
+            sock, reader, got = self.srv.nextPendingConnection(), wire.FrameReader(), []
+            sock.readyRead.connect(lambda s=sock, r=reader, g=got:
+                                   g.extend((k, wire.decode(k, p)) for k, p in r.feed(bytes(s.readAll()))))
+            self.conns.append((sock, got))
+
+    def drop(self):
+        for sock, _ in self.conns:
+            sock.abort()
+
+@pytest.fixture
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(remote, "WS_RECONNECT_MIN", 0.05)
+    monkeypatch.setattr(remote, "WS_RECONNECT_MAX", 0.2)
+
+def test_client_resubscribes_after_drop_and_restart(qapp, fast_retry):
+    name = _name()
+    srv  = Server(name)
+    c    = DaemonClient.connect_to(name)
+    assert c is not None
+    c.subscribe(wire.SUB_TRADES, "ETH-USDT")
+    c.subscribe(wire.WATCH, "ETH-USDT", "1m")
+    c.subscribe(wire.WATCH, "ETH-USDT", "1m")            # 引用计数：只发一次
+    c.focus("ETH-USDT", "1m")
+    subs = [(wire.SUB_TRADES, ("ETH-USDT", "")), (wire.WATCH, ("ETH-USDT", "1m")), (wire.FOCUS, ("ETH-USDT", "1m"))]
+    wait_until(lambda: len(srv.conns) == 1 and len(srv.conns[0][1]) == 3)
+    assert srv.conns[0][1] == subs
+    c.unsubscribe(wire.WATCH, "ETH-USDT", "1m")
+    c.unsubscribe(wire.SUB_TRADES, "ETH-USDT")
+    wait_until(lambda: len(srv.conns[0][1]) == 4)
+    assert srv.conns[0][1][3] == (wire.UNSUB_TRADES, ("ETH-USDT", ""))
+
+    lost = []
+    c.disconnected.connect(lambda: lost.append(1))
+    srv.drop()                                            # 连接被掐断：退避后重连并重发订阅与视图
+    wait_until(lambda: len(srv.conns) == 2 and len(srv.conns[1][1]) == 2)
+    assert lost and srv.conns[1][1] == subs[1:]
+
+    srv.drop(); srv.srv.close()                           # 守护进程重启：关闭期间的重连失败后继续重试
+    wait_until(lambda: len(lost) == 2)
+    srv2 = Server(name)
+    wait_until(lambda: len(srv2.conns) == 1 and len(srv2.conns[0][1]) == 2)
+    assert srv2.conns[0][1] == subs[1:] and c.is_connected
+    c.sock.abort(); srv2.srv.close()
+
+class _Manager:
+    def subscribe(self, channel, inst, cb): pass
+    def unsubscribe(self, channel, inst, cb): pass
+    def add_reconnect_hook(self, cb): pass
+    def remove_reconnect_hook(self, cb): pass
+    def stop(self): pass
+
+class _Backfiller:
+    def __init__(self, inst, bar, pool=None): pass
+
+    def fetch(self, start, end):
+        return pd.DataFrame(columns=["ts", "open", "high", "low", "close", "volume"])
+
+class _Instruments:
+    def __init__(self, cache_dir): pass
+    def refresh(self): pass
+
+    def valid(self, inst):
+        return inst != "BAD-USDT"
+
+def test_daemon_releases_watches_on_focus_change(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon.WSManager, "shared", classmethod(lambda cls: _Manager()))
+    monkeypatch.setattr(daemon, "Instruments", _Instruments)
+    monkeypatch.setattr(watchlist, "Backfiller", _Backfiller)
+    name = _name()
+    d = daemon.MarketDaemon(name, ["ETH-USDT"], cache_dir=tmp_path)
+    assert d.listen()
+    keys = lambda: set(d.watch._watches)
+    base = {("ETH-USDT", b) for b in d.watch.bars}
+    c  = DaemonClient.connect_to(name)
+    rw = RemoteWatchlist(c)
+    errors = []
+    rw.error.connect(lambda i, b, msg: errors.append((i, b)))
+    try:
+        rw.focus("DOGE-USDT", "1m")
+        wait_until(lambda: ("DOGE-USDT", "1m") in keys())
+        wait_until(lambda: rw.watch("DOGE-USDT", "1m").loaded)
+        rw.focus("ETH-USDT", "5m")                        # 切走：DOGE 发 UNWATCH，守护进程移除
+        wait_until(lambda: keys() == base | {("ETH-USDT", "5m")})
+        rw.focus("ETH-USDT", "1m")                        # 常驻品种的非常驻周期同样释放，常驻周期保留
+        wait_until(lambda: keys() == base)
+        rw.focus("BAD-USDT", "1m")                        # 守护进程拒绝未知品种
+        wait_until(lambda: errors == [("BAD-USDT", "1m")])
+        assert keys() == base
+        rw.add("SOL-USDT", ["1m"])
+        wait_until(lambda: ("SOL-USDT", "1m") in keys())
+        c.sock.abort()                                    # 客户端断开：其关注的品种一并释放
+        wait_until(lambda: keys() == base)
+    finally:
+        c.sock.abort()
+        d.close()
@@ -0,0 +1,106 @@
+# tests/test_indicators.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from ethgui.indicators import find_pivots, PivotTracker, LevelClusterer, cluster_levels, _gap_labels
+
+def _loop_pivots(high, low, window=5):
+    """原实现的双重循环（窗口可变）：high 为窗口最大值或 low 为窗口最小值"""
+    k, out = window // 2, np.zeros(len(high), dtype=bool)
+    for i in range(k, len(high) - k):
+        out[i] = high[i] == max(high[i-k:i+k+1]) or low[i] == min(low[i-k:i+k+1])
+    return out
+
+def _series(n, seed):
+    """少量离散价位：大量并列极值与平台"""
+    rng = np.random.default_rng(seed)
+    mid  = np.round(np.cumsum(rng.integers(-1, 2, n)) + rng.integers(0, 3, n) * (rng.random(n) < 0.2))
+    high = mid + rng.integers(0, 2, n)
+    low  = mid - rng.integers(0, 2, n)
+    high[n // 3: n // 3 + 12] = high[n // 3]          # 长平台
+    low[n // 2: n // 2 + 9]   = low[n // 2]
+    return high.astype(float), low.astype(float)
+
+@pytest.mark.parametrize("window", [3, 5, 9])
+@pytest.mark.parametrize("seed", range(5))
+def test_find_pivots_matches_loop(window, seed):
+    high, low = _series(400, seed)
+    np.testing.assert_array_equal(find_pivots(high, low, window), _loop_pivots(high, low, window))
+
+def test_short_and_invalid():
+    assert not find_pivots([1.0, 2.0, 1.0], [0.0, 0.0, 0.0], 5).any()
+    with pytest.raises(ValueError):
+        find_pivots([1.0] * 10, [1.0] * 10, 4)
+
+@pytest.mark.parametrize("window", [3, 5])
+def test_tracker_bar_by_bar_with_rewrites(window):
+    high, low = _series(600, seed=7)
+    rng = np.random.default_rng(8)
+    tr  = PivotTracker(window)
+    h, l = [], []
+    for i in range(len(high)):
+        h.append(high[i]); l.append(low[i])
+        for _ in range(int(rng.integers(0, 3))):      # 未收盘 K 线被改写若干次
+            h[-1] = max(h[-1], h[-1] + rng.integers(-1, 3))
+            l[-1] = min(l[-1], l[-1] - rng.integers(-1, 3), h[-1])
+            df = pd.DataFrame({"high": h, "low": l, "close": h})
+            np.testing.assert_array_equal(tr.update(df), _loop_pivots(h, l, window))
+        df = pd.DataFrame({"high": h, "low": l, "close": h})
+        np.testing.assert_array_equal(tr.update(df), _loop_pivots(h, l, window))
+    # 一次追加多根、以及序列变短（重新加载）都与全量一致
+    full = pd.DataFrame({"high": np.r_[h, high[:50] + 3], "low": np.r_[l, low[:50] + 3], "close": 0.0})
+    np.testing.assert_array_equal(tr.update(full), _loop_pivots(full["high"].tolist(), full["low"].tolist(), window))
+    part = full.iloc[:100]
+    np.testing.assert_array_equal(tr.update(part), _loop_pivots(part["high"].tolist(), part["low"].tolist(), window))
+    assert (tr.prices(part) == part["close"].to_numpy()[tr.mask]).all()
+
+# — 一维聚类：排序 + 间隔扫描与 sklearn DBSCAN 等价 — #
+def _prices(n, seed, grid=True):
+    rng = np.random.default_rng(seed)
+    if grid:                                       # 0.5 的整数倍：大量重复价与恰好相距 eps 的边界点
+        return np.round(rng.normal(100, 6, n) * 2) / 2
+    return rng.normal(100, 6, n)
+
+def _eq_levels(a, b):
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False)
+
+@pytest.mark.parametrize("grid", [True, False])
+@pytest.mark.parametrize("eps,min_hits", [(0.5, 2), (1.0, 3), (0.25, 4), (2.0, 12)])
+def test_gap_labels_match_sklearn(eps, min_hits, grid):
+    DBSCAN = pytest.importorskip("sklearn.cluster").DBSCAN
+    for seed in range(4):
+        p = _prices(300, seed, grid)
+        order  = np.argsort(p, kind="stable")
+        labels = np.empty(len(p), dtype=np.intp)
+        labels[order] = _gap_labels(p[order], order, eps, min_hits)
+        np.testing.assert_array_equal(labels, DBSCAN(eps=eps, min_samples=min_hits).fit(p.reshape(-1, 1)).labels_)
+        _eq_levels(cluster_levels(p, eps, min_hits, "gap"), cluster_levels(p, eps, min_hits, "dbscan"))
+
+def test_border_point_goes_to_first_expanded_cluster():
+    DBSCAN = pytest.importorskip("sklearn.cluster").DBSCAN
+    # 3.0 只是边界点，与左右两簇的核心点都在 eps 内；出现顺序决定簇编号
+    for p in ([1.0, 1.0, 1.0, 3.0, 5.0, 5.0, 5.0], [5.0, 5.0, 5.0, 3.0, 1.0, 1.0, 1.0], [3.0, 5.0, 1.0, 5.0, 1.0, 5.0, 1.0]):
+        p = np.array(p)
+        order = np.argsort(p, kind="stable")
+        labels = np.empty(len(p), dtype=np.intp)
+        labels[order] = _gap_labels(p[order], order, 2.0, 3)
+        np.testing.assert_array_equal(labels, DBSCAN(eps=2.0, min_samples=3).fit(p.reshape(-1, 1)).labels_)
+
+def test_clusterer_incremental_add_and_sync():
+    pytest.importorskip("sklearn")
+    p  = _prices(500, seed=11)
+    lc = LevelClusterer()
+    rng = np.random.default_rng(12)
+    n = 0
+    while n < len(p):
+        n = min(len(p), n + int(rng.integers(1, 30)))
+        cur = p[:n].copy()
+        if n > 3 and rng.random() < 0.4:           # 尾部枢轴被改写/撤销（最后一根 K 线变化）
+            cur[-2:] += 0.5
+        lc.sync(cur)
+        for eps, hits in ((0.5, 2), (1.0, 4)):
+            _eq_levels(lc.levels(eps, hits), cluster_levels(cur, eps, hits, "dbscan"))
+    lc.sync(p[:200])                               # 回退到更短的序列
+    _eq_levels(lc.levels(1.0, 3), cluster_levels(p[:200], 1.0, 3, "dbscan"))
+    assert lc.levels(1.0, 1000).empty
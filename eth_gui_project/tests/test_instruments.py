@@ -0,0 +1,89 @@
+# tests/test_instruments.py
+"""手动输入品种的校验（品种列表缓存与离线退化）与 Watchlist.focus 临时加入的品种在焦点移走时移除"""
+
+import json
+import time
+import pandas as pd
+from ethgui import instruments, watchlist
+from ethgui.instruments import Instruments
+from ethgui.watchlist import Watchlist
+from conftest import wait_until
+
+class _Client:
+    calls = 0
+
+    def get_instruments(self, inst_type):
+        _Client.calls += 1
+        return {"SPOT": ["ETH-USDT", "BTC-USDT"], "SWAP": ["ETH-USDT-SWAP"]}[inst_type]
+
+class _Down:
+    def get_instruments(self, inst_type):
+        raise ConnectionError("offline")
+
+def test_format_only_without_list(tmp_path):
+    ins = Instruments(tmp_path, client_factory=_Down)
+    ins.refresh(wait=True)                       # 拉取失败：仍只做格式检查
+    assert not ins.known
+    assert ins.valid("DOGE-USDT") and ins.valid("BTC-USD-250627")
+    assert not ins.valid("E") and not ins.valid("ETH-") and not ins.valid("eth-usdt") and not ins.valid("ETH USDT")
+
+def test_list_fetched_cached_and_reused(tmp_path):
+    _Client.calls = 0
+    ins = Instruments(tmp_path, client_factory=_Client)
+    ins.refresh(wait=True)
+    assert ins.known and not ins.stale and _Client.calls == 2
+    assert ins.valid("ETH-USDT-SWAP") and not ins.valid("ETH-USDTX")
+    assert json.loads((tmp_path / "instruments.json").read_text())["ids"] == ["BTC-USDT", "ETH-USDT", "ETH-USDT-SWAP"]
+    again = Instruments(tmp_path, client_factory=_Client)
+    again.refresh(wait=True)                     # 缓存未过期：不再请求
+    assert again.valid("BTC-USDT") and not again.valid("SOL-USDT") and _Client.calls == 2
+
+def test_stale_list_refreshed(tmp_path, monkeypatch):
+    (tmp_path / "instruments.json").write_text(json.dumps({"ts": time.time() - 10, "ids": ["OLD-USDT"]}))
+    monkeypatch.setattr(instruments, "INST_LIST_TTL", 5)
+    ins = Instruments(tmp_path, client_factory=_Client)
+    assert ins.stale and ins.valid("OLD-USDT")
+    ins.refresh(wait=True)
+    assert not ins.valid("OLD-USDT") and ins.valid("ETH-USDT")
+
+class _Manager:
+    """WSLive 需要的 WSManager 接口，只记录订阅"""
+
+    def __init__(self):
+        self.subs = set()
+
+    def subscribe(self, channel, inst, cb):
+        self.subs.add((channel, inst))
+
+    def unsubscribe(self, channel, inst, cb):
+        self.subs.discard((channel, inst))
+
+    def add_reconnect_hook(self, cb): pass
+    def remove_reconnect_hook(self, cb): pass
+
+class _Backfiller:
+    def __init__(self, inst, bar, pool=None): pass
+
+    def fetch(self, start, end):
+        return pd.DataFrame(columns=["ts", "open", "high", "low", "close", "volume"])
+
+def test_focus_drops_transient_watch(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(watchlist, "Backfiller", _Backfiller)
+    mgr = _Manager()
+    wl  = Watchlist(bars=["1m"], cache_dir=tmp_path, manager=mgr)
+    try:
+        wl.focus("ETH-USDT", "1m")
+        wl.add("ETH-USDT")                        # 启动时先 focus 再 add：之后常驻
+        wl.focus("DOGE-USDT", "1m")
+        assert wl.watch("DOGE-USDT", "1m") is not None
+        wl.focus("DOGE-USDT", "1m")               # 重复 focus 同一视图不移除
+        assert wl.watch("DOGE-USDT", "1m") is not None
+        wl.focus("ETH-USDT", "15m")               # 焦点移走：DOGE 移除并退订，常驻的 ETH 1m 保留
+        assert wl.watch("DOGE-USDT", "1m") is None
+        assert not any(inst == "DOGE-USDT" for _, inst in mgr.subs)
+        assert wl.watch("ETH-USDT", "1m") is not None and wl.watch("ETH-USDT", "15m") is not None
+        wl.focus("ETH-USDT", "1m")
+        assert wl.watch("ETH-USDT", "15m") is None
+        wait_until(lambda: wl.watch("ETH-USDT", "1m").loaded)
+    finally:
+        wl.close()
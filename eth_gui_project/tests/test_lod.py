@@ -0,0 +1,48 @@
+# tests/test_lod.py
+
+import numpy as np
+from ethgui.lod import MinMaxPyramid
+
+def _walk(n: int, seed: int = 0) -> np.ndarray:
+    return 2000 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+
+def test_windows_keep_visible_extremes():
+    y = _walk(20_000)
+    lod = MinMaxPyramid(); lod.rebuild(y)
+    rng = np.random.default_rng(1)
+    for _ in range(500):                         # 缩放/平移后的任意可见区间
+        i0 = int(rng.integers(0, len(y) - 10))
+        i1 = int(rng.integers(i0 + 2, len(y) + 1))
+        budget = int(rng.integers(2, 400))
+        idx = lod.query(i0, i1, budget)
+        assert (np.diff(idx) > 0).all() and idx[0] == i0 and idx[-1] == i1 - 1
+        assert i0 + int(np.argmin(y[i0:i1])) in idx and i0 + int(np.argmax(y[i0:i1])) in idx
+        assert len(idx) <= 4 * budget + 6
+
+def test_out_of_range_is_clipped():
+    y = _walk(1000)
+    lod = MinMaxPyramid(); lod.rebuild(y)
+    idx = lod.query(-5, 2000, 50)
+    assert idx[0] == 0 and idx[-1] == 999 and int(np.argmax(y)) in idx
+    assert list(lod.query(10, 13, 50)) == [10, 11, 12]
+
+def test_incremental_matches_rebuild():
+    y = _walk(5000, seed=2)
+    inc = MinMaxPyramid(); inc.rebuild(y[:1])
+    rng = np.random.default_rng(3)
+    n = 1
+    while n < len(y):
+        if rng.random() < 0.3:                   # 改写最后一点（未收盘 K 线）
+            y[n - 1] += rng.normal(0, 5)
+            inc.update(y[:n])
+        else:
+            n = min(len(y), n + int(rng.integers(1, 40)))
+            inc.update(y[:n])
+    ref = MinMaxPyramid(); ref.rebuild(y.copy())
+    assert len(inc.levels) == len(ref.levels)
+    for a, b in zip(inc.levels, ref.levels):
+        assert a.n == b.n
+        for name in ("mn", "mni", "mx", "mxi"):
+            np.testing.assert_array_equal(getattr(a, name)[:a.n], getattr(b, name)[:b.n])
+    for i0, i1, budget in ((0, 5000, 300), (123, 4567, 100), (4000, 5000, 20)):
+        np.testing.assert_array_equal(inc.query(i0, i1, budget), ref.query(i0, i1, budget))
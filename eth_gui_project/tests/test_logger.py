@@ -0,0 +1,40 @@
+# tests/test_logger.py
+
+import sys
+import subprocess
+from ethgui import logger as log
+from conftest import ROOT
+
+def _run(code, cwd):
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True,
+                   env={"PYTHONPATH": str(ROOT), "QT_QPA_PLATFORM": "offscreen"}, capture_output=True)
+
+def _old_runs(d, n):
+    (d / "logs").mkdir(exist_ok=True)
+    paths = [d / "logs" / f"debug_2001010{i}_000000.log" for i in range(n)]
+    for p in paths:
+        p.write_text("x")
+    (d / "logs" / "debug.log").write_text("x")
+    return paths
+
+def test_import_deletes_nothing(tmp_path):
+    paths = _old_runs(tmp_path, 5)
+    _run("import ethgui.wire", tmp_path)
+    assert all(p.exists() for p in paths)
+
+def test_import_creates_no_files(tmp_path):
+    _run("import ethgui.ui, ethgui.logger as l; l.logger.debug('x'); l.logger.info('y')", tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+def test_setup_logging_creates_run_log(tmp_path):
+    _run("import ethgui.logger as l; l.setup_logging(); l.setup_logging(); l.logger.info('hello')", tmp_path)
+    log_file, = (tmp_path / "logs").iterdir()      # 退出时写线程已把队列写完
+    assert log_file.name.startswith("debug_") and log_file.read_text(encoding="utf-8").count("hello") == 1
+
+def test_prune_keeps_latest_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = _old_runs(tmp_path, 5)
+    rotated = paths[0].with_name(paths[0].name + ".1"); rotated.write_text("x")
+    log.prune_logs(keep=3)                           # 当前这次 + 之前最近的 2 次
+    assert [p.exists() for p in paths] == [False, False, False, True, True]
+    assert not rotated.exists() and (tmp_path / "logs" / "debug.log").exists()
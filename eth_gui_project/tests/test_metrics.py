@@ -0,0 +1,69 @@
+# tests/test_metrics.py
+
+import json
+import threading
+import pytest
+from ethgui import metrics
+from ethgui.metrics import Metrics, Histogram
+
+def test_counter_totals_and_rate(monkeypatch):
+    now = [1000.2]
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: now[0])
+    m = Metrics()
+    m.inc("frames"); m.inc("frames", 4)
+    assert m.counter("frames") is m.counter("frames") and m.counter("frames").total == 5
+    assert m.counter("frames").rate() == 0              # 当前秒未结束
+    now[0] = 1001.5
+    assert m.counter("frames").rate() == 5              # 上一整秒
+    m.inc("frames", 2)
+    now[0] = 1003.0
+    assert m.counter("frames").rate() == 0              # 中间空了一秒
+    assert m.counter("frames").total == 7
+
+def test_counter_threads():
+    m = Metrics()
+    def work():
+        for _ in range(2000):
+            m.inc("n")
+    ts = [threading.Thread(target=work) for _ in range(4)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    assert m.counter("n").total == 8000
+
+def test_timer_records_ms(monkeypatch):
+    now = [5.0]
+    monkeypatch.setattr(metrics.time, "perf_counter", lambda: now[0])
+    m = Metrics()
+    with m.timer("render_ms"):
+        now[0] += 0.025
+    with pytest.raises(RuntimeError):                   # 异常时照样记录耗时
+        with m.timer("render_ms"):
+            now[0] += 0.075
+            raise RuntimeError
+    s = m.histogram("render_ms").summary()
+    assert s["count"] == 2 and s["mean"] == pytest.approx(50.0) and s["max"] == pytest.approx(75.0)
+
+def test_summary_percentiles_and_window():
+    m = Metrics()
+    assert m.histogram("empty").summary() == {"count": 0}
+    for v in range(1, 101):
+        m.observe("lat", float(v))
+    s = m.histogram("lat").summary()
+    assert s["count"] == 100 and s["mean"] == 50.5 and s["max"] == 100.0
+    assert (s["p50"], s["p90"], s["p99"]) == pytest.approx((50.5, 90.1, 99.01))
+    h = Histogram(size=10)                              # 分位数只看最近 size 个样本，计数/均值/最大值看全程
+    for v in range(1, 21):
+        h.observe(float(v))
+    s = h.summary()
+    assert s["count"] == 20 and s["mean"] == 10.5 and s["max"] == 20.0 and s["p50"] == 15.5
+
+def test_snapshot_and_export(tmp_path):
+    m = Metrics()
+    m.inc("msgs", 3); m.observe("lat", 2.0)
+    m.gauge("queue", lambda: 7)
+    m.gauge("broken", lambda: 1 / 0)
+    snap = m.snapshot()
+    assert snap["counters"]["msgs"]["total"] == 3 and snap["histograms"]["lat"]["count"] == 1
+    assert snap["gauges"] == {"broken": None, "queue": 7}
+    out = json.loads(m.export(tmp_path / "sub" / "metrics.json").read_text(encoding="utf-8"))
+    assert out["counters"] == snap["counters"] and out["histograms"]["lat"]["p50"] == 2.0
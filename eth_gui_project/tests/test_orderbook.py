@@ -0,0 +1,75 @@
+# tests/test_orderbook.py
+
+import json
+import zlib
+import numpy as np
+from bench import synth
+from ethgui.orderbook import OrderBook
+from ethgui.ws_clients import WSOrderBook
+
+def _crc(s: str) -> int:
+    c = zlib.crc32(s.encode())
+    return c - (1 << 32) if c >= 1 << 31 else c
+
+def test_checksum_interleaves_raw_strings():
+    ob = OrderBook()
+    ob.apply({"bids": [["3366.1", "7", "0", "3"], ["3366", "6", "3", "4"], ["3365.5", "1", "0", "1"]],
+              "asks": [["3366.8", "9", "10", "3"], ["3368", "8", "3", "4"]]})
+    # 买卖交错、较长的一侧补在末尾；价格/数量保留原始写法（"3366" 不写成 "3366.0"）
+    assert ob.checksum() == _crc("3366.1:7:3366.8:9:3366:6:3368:8:3365.5:1")
+
+def test_incremental_matches_reference_model():
+    msgs = [json.loads(m) for m in synth.book_msgs(300, depth=60, changes=12)]
+    ob, ref = OrderBook(), {"bids": {}, "asks": {}}
+    for m in msgs:
+        d = m["data"][0]
+        if m["action"] == "snapshot":
+            ref = {"bids": {}, "asks": {}}
+        for side in ref:
+            for px, sz, *_ in d.get(side, []):
+                if float(sz) == 0:
+                    ref[side].pop(float(px), None)
+                else:
+                    ref[side][float(px)] = float(sz)
+        assert ob.apply(d, m["action"])              # 每条的 seqId 与 checksum 都通过
+    bids, asks = ob.top(10)
+    rb = sorted(ref["bids"].items(), reverse=True)[:10]
+    ra = sorted(ref["asks"].items())[:10]
+    assert bids.tolist() == [list(x) for x in rb] and asks.tolist() == [list(x) for x in ra]
+    assert ob.best() == (rb[0][0], ra[0][0])
+    assert ob.cum_size("ask", ra[2][0]) == sum(s for _, s in ra[:3])
+    assert ob.depth_at(rb[1][0]) == rb[1][1] and ob.depth_at(-1.0) == 0.0
+
+def test_delete_and_duplicate_price_in_one_update():
+    ob = OrderBook()
+    ob.apply({"bids": [["10", "1"], ["9", "2"]], "asks": [["11", "1"]], "seqId": 1})
+    ok = ob.apply({"bids": [["9", "0"], ["8", "5"], ["8", "6"]], "asks": [], "prevSeqId": 1, "seqId": 2}, "update")
+    assert ok and ob.top(5)[0].tolist() == [[10.0, 1.0], [8.0, 6.0]]
+    assert ob.checksum() == _crc("10:1:11:1:8:6")
+
+def test_seq_gap_and_bad_checksum_rejected():
+    ob = OrderBook()
+    ob.apply({"bids": [["10", "1"]], "asks": [["11", "1"]], "seqId": 5})
+    assert not ob.apply({"bids": [["10", "2"]], "prevSeqId": 7, "seqId": 8}, "update")
+    ob.apply({"bids": [["10", "1"]], "asks": [["11", "1"]], "seqId": 5})
+    assert not ob.apply({"bids": [["10", "2"]], "prevSeqId": 5, "seqId": 6, "checksum": 123}, "update")
+
+class _Manager:
+    def __init__(self):
+        self.resubs = []
+
+    def resubscribe(self, channel, inst):
+        self.resubs.append((channel, inst))
+
+def test_channel_resyncs_on_mismatch():
+    msgs = [json.loads(m) for m in synth.book_msgs(5, depth=20)]
+    mgr  = _Manager()
+    ch   = WSOrderBook("ETH-USDT", mgr, channel="books")
+    ch._on_msg(msgs[0]); ch._on_msg(msgs[1])
+    bad = json.loads(json.dumps(msgs[2])); bad["data"][0]["checksum"] += 1
+    ch._on_msg(bad)
+    assert mgr.resubs == [("books", "ETH-USDT")] and ch._resyncing
+    ch._on_msg(msgs[3])                              # 等待快照期间的增量被丢弃
+    assert len(ch.book.bids.keys) == 0
+    ch._on_msg(msgs[0])
+    assert not ch._resyncing and np.isclose(ch.book.best()[0], 2000 - 0.01)
@@ -0,0 +1,54 @@
+# tests/test_render.py
+
+import time
+from ethgui import render
+from ethgui.render import RenderScheduler
+from conftest import wait_until
+
+def test_posts_within_one_frame_render_once(qapp):
+    rs  = RenderScheduler(fps=20)
+    got = []
+    rs.register("min", got.append)
+    rs.register("idle", lambda s: got.append(("idle", s)))
+    for i in range(100):                                # 同一帧间隔内的连续更新
+        rs.post("min", i)
+    rs.start()
+    try:
+        wait_until(lambda: got, 2)
+        time.sleep(0.12)                                # 再过两帧：没有新 post 就不重绘
+        qapp.processEvents()
+    finally:
+        rs.stop()
+    assert got == [99] and rs.pending() == 0
+    assert rs.stats()["views"]["min"] == {"posted": 100, "rendered": 1, "coalesced": 99}
+    assert rs.stats()["views"]["idle"] == {"posted": 0, "rendered": 0, "coalesced": 0}
+
+def test_dropped_frames_and_view_fps(monkeypatch):
+    now, dt = [100.0], 1 / 16                          # 二进制可精确表示的帧间隔
+    monkeypatch.setattr(render.time, "perf_counter", lambda: now[0])
+    rs  = RenderScheduler(fps=16)
+    got = []
+    rs.register("fast", lambda s: got.append(("fast", s)))
+    rs.register("slow", lambda s: got.append(("slow", s)), fps=4)   # 该视图最多 4 帧一次
+    rs.start()
+    for step in range(1, 9):                            # 每帧都有更新
+        rs.post("fast", step); rs.post("slow", step)
+        now[0] += dt
+        rs._tick()
+    assert [s for v, s in got if v == "fast"] == list(range(1, 9))
+    assert [s for v, s in got if v == "slow"] == [1, 5]           # 其余被合并
+    assert rs.dropped == 0
+    now[0] += dt * 5                                    # GUI 线程卡住 5 帧的时间：错过 4 帧
+    rs._tick()
+    assert rs.dropped == 4
+    assert [s for v, s in got if v == "slow"] == [1, 5, 8]        # 间隔已够：合并后的最新状态补绘
+    assert rs.stats()["views"]["slow"] == {"posted": 8, "rendered": 3, "coalesced": 5}
+
+def test_renderer_error_is_contained(qapp):
+    rs = RenderScheduler(fps=50)
+    def boom(_):
+        raise RuntimeError("draw failed")
+    rs.register("bad", boom)
+    rs.post("bad")
+    rs._tick()
+    assert rs.pending() == 0 and rs.stats()["views"]["bad"]["rendered"] == 0
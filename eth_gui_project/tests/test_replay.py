@@ -0,0 +1,91 @@
+# tests/test_replay.py
+"""录制 -> 回放往返：回放经同一条 _dispatch 路径，WSSecCandle/WSOrderBook 的输出与实盘逐条一致"""
+
+import json
+import numpy as np
+from PyQt6.QtCore import Qt
+from bench import synth
+from ethgui import replay
+from ethgui.recorder import Recorder, read_recording
+from ethgui.replay import ReplayManager, subscriptions, clients_for
+from ethgui.ws_manager import WSManager
+from ethgui.ws_clients import WSSecCandle, WSOrderBook
+
+DIRECT = Qt.ConnectionType.DirectConnection
+
+def _frames() -> list[str]:
+    trades = synth.trade_msgs(300, inst="ETH-USDT")
+    books  = synth.book_msgs(200, depth=50, inst="ETH-USDT", channel="books")
+    ack    = json.dumps({"event": "subscribe", "arg": {"channel": "trades", "instId": "ETH-USDT"}})
+    out = [ack]
+    for i in range(max(len(trades), len(books))):      # 两个频道交错到达
+        out += trades[i:i+1] + books[i:i+1]
+    return out
+
+def _collect(clients) -> dict:
+    out = {}
+    for c in clients:
+        key = (c.channel, c.inst)
+        got = out[key] = []
+        if isinstance(c, WSSecCandle):
+            c.new_candle.connect(lambda bar, g=got: g.append(bar), DIRECT)
+        else:
+            c.new_book.connect(lambda b, a, g=got: g.append((b.copy(), a.copy())), DIRECT)
+        c.start()
+    return out
+
+def _same(a: dict, b: dict):
+    assert a.keys() == b.keys()
+    for k in a:
+        assert len(a[k]) == len(b[k]) > 0
+        if k[0] == "trades":
+            assert a[k] == b[k]
+        else:
+            for (b1, a1), (b2, a2) in zip(a[k], b[k]):
+                np.testing.assert_array_equal(b1, b2); np.testing.assert_array_equal(a1, a2)
+
+def _record(tmp_path):
+    """实盘路径：WSManager 收到帧交给 _dispatch（不联网），同时录制"""
+    live = WSManager("ws://unused")
+    live.start = lambda: None
+    live._post = lambda *_: None
+    live.recorder = Recorder(tmp_path / "rec.arrows", chunk=64, flush_s=0.05)
+    clients = [WSSecCandle("ETH-USDT", live), WSOrderBook("ETH-USDT", live, channel="books")]
+    out = _collect(clients)
+    frames = _frames()
+    for raw in frames:
+        live._dispatch(raw)
+    for c in clients:
+        c.stop()
+    live.recorder.close()
+    return live.recorder.path, frames, out
+
+def test_record_replay_round_trip(qapp, tmp_path):
+    path, frames, live = _record(tmp_path)
+    table = read_recording(path)
+    assert table.num_rows == len(frames) and table.column("raw").to_pylist() == frames
+    assert subscriptions(path) == [("books", "ETH-USDT"), ("trades", "ETH-USDT")]
+
+    mgr = ReplayManager(path, speed=None)
+    clients = clients_for(mgr, subscriptions(path))
+    got = _collect(clients)
+    mgr.play(block=True)
+    for c in clients:
+        c.stop()
+    assert mgr.frames == len(frames) and mgr.done.is_set()
+    _same(got, live)
+
+def test_headless_counts_include_last_bar(qapp, tmp_path, capsys):
+    path, _, live = _record(tmp_path)
+    counts = replay._headless(ReplayManager(path, speed=None), None)
+    assert counts == {"books ETH-USDT": len(live[("books", "ETH-USDT")]),
+                      "trades ETH-USDT": len(live[("trades", "ETH-USDT")])}
+    assert f"输出 {counts['trades ETH-USDT']}" in capsys.readouterr().out
+
+def test_channel_filter(qapp, tmp_path):
+    path, frames, live = _record(tmp_path)
+    mgr = ReplayManager(path, speed=None, channels=["trades"])
+    got = _collect(clients_for(mgr, [("trades", "ETH-USDT")]))
+    mgr.play(block=True)
+    assert mgr.frames == sum('"channel": "trades"' in f for f in frames)
+    assert got[("trades", "ETH-USDT")] == live[("trades", "ETH-USDT")][:-1]   # 未 stop：最后一根未收盘
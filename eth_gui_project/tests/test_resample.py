@@ -0,0 +1,74 @@
+# tests/test_resample.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from bench import synth
+from ethgui import resample as rs
+from ethgui.resample import bucket_start, resample, Deriver
+from ethgui.store import CandleStore, COLUMNS
+
+T0, M, H = synth.T0_MS, 60_000, 3_600_000     # T0 = 2023-11-15 00:00 UTC = 08:00 UTC+8
+
+def _ms(df):
+    return df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+
+def test_bucket_start_okx_alignment():
+    assert bucket_start(T0 + 59 * M, "1H") == T0
+    assert bucket_start(T0 + 5 * H, "4H") == T0 + 4 * H
+    # 日线按 UTC+8 零点（UTC 16:00）开盘
+    day0 = T0 - 8 * H
+    assert bucket_start(T0, "1D") == day0
+    assert bucket_start(T0 + 16 * H - 1, "1D") == day0
+    assert bucket_start(T0 + 16 * H, "1D") == T0 + 16 * H
+    ts = np.array([T0 + 16 * H - 1, T0 + 16 * H, T0 + 40 * H], dtype=np.int64)
+    assert list(bucket_start(ts, "1D")) == [day0, T0 + 16 * H, T0 + 40 * H]
+
+@pytest.mark.parametrize("bar", ["5m", "15m", "1H", "4H", "1D"])
+def test_resample_matches_groupby(bar):
+    df  = synth.candles(3 * 1440 + 77)               # 最后一桶不完整
+    out = resample(df, bar)
+    key = bucket_start(_ms(df), bar)
+    ref = df.groupby(key).agg(open=("open", "first"), high=("high", "max"), low=("low", "min"),
+                              close=("close", "last"), volume=("volume", "sum"), volumeCcy=("volumeCcy", "sum"))
+    assert (_ms(out) == ref.index.to_numpy()).all()
+    for c in ref.columns:
+        np.testing.assert_allclose(out[c].to_numpy(), ref[c].to_numpy())
+    if bar == "1D":                                  # 08:00 UTC+8 开始：第一根日线只有 16 小时
+        assert _ms(out)[0] == T0 - 8 * H and len(out) == 4
+
+def test_resample_empty_and_missing_ccy():
+    assert resample(pd.DataFrame(columns=COLUMNS), "1H").empty
+    out = resample(synth.candles(120).drop(columns="volumeCcy"), "1H")
+    assert len(out) == 2 and (out["volumeCcy"] == 0).all()
+
+def test_materialize_from_1m(tmp_path):
+    df = synth.candles(2 * 1440)
+    Deriver(tmp_path, "ETH-USDT", "1H").base.write(df, (T0, T0 + 2 * 1440 * M - 1))
+    d = Deriver(tmp_path, "ETH-USDT", "1H")
+    end = T0 + 2 * 1440 * M - 1
+    assert d.plan(T0, end) == []                     # 1m 已覆盖，无需联网
+    assert d.materialize(T0, end) == 48
+    assert d.store.missing(T0, end) == []
+    assert d.materialize(T0, end) == 0               # 已物化：不重复聚合
+    got = CandleStore(tmp_path, "ETH-USDT", "1H").load(T0, end)
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), resample(df, "1H"), check_dtype=False)
+
+def test_materialize_skips_when_1m_has_gaps(tmp_path):
+    d = Deriver(tmp_path, "ETH-USDT", "1H")
+    df = synth.candles(120)
+    d.base.write(df.iloc[:90], (T0, T0 + 90 * M - 1))
+    # 本周期的缺口整段由 1m 聚合；1m 缺 30 根时先不派生（load 任务会按 plan 回补 1m 后再来）
+    assert d.materialize(T0, T0 + 2 * H - 1) == 0
+    assert d.store.missing(T0, T0 + 2 * H - 1) == [(T0, T0 + 2 * H - 1)]
+    d.base.write(df.iloc[90:], (T0 + 90 * M, T0 + 2 * H - 1))
+    assert d.materialize(T0, T0 + 2 * H - 1) == 2
+
+def test_plan_fetches_1m_or_own_bar(tmp_path, monkeypatch):
+    d = Deriver(tmp_path, "ETH-USDT", "4H")
+    d.base.write(synth.candles(60), (T0, T0 + H - 1))
+    # 1m 缺得不多：只回补 1m 的缺口，按 4H 桶边界扩展
+    assert d.plan(T0 + 30 * M, T0 + 5 * H) == [("1m", T0 + H, T0 + 8 * H - 1)]
+    # 缺口超过 DERIVE_FETCH_LIMIT 根 1m：直接回补 4H
+    monkeypatch.setattr(rs, "DERIVE_FETCH_LIMIT", 60)
+    assert d.plan(T0 + 30 * M, T0 + 5 * H) == [("4H", T0 + 30 * M, T0 + 5 * H)]
@@ -0,0 +1,55 @@
+# tests/test_series.py
+
+import numpy as np
+from bench import synth
+from ethgui.series import BarBuffer
+from ethgui.store import CandleStore
+
+T0, M = synth.T0_MS, 60_000
+
+def _bar(i: int, close: float = 1.0) -> dict:
+    return {"ts": T0 + i * M, "open": 1.0, "high": 2.0, "low": 0.5, "close": close, "volume": 1.0}
+
+def test_push_merges_by_ts():
+    b = BarBuffer(capacity=4)
+    assert b.push(_bar(0)) and b.push(_bar(1))
+    assert not b.push(_bar(1, close=3.0))            # 同 ts 改最后一根
+    assert not b.push(_bar(0, close=9.0))            # 更早的忽略
+    for i in range(2, 50):                           # 越过初始容量
+        b.push(_bar(i))
+    assert len(b) == 50 and b["close"][1] == 3.0 and b["close"][0] == 1.0
+    assert (np.diff(b.ts_ms()) == M).all()
+
+def test_frame_is_zero_copy_view():
+    b = BarBuffer.from_frame(synth.candles(10))
+    df = b.frame()
+    b.update_last(close=123.0)
+    assert df["close"].iloc[-1] == 123.0
+
+def test_ring_keeps_last_n_contiguous():
+    df = synth.candles(1000)
+    b = BarBuffer(ring=100)
+    b.extend(df.iloc[:30])
+    for r in df.iloc[30:].itertuples(index=False):
+        b.push(dict(r._asdict(), ts=int(r.ts.value // 1_000_000)))
+    assert len(b) == 100
+    assert (b["close"] == df["close"].to_numpy()[-100:]).all()
+    assert (b.ts_ms() == df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)[-100:]).all()
+    assert len(b._ts) == 200                          # 底层容量不增长
+
+def test_unspilled_covers_only_contiguous_runs(tmp_path):
+    b = BarBuffer()
+    for i in [0, 1, 2, 3, 7, 8, 9, 10]:              # 4..6 缺失（如重连回补失败）
+        b.push(_bar(i))
+    b.mark_spilled(T0)                               # 第 0 根已在库中
+    df, runs = b.unspilled(M)
+    assert len(df) == 6                              # 1,2,3,7,8,9；最后一根 10 未收盘
+    assert runs == [(T0 + M, T0 + 4 * M - 1), (T0 + 7 * M, T0 + 10 * M - 1)]
+    st = CandleStore(tmp_path, "ETH-USDT", "1m")
+    assert b.spill(st, M) == 6
+    assert st.coverage == runs
+    assert st.missing(T0 + M, T0 + 10 * M - 1) == [(T0 + 4 * M, T0 + 7 * M - 1)]
+    assert b.unspilled(M) is None
+    b.push(_bar(11))
+    df, runs = b.unspilled(M)
+    assert len(df) == 1 and runs == [(T0 + 10 * M, T0 + 11 * M - 1)]
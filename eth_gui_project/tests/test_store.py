@@ -0,0 +1,74 @@
+# tests/test_store.py
+
+import functools
+import pandas as pd
+from bench import synth
+from ethgui import fetcher
+from ethgui.backfill import Backfiller
+from ethgui.fetcher import FetchWorker
+from ethgui.rest_client import RestClient
+from ethgui.store import CandleStore, COLUMNS
+from bench.stubs import RestStub
+
+T0, M = synth.T0_MS, 60_000
+DAY = 1440 * M
+
+def test_write_load_across_partitions(tmp_path):
+    df = synth.candles(40 * 1440)                   # 跨 2023-11、2023-12 两个月分区
+    st = CandleStore(tmp_path, "ETH-USDT", "1m")
+    st.write(df, (T0, T0 + 40 * DAY - 1))
+    assert [p.stem for p in st.partitions()] == ["2023-11", "2023-12"]
+    assert [p.stem for p in st.partitions(T0, T0 + DAY)] == ["2023-11"]
+    out = st.load(T0 + DAY, T0 + 2 * DAY - 1, ["close"])
+    assert list(out.columns) == ["ts", "close"] and len(out) == 1440
+    assert (out["close"].to_numpy() == df["close"].to_numpy()[1440:2880]).all()
+
+def test_overlapping_write_keeps_latest_row(tmp_path):
+    df = synth.candles(100)
+    st = CandleStore(tmp_path, "ETH-USDT", "1m")
+    st.write(df, (T0, T0 + 100 * M - 1))
+    patch = df.iloc[50:60].assign(close=1.0)
+    st.write(patch, (T0 + 50 * M, T0 + 60 * M - 1))
+    out = st.load()
+    assert len(out) == 100 and out["ts"].is_unique
+    assert (out["close"].iloc[50:60] == 1.0).all() and out["close"].iloc[49] != 1.0
+
+def test_coverage_merges_and_reports_holes(tmp_path):
+    st = CandleStore(tmp_path, "ETH-USDT", "1m")
+    st.write(pd.DataFrame(columns=COLUMNS), (T0, T0 + 10 * M - 1))
+    st.write(pd.DataFrame(columns=COLUMNS), (T0 + 20 * M, T0 + 30 * M - 1))
+    st.write(pd.DataFrame(columns=COLUMNS), (T0 + 10 * M, T0 + 12 * M - 1))   # 与第一段相邻，合并
+    assert st.coverage == [(T0, T0 + 12 * M - 1), (T0 + 20 * M, T0 + 30 * M - 1)]
+    assert st.missing(T0 - 5 * M, T0 + 40 * M - 1) == [
+        (T0 - 5 * M, T0 - 1), (T0 + 12 * M, T0 + 20 * M - 1), (T0 + 30 * M, T0 + 40 * M - 1)]
+    # 覆盖索引落盘，重新打开后一致
+    assert CandleStore(tmp_path, "ETH-USDT", "1m").coverage == st.coverage
+
+def _stub_worker(monkeypatch, stub):
+    monkeypatch.setattr(fetcher, "Backfiller", functools.partial(
+        Backfiller, client_factory=lambda: RestClient(stub.url, limiter=None, history_limiter=None)))
+
+def test_fetch_marks_only_returned_span(tmp_path, monkeypatch):
+    # 接口只有 T0 之后的数据：更早的部分不能记为已覆盖
+    df = synth.candles(600)
+    with RestStub(synth.candle_rows(df)) as stub:
+        _stub_worker(monkeypatch, stub)
+        start, end = T0 - 300 * M, T0 + 600 * M - 1
+        w = FetchWorker("ETH-USDT", "1m", start, end, tmp_path)
+        got = []
+        w.finished.connect(got.append)
+        w.run()
+        assert len(got[0]) == 600
+        assert w.store.coverage == [(T0, end)]
+        assert w.store.missing(start, end) == [(start, T0 - 1)]
+        calls = stub.calls
+        w.run()                                      # 只重试无数据的那段
+        assert stub.calls - calls == 3 and w.store.coverage == [(T0, end)]
+
+def test_fetch_empty_response_leaves_gap(tmp_path, monkeypatch):
+    with RestStub([]) as stub:
+        _stub_worker(monkeypatch, stub)
+        w = FetchWorker("ETH-USDT", "1m", T0, T0 + 100 * M - 1, tmp_path)
+        w.run()
+    assert w.store.coverage == []
+    assert w.store.missing(T0, T0 + 100 * M - 1) == [(T0, T0 + 100 * M - 1)]
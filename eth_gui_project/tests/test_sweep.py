@@ -0,0 +1,47 @@
+# tests/test_sweep.py
+
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+from bench import synth
+from ethgui import sweep as sw
+from ethgui.indicators import detect_levels
+
+def test_parse_grid():
+    assert sw.parse_grid("0.5:1.5:0.5") == [0.5, 1.0, 1.5]
+    assert sw.parse_grid("3,2,3", int) == [2, 3]
+
+def test_grid_matches_detect_levels_and_unlinks_shm(monkeypatch):
+    created = []
+    class _Shm(shared_memory.SharedMemory):
+        def __init__(self, name=None, create=False, size=0):
+            super().__init__(name, create, size)
+            if create:
+                created.append(self.name)
+    monkeypatch.setattr(sw.shared_memory, "SharedMemory", _Shm)
+    frames = {("ETH-USDT", "1m"): synth.candles(1500, seed=1),
+              ("BTC-USDT", "1H"): synth.candles(800, bar_ms=3_600_000, seed=2, price=30000.0),
+              ("SOL-USDT", "1m"): synth.candles(1, seed=3).iloc[:0]}
+    eps, hits, windows = [0.4, 1.0, 2.2], [2, 4], [3, 5]
+    found = sw.grid_levels(frames, eps, hits, windows, workers=2)
+    assert found[("SOL-USDT", "1m")] == []
+    for key in (("ETH-USDT", "1m"), ("BTC-USDT", "1H")):
+        rows = np.array(found[key])
+        for e in eps:
+            for h in hits:
+                for w in windows:
+                    ref = detect_levels(frames[key], e, h, w)
+                    sel = rows[(rows[:, 0] == e) & (rows[:, 1] == h) & (rows[:, 2] == w)]
+                    assert len(sel) == len(ref)
+                    np.testing.assert_allclose(sel[:, 3], ref["price"].to_numpy(dtype=float))
+                    np.testing.assert_array_equal(sel[:, 4], ref["hits"].to_numpy(dtype=float))
+    assert len(created) == 1
+    with pytest.raises(FileNotFoundError):                 # 主进程用完即 unlink
+        shared_memory.SharedMemory(created[0])
+
+def test_report_persistence():
+    df  = synth.candles(1500, seed=1)
+    rep, = sw.sweep({("ETH-USDT", "1m"): df}, [0.5, 1.0], [2, 3], [5], workers=2)
+    assert rep["combos"] == 4 and rep["bars"] == 1500 and rep["levels"]
+    assert all(0 < lv["persistence"] <= 1 for lv in rep["levels"])
+    assert rep["levels"] == sorted(rep["levels"], key=lambda r: (-r["persistence"], -r["hits_mean"]))
@@ -0,0 +1,84 @@
+# tests/test_volume_profile.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from bench import synth
+from ethgui.volume_profile import VolumeProfile
+
+def _ms(df):
+    return df["ts"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+
+def _hist(vp: VolumeProfile) -> dict[int, tuple[float, int]]:
+    """绝对桶号 -> (成交量, 根数)，只含非空桶"""
+    return {vp.base + i: (vp.vol[i], int(vp.cnt[i])) for i in np.flatnonzero(vp.cnt)}
+
+def _same(a: VolumeProfile, b: VolumeProfile):
+    ha, hb = _hist(a), _hist(b)
+    assert ha.keys() == hb.keys()
+    for k in ha:
+        assert ha[k][1] == hb[k][1] and ha[k][0] == pytest.approx(hb[k][0], abs=1e-6)
+    assert a.total == pytest.approx(b.total) and len(a) == len(b)
+
+def _push_all(vp: VolumeProfile, df: pd.DataFrame):
+    for ts, h, l, c, v in zip(_ms(df), df["high"], df["low"], df["close"], df["volume"]):
+        vp.push(int(ts), h, l, c, v)
+
+@pytest.mark.parametrize("window", [0, 300])
+def test_push_matches_from_frame(window):
+    df = synth.candles(2000)
+    bin_size = 2.0
+    vp = VolumeProfile(bin_size, window)
+    _push_all(vp, df)
+    _same(vp, VolumeProfile.from_frame(df, bin_size, window))
+    if window:                                   # 滚动：等于只用最后 window 根整段构建
+        _same(vp, VolumeProfile.from_frame(df.iloc[-window:], bin_size, window))
+
+def test_from_frame_then_push_continues():
+    df = synth.candles(1500)
+    vp = VolumeProfile.from_frame(df.iloc[:1000], 2.0, 400)
+    _push_all(vp, df.iloc[1000:])
+    _same(vp, VolumeProfile.from_frame(df, 2.0, 400))
+
+def test_same_ts_replaces_and_older_ignored():
+    vp = VolumeProfile(1.0)
+    assert vp.push(1000, 10.5, 9.5, 10.0, 5.0)
+    assert not vp.push(1000, 20.5, 19.5, 20.0, 7.0)   # 未收盘 K 线更新：替换上次的贡献
+    assert _hist(vp) == {20: (7.0, 1)} and vp.total == 7.0
+    assert not vp.push(500, 30.0, 30.0, 30.0, 1.0)    # 更早的忽略
+    assert vp.push(2000, 10.0, 10.0, 10.0, 2.0)
+    assert _hist(vp) == {20: (7.0, 1), 10: (2.0, 1)} and len(vp) == 2
+
+def test_grows_at_both_ends():
+    vp = VolumeProfile(1.0, window=3)
+    prices = [100, 40, 400, 5, 1000]                  # 交替越过两端
+    for i, p in enumerate(prices):
+        vp.push(i, p, p, p, 1.0 + i)
+    assert vp.base <= 5 and vp.base + len(vp.vol) > 1000
+    assert _hist(vp) == {400: (3.0, 1), 5: (4.0, 1), 1000: (5.0, 1)}   # 窗口只留最后 3 根
+    assert vp.total == 12.0
+
+def test_nodes():
+    rng = np.random.default_rng(1)
+    n = 3000
+    close = np.where(rng.random(n) < 0.5, 2000.0, 2100.0) + rng.normal(0, 0.6, n)
+    vol   = np.where(np.abs(close - 2000) < 5, 10.0, 1.0) + rng.random(n)   # 2000 附近放量
+    df = pd.DataFrame({"ts": pd.to_datetime(synth.T0_MS + np.arange(n) * 60_000, unit="ms"),
+                       "high": close, "low": close, "close": close, "volume": vol})
+    vp = VolumeProfile.from_frame(df, 1.0)
+    only = vp.nodes()                               # 默认阈值：只有放量的 2000 附近
+    assert len(only) == 1 and only["price"].iloc[0] == pytest.approx(2000, abs=1)
+    assert list(only.columns) == ["price", "hits", "volume"]
+    both = vp.nodes(min_mult=0.1)                   # 放低阈值：两处成交密集区都在，按价格升序
+    assert len(both) == 2 and both["price"].to_numpy() == pytest.approx([2000, 2100], abs=1)
+    assert both["volume"].iloc[0] > 5 * both["volume"].iloc[1]
+    assert (both["hits"] > 0.8 * n / 2).all() and both["hits"].sum() <= n
+    top = vp.nodes(max_nodes=1, min_mult=0.1)       # 只取一个时取成交量最大的
+    assert top["price"].iloc[0] == pytest.approx(2000, abs=1)
+
+def test_empty_and_invalid():
+    assert VolumeProfile(1.0).nodes().empty
+    empty = VolumeProfile.from_frame(synth.candles(10).iloc[:0], 1.0)
+    assert len(empty) == 0 and empty.total == 0
+    with pytest.raises(ValueError):
+        VolumeProfile(0)
@@ -0,0 +1,75 @@
+# tests/test_wire.py
+
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from bench import synth
+from ethgui import wire
+
+def _one(frame: bytes):
+    (kind, payload), = wire.FrameReader().feed(frame)
+    return kind, wire.decode(kind, payload)
+
+@pytest.mark.parametrize("kind", [wire.SUB_TRADES, wire.UNSUB_TRADES, wire.SUB_BOOK, wire.UNSUB_BOOK,
+                                  wire.WATCH, wire.UNWATCH, wire.FOCUS])
+def test_key_frames(kind):
+    assert _one(wire.key(kind, "ETH-USDT", "1H")) == (kind, ("ETH-USDT", "1H"))
+    assert _one(wire.key(kind, "以太-USDT")) == (kind, ("以太-USDT", ""))
+
+def test_fetch_progress_error():
+    assert _one(wire.fetch(7, "BTC-USDT", "1m", 1_700_000_000_000, 1_700_086_399_999)) == \
+        (wire.FETCH, (7, "BTC-USDT", "1m", 1_700_000_000_000, 1_700_086_399_999))
+    assert _one(wire.progress(3, 5, 12)) == (wire.PROGRESS, (3, 5, 12))
+    assert _one(wire.error(0, "X-Y", "1m", "未知品种 X-Y")) == (wire.ERROR, (0, "X-Y", "1m", "未知品种 X-Y"))
+
+@pytest.mark.parametrize("kind", [wire.SEC, wire.CANDLE])
+def test_candle(kind):
+    c = {"ts": 1_700_006_400_000, "open": 1.5, "high": 2.25, "low": 1.0, "close": 2.0, "volume": 10.5}
+    assert _one(wire.candle(kind, "ETH-USDT", "1s", c)) == (kind, ("ETH-USDT", "1s", c))
+    _, (_, _, got) = _one(wire.candle(kind, "ETH-USDT", "1s", {k: v for k, v in c.items() if k != "volume"}))
+    assert got["volume"] == 0.0
+
+def test_book():
+    bids = np.array([[2000.5, 1.0], [2000.0, 3.5]])
+    asks = np.array([[2001.0, 0.25]])
+    kind, (inst, ts, b, a) = _one(wire.book("ETH-USDT", 123, bids, asks))
+    assert (kind, inst, ts) == (wire.BOOK, "ETH-USDT", 123)
+    np.testing.assert_array_equal(b, bids); np.testing.assert_array_equal(a, asks)
+    _, (_, ts, b, a) = _one(wire.book("ETH-USDT", None, np.zeros((0, 2)), np.zeros((0, 2))))
+    assert ts == 0 and b.shape == a.shape == (0, 2)
+
+def test_levels():
+    lv = pd.DataFrame({"price": [1999.5, 2010.25], "hits": [3, 7]})
+    _, (inst, bar, got) = _one(wire.levels("ETH-USDT", "15m", lv))
+    assert (inst, bar) == ("ETH-USDT", "15m")
+    pd.testing.assert_frame_equal(got, lv, check_dtype=False)
+    _, (_, _, empty) = _one(wire.levels("ETH-USDT", "15m", None))
+    assert empty.empty and list(empty.columns) == ["price", "hits"]
+
+def test_bars():
+    df = synth.candles(500)
+    _, (req, inst, bar, complete, got) = _one(wire.bars(4, "ETH-USDT", "1m", df, complete=False))
+    assert (req, inst, bar, complete) == (4, "ETH-USDT", "1m", False)
+    pd.testing.assert_frame_equal(got, df, check_dtype=False)
+    _, (*_, got) = _one(wire.bars(0, "ETH-USDT", "1m", df.drop(columns="volumeCcy")))
+    assert (got["volumeCcy"] == 0).all() and len(got) == 500
+    _, (*_, got) = _one(wire.bars(0, "ETH-USDT", "1m", df.iloc[:0]))
+    assert got.empty
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        wire.decode(99, b"")
+
+def test_reader_reassembles_partial_feeds():
+    frames = [wire.key(wire.WATCH, "ETH-USDT", "1m"), wire.bars(0, "ETH-USDT", "1m", synth.candles(300)),
+              wire.progress(1, 2, 3), wire.levels("ETH-USDT", "1m", None), wire.key(wire.FOCUS, "BTC-USDT", "1H")]
+    stream = b"".join(frames)
+    want   = [(f[4], f[5:]) for f in frames]
+    rd = wire.FrameReader()
+    assert [x for i in range(len(stream)) for x in rd.feed(stream[i:i+1])] == want     # 逐字节
+    rng, rd, got, i = random.Random(0), wire.FrameReader(), [], 0
+    while i < len(stream):                                                                 # 随机切块
+        n = rng.randint(1, 700)
+        got += rd.feed(stream[i:i+n]); i += n
+    assert got == want and rd.feed(b"") == []
@@ -0,0 +1,119 @@
+# tests/test_ws_reconnect.py
+"""本地 websockets 服务端故意断开连接：WSManager 退避重连、重新订阅，WSLive 用（桩）REST 回补缺口"""
+
+import json
+import time
+import asyncio
+import threading
+import pandas as pd
+import pytest
+import websockets
+from ethgui import ws_manager, ws_clients
+from ethgui.ws_manager import WSManager
+from ethgui.ws_clients import WSLive
+from conftest import wait_until
+
+T0, M = 1_700_006_400_000, 60_000
+
+def _kline(ts: int, close: float = 1.0) -> list[str]:
+    return [str(ts), "1", "2", "0.5", str(close), "10", "0", "0", "1"]
+
+class DropServer:
+    """每条连接收到订阅后推送 script[i] 中的 K 线 ts；前 drops 条连接在推送后直接掐断（不发 close 帧）"""
+
+    def __init__(self, script: list[list[int]], drops: int):
+        self.script, self.drops = script, drops
+        self.conns: list[float] = []          # 每条连接建立的时刻
+        self.subs:  list[list[dict]] = []     # 每条连接收到的订阅参数
+        self._ready = threading.Event()
+
+    async def _handler(self, ws):
+        i = len(self.conns)
+        self.conns.append(time.monotonic())
+        self.subs.append([])
+        async for raw in ws:
+            if raw == "ping":
+                await ws.send("pong")
+                continue
+            d = json.loads(raw)
+            if d["op"] != "subscribe":
+                continue
+            for a in d["args"]:
+                self.subs[i].append(a)
+                await ws.send(json.dumps({"event": "subscribe", "arg": a}))
+                for ts in self.script[min(i, len(self.script) - 1)]:
+                    await ws.send(json.dumps({"arg": a, "data": [_kline(ts)]}))
+            if i < self.drops:
+                await asyncio.sleep(0.05)
+                ws.transport.abort()
+                return
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, "127.0.0.1", 0) as srv:
+            self.url = f"ws://127.0.0.1:{srv.sockets[0].getsockname()[1]}"
+            self._ready.set()
+            await self._stop.wait()
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_until_complete, args=(self._main(),), daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    def __exit__(self, *_):
+        self._loop.call_soon_threadsafe(self._stop.set)
+
+class FakeBackfiller:
+    """回补桩：返回 [since, since + 4 根]，故意与断线前最后一根、重连后的推送都有重叠"""
+    calls: list[int] = []
+
+    def __init__(self, inst, bar, pool=None):
+        pass
+
+    def fetch(self, since_ms: int, _end_ms: int) -> pd.DataFrame:
+        FakeBackfiller.calls.append(since_ms)
+        time.sleep(0.3)                       # 回补期间实时推送先进入缓存
+        ts = since_ms + M * pd.RangeIndex(5)
+        return pd.DataFrame({"ts": pd.to_datetime(ts, unit="ms"), "open": 1.0, "high": 2.0,
+                             "low": 0.5, "close": 1.0, "volume": 10.0})
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(ws_manager, "WS_RECONNECT_MIN", 0.1)
+    monkeypatch.setattr(ws_manager, "WS_PROXY", "")
+    monkeypatch.setattr(ws_clients, "Backfiller", FakeBackfiller)
+    FakeBackfiller.calls = []
+
+def test_backoff_and_resubscribe(fast_backoff):
+    with DropServer([[T0]], drops=3) as srv:
+        m = WSManager(srv.url)
+        got = []
+        m.subscribe("candle1m", "ETH-USDT", got.append)
+        m.subscribe("trades", "ETH-USDT", lambda _d: None)
+        wait_until(lambda: len(srv.conns) >= 4 and len(srv.subs[3]) == 2)
+        m.stop()
+    gaps = [b - a for a, b in zip(srv.conns, srv.conns[1:])]
+    # 退避 0.1 → 0.2 → 0.4 秒（另有至多 20% 抖动和 50ms 的掐断延迟）
+    assert gaps[0] >= 0.1 and gaps[1] >= 0.2 and gaps[2] >= 0.4
+    assert gaps[0] < gaps[1] < gaps[2]
+    assert m.reconnects == 3
+    for subs in srv.subs[:4]:
+        assert sorted(a["channel"] for a in subs) == ["candle1m", "trades"]
+
+def test_gap_fill_merges_without_duplicates(fast_backoff, qapp):
+    # 断线前推到 t4；重连后服务端直接推 t7、t8，t5、t6 只能由回补得到
+    t = [T0 + i * M for i in range(9)]
+    with DropServer([t[:5], t[7:]], drops=1) as srv:
+        m = WSManager(srv.url)
+        live = WSLive("ETH-USDT", m)
+        out = []
+        live.new_candle.connect(lambda c: out.append(c["ts"]))
+        live.start()
+        wait_until(lambda: t[8] in out and not live._filling)
+        live.stop(); m.stop()
+    assert FakeBackfiller.calls == [t[4]]
+    assert out == sorted(out)                       # 从不回退
+    assert sorted(set(out)) == t                    # 缺口补齐
+    assert out.count(t[7]) == 1                     # 回补与缓存推送重叠的那根只发一次
+    assert not live._pending